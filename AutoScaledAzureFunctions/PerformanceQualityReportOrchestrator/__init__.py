@@ -1,5 +1,6 @@
 import azure.durable_functions as df
 import json
+from ..utils.durable_fan_out import task_window
 
 
 def orchestrator_function(context: df.DurableOrchestrationContext):
@@ -11,6 +12,11 @@ def orchestrator_function(context: df.DurableOrchestrationContext):
 
     retry_options = df.RetryOptions(first_retry_interval_in_milliseconds, max_number_of_attempts)
 
+    # activities in flight at once, so the fan-outs do not flood the
+    # database and data lake
+    peer_summary_window = 10
+    fund_report_window = 20
+
     data_params = params.copy()
     data_params.update({"run": "PerformanceQualityReportData"})
     data_params = {"params": data_params, "data": {}}
@@ -24,31 +30,27 @@ def orchestrator_function(context: df.DurableOrchestrationContext):
 
     parallel_peer_tasks = []
     for peer in peer_groups:
-        params.update({"run": "PerformanceQualityPeerSummaryReport"})
-        params.update({"peer_group": peer})
-        peer_params = {"params": params, "data": {}}
+        peer_params = {"params": dict(params, run="PerformanceQualityPeerSummaryReport", peer_group=peer), "data": {}}
         parallel_peer_tasks.append(
-            context.call_activity_with_retry(
+            lambda peer_params=peer_params: context.call_activity_with_retry(
                 "PerformanceQualityReportActivity",
                 retry_options,
                 peer_params,
             )
         )
-    yield context.task_all(parallel_peer_tasks)
+    yield from task_window(context, parallel_peer_tasks, peer_summary_window)
 
     parallel_fund_tasks = []
     for fund in fund_names:
-        params.update({"run": "PerformanceQualityReport"})
-        params.update({"fund_name": fund})
-        report_params = {"params": params, "data": {}}
+        report_params = {"params": dict(params, run="PerformanceQualityReport", fund_name=fund), "data": {}}
         parallel_fund_tasks.append(
-            context.call_activity_with_retry(
+            lambda report_params=report_params: context.call_activity_with_retry(
                 "PerformanceQualityReportActivity",
                 retry_options,
                 report_params,
             )
         )
-    yield context.task_all(parallel_fund_tasks)
+    yield from task_window(context, parallel_fund_tasks, fund_report_window)
 
     return True
 
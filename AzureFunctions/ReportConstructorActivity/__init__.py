@@ -3,6 +3,7 @@ from gcm.inv.utils.azure.durable_functions.base_activity import (
 )
 import datetime as dt
 from ..Reporting.Reports.controller import (
+    entity_infos_from_payload,
     get_report_class_by_name,
     validate_meta,
 )
@@ -45,7 +46,24 @@ class ReportConstructorActivity(BaseActivity):
     def parg_type(self):
         return ReportingParsedArgs
 
-    def construct_meta(self) -> Tuple[ReportStructure, ReportMeta]:
+    @property
+    def batched(self) -> bool:
+        # entities batched by ReportOrchestrator (pargs.batch_size > 1)
+        return self._d is not None and "entities" in json.loads(self._d)
+
+    def entity_infos(self) -> List[pd.DataFrame]:
+        # the entities of this activity, several when batched
+        return entity_infos_from_payload(self._d)
+
+    @property
+    def backfill_dates(self) -> List[dt.date]:
+        return [
+            dt.date.fromisoformat(i) for i in self.pargs.backfill_dates
+        ]
+
+    def construct_meta(
+        self, entity_info: pd.DataFrame = None
+    ) -> Tuple[ReportStructure, ReportMeta]:
         # below will fail if something went wrong in the parser
         report: ReportStructure = get_report_class_by_name(
             self.pargs.ReportName
@@ -69,13 +87,6 @@ class ReportConstructorActivity(BaseActivity):
         domain: EntityDomainTypes = Scenario.get_attribute(
             "EntityDomainTypes"
         )
-        entity_info: pd.DataFrame = None
-        if self._d is not None:
-            dict_of_pargs = json.loads(self._d)
-            if "entity" in dict_of_pargs:
-                entity_info: pd.DataFrame = pd.read_json(
-                    dict_of_pargs["entity"]
-                )
         return (
             report,
             ReportMeta(
@@ -89,13 +100,40 @@ class ReportConstructorActivity(BaseActivity):
         )
 
     def activity(self, **kwargs):
-        [report_structure, meta] = self.construct_meta()
-        validate_meta(
-            report_meta=meta,
-            report_structure=report_structure,
-            strict=False,
+        # a batch is constructed through the report class, which can share
+        # one data load across its entities (see for_entities)
+        metas: List[ReportMeta] = []
+        for entity_info in self.entity_infos():
+            [report_structure, meta] = self.construct_meta(entity_info)
+            validate_meta(
+                report_meta=meta,
+                report_structure=report_structure,
+                strict=False,
+            )
+            metas.append(meta)
+        if len(self.backfill_dates) > 0:
+            # each entity's report for every date, each saved and printed
+            # with the scenario set to its date
+            file_locations = [
+                location
+                for meta in metas
+                for location in report_structure.backfill(
+                    meta,
+                    self.pargs.ReportName,
+                    self.backfill_dates,
+                    write=self.save,
+                ).values()
+            ]
+            return json.dumps(file_locations)
+        reports: List[ReportStructure] = report_structure.for_entities(
+            metas, self.pargs.ReportName
         )
-        report: ReportStructure = report_structure(meta)
+        file_locations = [self.save(i) for i in reports]
+        if self.batched:
+            return json.dumps(file_locations)
+        return file_locations[0]
+
+    def save(self, report: ReportStructure) -> str:
         j = report.to_json()
         dao: DaoRunner = Scenario.get_attribute("dao")
         json_dl_location = copy.deepcopy(
@@ -9,6 +9,8 @@ from gcm.inv.utils.azure.durable_functions.parg_serialization import (
 from ..utils.reporting_parsed_args import (
     ReportingParsedArgs,
 )
+from ..utils.durable_fan_out import task_window
+from ..Reporting.Reports.controller import get_report_class_by_name
 import pandas as pd
 import json
 
@@ -21,6 +23,13 @@ class ReportOrchestrator(BaseOrchestrator):
     def parg_type(self):
         return ReportingParsedArgs
 
+    @property
+    def fan_out_window(self) -> int:
+        # constructions in flight at once, set per report type
+        return get_report_class_by_name(
+            self.pargs.ReportName
+        ).fan_out_window
+
     def orchestrate(self, context: df.DurableOrchestrationContext):
         # first - get entities (activity)
         entities = yield context.call_activity(
@@ -30,18 +39,32 @@ class ReportOrchestrator(BaseOrchestrator):
         if entities != "" and entities is not None:
             df = pd.read_json(entities)
             assert df is not None
-            provisioning_tasks = []
             grouped = df.groupby(Standards.NodeId)
-            for n, group in grouped:
-                node_json = group.to_json()
-                provision_task = context.call_sub_orchestrator(
+            node_jsons = [group.to_json() for n, group in grouped]
+            batch_size = self.pargs.batch_size
+            if batch_size > 1:
+                # one activity constructs a batch of entities, sharing the
+                # process level caches, and returns a list of locations
+                inputs = [
+                    json.dumps(
+                        {"entities": node_jsons[i : i + batch_size]}
+                    )
+                    for i in range(0, len(node_jsons), batch_size)
+                ]
+            else:
+                inputs = [json.dumps({"entity": i}) for i in node_jsons]
+            provisioning_tasks = [
+                lambda d=d: context.call_sub_orchestrator(
                     "ReportRunnerOrchestrator",
-                    serialize_pargs(
-                        self.pargs, json.dumps({"entity": node_json})
-                    ),
+                    serialize_pargs(self.pargs, d),
                 )
-                provisioning_tasks.append(provision_task)
-            data_location = yield context.task_all(provisioning_tasks)
+                for d in inputs
+            ]
+            data_location = yield from task_window(
+                context, provisioning_tasks, self.fan_out_window
+            )
+            # batched constructions return a list of locations
+            listed = batch_size > 1
         else:
             provision_task = [
                 context.call_sub_orchestrator(
@@ -50,9 +73,28 @@ class ReportOrchestrator(BaseOrchestrator):
                 )
             ]
             data_location = yield context.task_all(provision_task)
-        publish_location = yield context.call_activity(
-            "ReportPublishActivity",
-            serialize_pargs(self.pargs, {"data": data_location}),
+            listed = False
+        if listed or len(self.pargs.backfill_dates) > 0:
+            # as do backfills, one location per entity and date
+            data_location = [
+                location
+                for locations in data_location
+                for location in json.loads(locations)
+            ]
+        # each report is published by its own activity, in the same
+        # window as the constructions
+        publish_tasks = [
+            lambda d=d: context.call_activity(
+                "ReportPublishActivity",
+                serialize_pargs(self.pargs, {"data": [d]}),
+            )
+            for d in data_location
+        ]
+        published = yield from task_window(
+            context, publish_tasks, self.fan_out_window
+        )
+        publish_location = json.dumps(
+            [output for i in published for output in json.loads(i)]
         )
         return publish_location
 
@@ -38,7 +38,7 @@ class ReportPublishActivity(BaseActivity):
         r = ReportNames[d["report_name"]]
         report_structure_class = get_report_class_by_name(r)
         report_structure: ReportStructure = (
-            report_structure_class.from_dict(d, report_name=r)
+            report_structure_class.from_dict(d, report_name=r, lazy=True)
         )
         return report_structure
 
@@ -47,17 +47,18 @@ class ReportPublishActivity(BaseActivity):
         params_vals = []
         dao: DaoRunner = Scenario.get_attribute("dao")
 
-        # TODO: figure out if can parallelize the excel stuff
+        # ReportOrchestrator schedules one activity per report, so
+        # reports are published in parallel
         for i in data:
-            # get data from dao:
             json_item = json.loads(i)
-            report_structure = ReportPublishActivity.load_report(
-                dao, json_item
-            )
             if (
                 "json_location" in json_item
                 and "excel_location" not in json_item
             ):
+                # get data from dao:
+                report_structure = ReportPublishActivity.load_report(
+                    dao, json_item
+                )
                 output = print(
                     report_structure=report_structure, print_pdf=True
                 )
@@ -66,9 +67,11 @@ class ReportPublishActivity(BaseActivity):
                 location = json_item["excel_location"]
                 file = location["file"]
                 source = DaoSource[location["source"]]
+                # the saved workbook is converted as is, without
+                # rebuilding the report from its json
                 output = print_excel_to_pdf(
                     dao,
-                    report_structure=report_structure,
+                    report_structure=None,
                     dl_params=file,
                     source=source,
                 )
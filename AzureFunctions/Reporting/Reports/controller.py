@@ -31,6 +31,7 @@ from gcm.inv.utils.date.Frequency import FrequencyType
 from gcm.inv.scenario import Scenario
 from gcm.inv.utils.date.business_calendar import BusinessCalendar
 from typing import List
+import json
 import pandas as pd
 
 
@@ -48,7 +49,14 @@ def get_report_class_by_name(name: ReportNames):
         return PvmManagerTrackRecordReport
     if name == ReportNames.PvmManagerTrackRecordReportAggregation:
         return PvmManagerTrackRecordReportAggregation
-    if name == ReportNames.PvmPerformanceBreakoutReport:
+    if name in [
+        ReportNames.PvmPerformanceBreakoutReport,
+        ReportNames.PE_Portfolio_Performance_x_Vintage_Realization_Status,
+        ReportNames.PE_Portfolio_Performance_x_Investment_Manager,
+        ReportNames.PE_Portfolio_Performance_x_Sector,
+        ReportNames.PE_Portfolio_Performance_x_Region,
+    ]:
+        # the breakouts are variants of one report, see report_name_enum
         return PvmPerformanceBreakoutReport
     else:
         raise NotImplementedError()
@@ -96,3 +104,15 @@ def validate_meta(
                 )
                 == 1
             )
+
+
+def entity_infos_from_payload(d: str) -> List[pd.DataFrame]:
+    # the entities of a ReportConstructorActivity payload, in order;
+    # several when batched by ReportOrchestrator (pargs.batch_size > 1)
+    if d is not None:
+        dict_of_pargs = json.loads(d)
+        if "entities" in dict_of_pargs:
+            return [pd.read_json(i) for i in dict_of_pargs["entities"]]
+        if "entity" in dict_of_pargs:
+            return [pd.read_json(dict_of_pargs["entity"])]
+    return [None]
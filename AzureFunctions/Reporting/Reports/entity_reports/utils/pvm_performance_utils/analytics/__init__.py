@@ -13,8 +13,13 @@ from .standards import (
     get_horizon_irr_df_rpt,
     get_horizon_tvpi_df_rpt,
     get_dpi_df_rpt,
-    TransactionTypes,
+    get_rollup_cube,
+    format_and_get_pme_bmarks,
+    pme_lookup_dates,
 )
+from .group_keys import GroupKeys, composite_key
+from .trailing import TrailingWindows
+from .execution import MetricExecution, run_metric_tasks
 
 
 def get_performance_report_dict(
@@ -27,61 +32,104 @@ def get_performance_report_dict(
     as_of_date: dt.date,
     _attributes_needed: List[str],
     _trailing_periods: dict,
+    execution: MetricExecution = MetricExecution.Serial,
+    max_workers: int = None,
 ) -> dict[str, pd.DataFrame]:
-    direct_alpha, discount_df = get_direct_alpha_rpt(
-        as_of_date=as_of_date,
-        df=irr_cfs,
-        nav_df=nav_df,
-        list_to_iterate=list_to_iterate,
-        _attributes_needed=_attributes_needed,
-        _trailing_periods=_trailing_periods,
-    )
-    ks_pme = get_ks_pme_rpt(
-        as_of_date=as_of_date,
-        df=irr_cfs,
-        nav_df=nav_df,
-        list_to_iterate=list_to_iterate,
-        _attributes_needed=_attributes_needed,
-        _trailing_periods=_trailing_periods,
-    )
-    ror_ctr_df = get_ror_ctr_df_rpt(
-        as_of_date=as_of_date,
-        df=full_cfs,
-        owner=owner,
-        list_to_iterate=list_to_iterate,
-        _attributes_needed=_attributes_needed,
-        _trailing_periods=_trailing_periods,
+    # composite Name keys for every level, shared by all metrics
+    group_keys = GroupKeys.from_frames(
+        [full_cfs, irr_cfs, nav_df, commitment_df], list_to_iterate
     )
-
-    horizon_irr = get_horizon_irr_df_rpt(
-        as_of_date=as_of_date,
-        df=irr_cfs,
-        nav_df=nav_df,
-        list_to_iterate=list_to_iterate,
-        _attributes_needed=_attributes_needed,
-        _trailing_periods=_trailing_periods,
+    # additive measures summed once per deal and rolled up by level
+    cube = get_rollup_cube(irr_cfs, group_keys, commitment_df)
+    # irr cashflows sorted once, each trailing period is a slice
+    windows = TrailingWindows(irr_cfs, nav_df)
+    # benchmark prices are read here, once: the metric tasks only compute,
+    # as forked workers must not query over the inherited connection
+    pme_bmarks = format_and_get_pme_bmarks(
+        irr_cfs,
+        _attributes_needed,
+        pme_lookup_dates(as_of_date, _trailing_periods),
     )
-    horizon_multiple = get_horizon_tvpi_df_rpt(
+    horizon_kwargs = dict(
         as_of_date=as_of_date,
         df=irr_cfs,
         nav_df=nav_df,
         list_to_iterate=list_to_iterate,
         _attributes_needed=_attributes_needed,
         _trailing_periods=_trailing_periods,
+        group_keys=group_keys,
     )
-    dpi_rslt = get_dpi_df_rpt(
-        df=irr_cfs,
-        list_to_iterate=list_to_iterate,
-        _attributes_needed=_attributes_needed,
+    # the metric families only read the shared inputs, so they can run
+    # concurrently; results are picked up by name in the usual order
+    results = run_metric_tasks(
+        {
+            "direct_alpha": (
+                get_direct_alpha_rpt,
+                dict(horizon_kwargs, pme_bmarks=pme_bmarks),
+            ),
+            "ks_pme": (
+                get_ks_pme_rpt,
+                dict(horizon_kwargs, pme_bmarks=pme_bmarks),
+            ),
+            "ror_ctr": (
+                get_ror_ctr_df_rpt,
+                dict(
+                    as_of_date=as_of_date,
+                    df=full_cfs,
+                    owner=owner,
+                    list_to_iterate=list_to_iterate,
+                    _attributes_needed=_attributes_needed,
+                    _trailing_periods=_trailing_periods,
+                ),
+            ),
+            "horizon_irr": (
+                get_horizon_irr_df_rpt,
+                dict(horizon_kwargs, windows=windows),
+            ),
+            "horizon_multiple": (
+                get_horizon_tvpi_df_rpt,
+                dict(horizon_kwargs, cube=cube, windows=windows),
+            ),
+            "dpi": (
+                get_dpi_df_rpt,
+                dict(
+                    df=irr_cfs,
+                    list_to_iterate=list_to_iterate,
+                    _attributes_needed=_attributes_needed,
+                    cube=cube,
+                ),
+            ),
+            "commitment": (
+                get_sum_df_rpt,
+                dict(
+                    df=commitment_df,
+                    list_to_iterate=list_to_iterate,
+                    sum_col="Commitment",
+                    cube=cube,
+                ),
+            ),
+            "nav": (
+                get_sum_df_rpt,
+                dict(
+                    df=irr_cfs,
+                    list_to_iterate=list_to_iterate,
+                    sum_col="Nav",
+                    cube=cube,
+                    measures=["R"],
+                ),
+            ),
+        },
+        execution=execution,
+        max_workers=max_workers,
     )
-
-    commitment_rslt = get_sum_df_rpt(
-        commitment_df, list_to_iterate, "Commitment"
-    )[["Name", "Commitment"]]
-    nav = irr_cfs[
-        irr_cfs.TransactionType.isin(TransactionTypes.R.value)
-    ].rename(columns={"BaseAmount": "Nav"})
-    nav_rslt = get_sum_df_rpt(nav, list_to_iterate, "Nav")[["Name", "Nav"]]
+    direct_alpha, discount_df = results["direct_alpha"]
+    ks_pme = results["ks_pme"]
+    ror_ctr_df = results["ror_ctr"]
+    horizon_irr = results["horizon_irr"]
+    horizon_multiple = results["horizon_multiple"]
+    dpi_rslt = results["dpi"]
+    commitment_rslt = results["commitment"][["Name", "Commitment"]]
+    nav_rslt = results["nav"][["Name", "Nav"]]
 
     discount_df_with_attrib = discount_df[
         ["Name", "Date", "Discounted", "Type"]
@@ -163,20 +211,9 @@ def format_performance_report(
     attrib["Portfolio"] = owner
 
     for group in range(len(list_to_iterate)):
-        attrib["Group" + str(group)] = attrib.apply(
-            lambda x: "_".join(
-                [str(x[i]) for i in list_to_iterate[group]]
-            ),
-            axis=1,
+        attrib["Group" + str(group)] = composite_key(
+            attrib, list_to_iterate[group]
         )
-    attrib = attrib.sort_values(
-        [
-            col_name
-            for col_name in reversed(
-                attrib.columns[attrib.columns.str.contains("Group")]
-            )
-        ]
-    )
 
     if "PredominantSector" in attrib.columns:
         attrib.PredominantSector = attrib.PredominantSector.str.replace(
@@ -210,11 +247,17 @@ def format_performance_report(
             ],
             [1, 2, 3],
         )
-        attrib = attrib.sort_values("Order")
-    if "VintageYear" in attrib.columns:
-        attrib = attrib.sort_values("VintageYear")
-    if "PredominantAssetRegion" in attrib.columns:
-        attrib = attrib.sort_values("PredominantAssetRegion")
+    # one lexicographic sort: region, vintage, investment type order, then
+    # the group keys from the lowest level up
+    sort_cols = [
+        col_name
+        for col_name in ["PredominantAssetRegion", "VintageYear", "Order"]
+        if col_name in attrib.columns
+    ] + [
+        "Group" + str(group)
+        for group in reversed(range(len(list_to_iterate)))
+    ]
+    attrib = attrib.sort_values(sort_cols)
 
     ordered_recursion = [
         item for sublist in list_to_iterate for item in sublist
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+from pyxirr import xirr
+
+# same day count (ACT/365F), starting guess and stopping rules as pyxirr
+_DAYS_IN_YEAR = 365.0
+_DEFAULT_GUESS = 0.1
+_MAX_ITERATIONS = 50
+_MAX_ERROR = 1e-9
+
+
+def batch_xirr(
+    codes: np.ndarray,
+    dates,
+    amounts: np.ndarray,
+    size: int = None,
+    guess: np.ndarray = None,
+) -> np.ndarray:
+    """XIRR of many groups of cashflows solved together.
+
+    ``codes`` assigns each cashflow to a group in ``0..size - 1`` (rows with
+    a negative code are ignored), so the groups form a ragged array over
+    ``dates`` and ``amounts``. Groups whose dated flows change sign once
+    have a single rate by Descartes' rule of signs; those are solved by
+    Newton-Raphson for all groups at once. Any other group, or one that does
+    not converge, is handed to ``pyxirr.xirr`` itself so that the same root
+    is picked. Groups without both a positive and a negative amount, or that
+    cannot be solved, are NaN as with ``silent=True``.
+
+    ``guess`` optionally warm-starts each group, e.g. from the result of a
+    neighbouring horizon; NaN guesses fall back to the pyxirr default.
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    amounts = np.asarray(amounts, dtype=float)
+    days = (
+        pd.to_datetime(pd.Series(dates))
+        .to_numpy(dtype="datetime64[D]")
+        .astype(np.int64)
+    )
+    keep = codes >= 0
+    codes, days, amounts = codes[keep], days[keep], amounts[keep]
+    if size is None:
+        size = int(codes.max()) + 1 if len(codes) else 0
+    rslt = np.full(size, np.nan)
+    if len(codes) == 0:
+        return rslt
+
+    first_day = np.full(size, np.iinfo(np.int64).max)
+    np.minimum.at(first_day, codes, days)
+    years = (days - first_day[codes]) / _DAYS_IN_YEAR
+    solvable = (np.bincount(codes, amounts > 0, minlength=size) > 0) & (
+        np.bincount(codes, amounts < 0, minlength=size) > 0
+    )
+    single_root = solvable & (
+        _sign_changes(codes, days, amounts, size) == 1
+    )
+
+    rate = np.full(size, _DEFAULT_GUESS)
+    if guess is not None:
+        guess = np.asarray(guess, dtype=float)
+        rate = np.where(np.isfinite(guess), guess, rate)
+    active = single_root.copy()
+    for _ in range(_MAX_ITERATIONS):
+        if not active.any():
+            break
+        rows = active[codes]
+        group = codes[rows]
+        base = 1 + rate[group]
+        with np.errstate(all="ignore"):
+            pv = amounts[rows] * base ** -years[rows]
+            npv = np.bincount(group, pv, minlength=size)
+            deriv = np.bincount(
+                group, -years[rows] * pv / base, minlength=size
+            )
+            delta = npv / deriv
+        # pyxirr treats rates at or below -100% as an infinite npv
+        failed = active & ~((rate > -1) & np.isfinite(delta))
+        solved = active & ~failed & (np.abs(npv) < _MAX_ERROR)
+        stepped = active & ~failed & ~solved & (np.abs(delta) < _MAX_ERROR)
+        rslt[solved] = rate[solved]
+        rslt[stepped] = rate[stepped] - delta[stepped]
+        active &= ~(failed | solved | stepped)
+        rate = np.where(active, rate - delta, rate)
+
+    unsolved = np.flatnonzero(solvable & ~np.isfinite(rslt))
+    if len(unsolved):
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], [unsolved, unsolved + 1])
+        for code, start, end in zip(unsolved, *bounds):
+            rows = order[start:end]
+            irr = xirr(
+                days[rows].astype("datetime64[D]"),
+                amounts[rows],
+                silent=True,
+            )
+            rslt[code] = np.nan if irr is None else irr
+    return rslt
+
+
+def _sign_changes(
+    codes: np.ndarray, days: np.ndarray, amounts: np.ndarray, size: int
+) -> np.ndarray:
+    # sign changes of the net flow per date, in date order, for each group
+    flows = (
+        pd.DataFrame({"code": codes, "day": days, "amount": amounts})
+        .groupby(["code", "day"], sort=True)
+        .amount.sum()
+    )
+    flows = flows[flows != 0]
+    group = flows.index.get_level_values(0).to_numpy()
+    sign = np.sign(flows.to_numpy())
+    change = (group[1:] == group[:-1]) & (sign[1:] != sign[:-1])
+    return np.bincount(group[1:][change], minlength=size)
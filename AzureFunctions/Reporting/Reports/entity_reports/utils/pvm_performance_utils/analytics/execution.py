@@ -0,0 +1,91 @@
+import contextvars
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# app settings for how the metric families of a report run: a
+# MetricExecution value and the pool size (default: the executor's)
+METRIC_EXECUTION_SETTING = "PVM_METRIC_EXECUTION"
+METRIC_MAX_WORKERS_SETTING = "PVM_METRIC_MAX_WORKERS"
+
+# tasks of the process pool being run; forked workers inherit them so the
+# input frames are shared copy-on-write instead of pickled to each worker
+_FORKED_TASKS: Dict[str, Tuple[Callable, dict]] = {}
+
+
+class MetricExecution(Enum):
+    Serial = "serial"
+    Threads = "threads"
+    Processes = "processes"
+
+
+def metric_execution_setting() -> MetricExecution:
+    return MetricExecution(
+        os.environ.get(
+            METRIC_EXECUTION_SETTING, MetricExecution.Serial.value
+        )
+    )
+
+
+def metric_max_workers_setting() -> Optional[int]:
+    setting = os.environ.get(METRIC_MAX_WORKERS_SETTING)
+    return int(setting) if setting else None
+
+
+def _run_forked_task(name: str) -> Any:
+    func, kwargs = _FORKED_TASKS[name]
+    return func(**kwargs)
+
+
+def run_metric_tasks(
+    tasks: Dict[str, Tuple[Callable, dict]],
+    execution: MetricExecution = MetricExecution.Serial,
+    max_workers: int = None,
+) -> Dict[str, Any]:
+    """Run independent metric calculations and return results by name.
+
+    ``tasks`` maps a name to ``(func, kwargs)``; results come back in the
+    same order as ``tasks`` whatever the execution mode. ``Threads`` runs
+    each task in the caller's context (contextvars are copied).
+    ``Processes`` forks the workers after the tasks are registered, so the
+    read-only inputs are shared with the parent's memory and only results
+    are pickled. Where fork is not available it falls back to threads.
+    Tasks must only compute: forked workers inherit the parent's database
+    connections and locks, so the data they need is read beforehand.
+    """
+    if execution == MetricExecution.Serial or len(tasks) <= 1:
+        return {
+            name: func(**kwargs) for name, (func, kwargs) in tasks.items()
+        }
+
+    if execution == MetricExecution.Processes:
+        if "fork" in multiprocessing.get_all_start_methods():
+            _FORKED_TASKS.clear()
+            _FORKED_TASKS.update(tasks)
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=multiprocessing.get_context("fork"),
+                ) as pool:
+                    futures = {
+                        name: pool.submit(_run_forked_task, name)
+                        for name in tasks.keys()
+                    }
+                    return {
+                        name: future.result()
+                        for name, future in futures.items()
+                    }
+            finally:
+                _FORKED_TASKS.clear()
+        execution = MetricExecution.Threads
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            name: pool.submit(
+                contextvars.copy_context().run, func, **kwargs
+            )
+            for name, (func, kwargs) in tasks.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,87 @@
+from functools import reduce
+from typing import List
+import numpy as np
+import pandas as pd
+
+
+def composite_key(df: pd.DataFrame, group_cols: List[str]) -> pd.Series:
+    # vectorized equivalent of "_".join([str(x[i]) for i in group_cols])
+    if len(df) == 0:
+        return pd.Series([], index=df.index, dtype=object)
+    return reduce(
+        lambda left, right: left + "_" + right,
+        [df[i].astype(str) for i in group_cols],
+    )
+
+
+class GroupKeys(object):
+    """Composite ``Name`` keys for every level of a group hierarchy.
+
+    Built once from the deal level (leaf) attributes. Each level is held as
+    integer codes into a sorted array of level names, so any frame carrying
+    the leaf ``Name`` column can be keyed or filtered by level without
+    rebuilding strings. Like ``groupby``, keys with a null attribute get
+    code -1.
+    """
+
+    def __init__(
+        self, attributes: pd.DataFrame, list_to_iterate: List[List[str]]
+    ):
+        leaf_cols = list_to_iterate[-1]
+        leaf = attributes[leaf_cols].drop_duplicates()
+        leaf_names = composite_key(leaf, leaf_cols)
+        leaf = leaf[~leaf_names.duplicated()]
+        self._leaf = pd.Index(leaf_names[leaf.index])
+        self._levels = {}
+        for group_cols in list_to_iterate:
+            names = composite_key(leaf, group_cols)
+            has_null = leaf[group_cols].isnull().any(axis=1).to_numpy()
+            codes, categories = pd.factorize(names, sort=True)
+            categories = pd.Index(categories)
+            # names of null keys are never referenced by code
+            codes = np.where(has_null, -1, codes)
+            self._levels[tuple(group_cols)] = (codes, categories)
+
+    @classmethod
+    def from_frames(
+        cls, frames: List[pd.DataFrame], list_to_iterate: List[List[str]]
+    ) -> "GroupKeys":
+        leaf_cols = list_to_iterate[-1]
+        attributes = pd.concat(
+            [f[leaf_cols].drop_duplicates() for f in frames]
+        )
+        return cls(attributes, list_to_iterate)
+
+    def categories(self, group_cols: List[str]) -> pd.Index:
+        return self._levels[tuple(group_cols)][1]
+
+    def codes(self, df: pd.DataFrame, group_cols: List[str]) -> np.ndarray:
+        # df rows are matched to the hierarchy through their leaf Name
+        return self.name_codes(df["Name"], group_cols)
+
+    def name_codes(self, names, group_cols: List[str]) -> np.ndarray:
+        level_codes, _ = self._levels[tuple(group_cols)]
+        leaf_pos = self._leaf.get_indexer(names)
+        return np.where(leaf_pos >= 0, level_codes[leaf_pos], -1)
+
+    def key(self, df: pd.DataFrame, group_cols: List[str]) -> pd.Series:
+        return pd.Series(
+            pd.Categorical.from_codes(
+                self.codes(df, group_cols),
+                categories=self.categories(group_cols),
+            ),
+            index=df.index,
+            name="Name",
+        )
+
+    def isin(
+        self,
+        df: pd.DataFrame,
+        other: pd.DataFrame,
+        group_cols: List[str],
+    ) -> np.ndarray:
+        # rows of df whose (non-null) level key also appears in other
+        other_codes = self.codes(other, group_cols)
+        return np.isin(
+            self.codes(df, group_cols), other_codes[other_codes >= 0]
+        )
@@ -0,0 +1,144 @@
+import datetime as dt
+import threading
+from typing import List
+import numpy as np
+import pandas as pd
+from gcm.inv.scenario import Scenario, DaoRunner
+from gcm.Dao.DaoSources import DaoSource
+from gcm.inv.utils.DaoUtils.query_utils import (
+    Query,
+    DeclarativeMeta,
+    filter_many,
+)
+from gcm.inv.utils.misc.table_cache_base import Singleton
+
+# prices are fetched this far beyond the dates looked up, so the nearest
+# price of a date at either end is the same as in the full history
+_RANGE_PADDING = dt.timedelta(days=31)
+
+
+def nearest_positions(sorted_dates: np.ndarray, lookups) -> np.ndarray:
+    """Vectorized ``nearest``: for each lookup date returns the position of
+    the closest date in ``sorted_dates`` (ascending datetime64). Ties go to
+    the earlier date.
+    """
+    sorted_dates = np.asarray(sorted_dates, dtype="datetime64[ns]")
+    lookups = pd.to_datetime(pd.Series(lookups)).to_numpy(
+        dtype="datetime64[ns]"
+    )
+    if len(sorted_dates) == 1:
+        return np.zeros(len(lookups), dtype=int)
+    right = np.searchsorted(sorted_dates, lookups, side="left").clip(
+        1, len(sorted_dates) - 1
+    )
+    left = right - 1
+    take_right = np.abs(sorted_dates[right] - lookups) < np.abs(
+        lookups - sorted_dates[left]
+    )
+    return np.where(take_right, right, left)
+
+
+class IndexPrices(object):
+    """One index's prices as arrays sorted by date.
+
+    ``positions`` and ``price`` look up the price nearest to each date by
+    binary search, so every cashflow of a frame is matched to the index in
+    one call instead of a scan of the history per date.
+    """
+
+    def __init__(self, dates, prices):
+        dates = pd.to_datetime(pd.Series(dates)).to_numpy(
+            dtype="datetime64[ns]"
+        )
+        order = np.argsort(dates, kind="stable")
+        self.dates = dates[order]
+        self.prices = pd.Series(prices).to_numpy(dtype=float)[order]
+
+    def positions(self, lookups) -> np.ndarray:
+        return nearest_positions(self.dates, lookups)
+
+    def price(self, lookups) -> np.ndarray:
+        return self.prices[self.positions(lookups)]
+
+
+class IndexPriceStore(metaclass=Singleton):
+    """Index prices of the run, kept per ticker across entities.
+
+    Only the date range asked for is read, and a ticker is read again only
+    when a later request reaches outside the range already held. Entries
+    are kept per scenario as_of_date so a warm worker never reuses prices
+    read for an earlier run.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (as_of_date, ticker) -> (start, end, IndexPrices)
+        self._prices: dict[tuple, tuple] = {}
+
+    def get(
+        self, tickers: List[str], start: dt.date, end: dt.date
+    ) -> dict[str, IndexPrices]:
+        as_of_date = Scenario.get_attribute("as_of_date")
+        start = pd.Timestamp(start).date()
+        end = pd.Timestamp(end).date()
+        with self._lock:
+            held = {
+                i: self._prices[(as_of_date, i)]
+                for i in tickers
+                if (as_of_date, i) in self._prices
+            }
+            missing = [
+                i
+                for i in tickers
+                if i not in held or held[i][0] > start or held[i][1] < end
+            ]
+            if len(missing) > 0:
+                # one read covering the new range and any range held
+                fetch_start = min(
+                    [start] + [held[i][0] for i in missing if i in held]
+                )
+                fetch_end = max(
+                    [end] + [held[i][1] for i in missing if i in held]
+                )
+                prices = _get_index_prices(
+                    missing,
+                    fetch_start - _RANGE_PADDING,
+                    fetch_end + _RANGE_PADDING,
+                )
+                for i in missing:
+                    ticker_prices = prices[prices.Ticker == i]
+                    self._prices[(as_of_date, i)] = (
+                        fetch_start,
+                        fetch_end,
+                        IndexPrices(
+                            ticker_prices.Date, ticker_prices.PxLast
+                        ),
+                    )
+            return {i: self._prices[(as_of_date, i)][2] for i in tickers}
+
+
+def _get_index_prices(
+    tickers: List[str], start: dt.date, end: dt.date
+) -> pd.DataFrame:
+    def oper(query: Query, item: DeclarativeMeta):
+        query = filter_many(query, item, "Ticker", tickers)
+        return query.filter(item.Date >= start, item.Date <= end)
+
+    p = {
+        "table": "FactorReturns",
+        "schema": "analyticsdata",
+        "operation": lambda query, items: oper(query, items),
+    }
+    runner: DaoRunner = Scenario.get_attribute("dao")
+    return runner.execute(
+        params=p,
+        source=DaoSource.InvestmentsDwh,
+        operation=lambda d, pp: d.get_data(pp),
+    )[["Ticker", "Date", "PxLast"]]
+
+
+def get_index_prices(
+    tickers: List[str], start: dt.date, end: dt.date
+) -> dict[str, IndexPrices]:
+    # prices covering start to end, shared through the run's store
+    return IndexPriceStore().get(tickers, start, end)
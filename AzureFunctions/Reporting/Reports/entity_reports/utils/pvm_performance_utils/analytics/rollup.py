@@ -0,0 +1,110 @@
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+from .group_keys import GroupKeys
+
+
+class RollupCube(object):
+    """Additive measures summed once per deal and rolled up a hierarchy.
+
+    Each measure is aggregated to the leaf ``Name`` in a single pass over the
+    cashflows and then rolled up to any level of the hierarchy through the
+    ``GroupKeys`` codes, so the work per level scales with the number of
+    deals rather than the number of cashflows. Row counts are kept with the
+    sums so that a group without rows for a measure reads as missing, the
+    same as a ``groupby`` that never saw the group.
+    """
+
+    def __init__(self, group_keys: GroupKeys):
+        self.group_keys = group_keys
+        self._measures = {}
+
+    def add(
+        self, measure: str, df: pd.DataFrame, value_col: str = "BaseAmount"
+    ) -> "RollupCube":
+        grouped = df.groupby("Name")[value_col]
+        self._measures[measure] = (grouped.sum(), grouped.size())
+        return self
+
+    def add_by_type(
+        self,
+        df: pd.DataFrame,
+        types: Dict[str, List[str]],
+        value_col: str = "BaseAmount",
+        type_col: str = "TransactionType",
+    ) -> "RollupCube":
+        # one groupby for all transaction type buckets, e.g. T/D/R
+        bucket = pd.Series(
+            np.select(
+                [df[type_col].isin(i) for i in types.values()],
+                list(types.keys()),
+                default="",
+            ),
+            index=df.index,
+        )
+        grouped = (
+            df[value_col]
+            .groupby([df["Name"], bucket])
+            .agg(["sum", "size"])
+        )
+        buckets = grouped.index.get_level_values(1)
+        for measure in types.keys():
+            leaf = grouped[buckets == measure].droplevel(1)
+            self._measures[measure] = (leaf["sum"], leaf["size"])
+        return self
+
+    def level(
+        self, group_cols: List[str], measures: List[str]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # sums and row counts of the combined measures per level group
+        size = len(self.group_keys.categories(group_cols))
+        sums = np.zeros(size)
+        counts = np.zeros(size, dtype=np.int64)
+        for measure in measures:
+            leaf_sum, leaf_count = self._measures[measure]
+            codes = self.group_keys.name_codes(leaf_sum.index, group_cols)
+            keep = codes >= 0
+            sums += np.bincount(
+                codes[keep],
+                weights=leaf_sum.to_numpy(dtype=float)[keep],
+                minlength=size,
+            )
+            counts += np.bincount(
+                codes[keep],
+                weights=leaf_count.to_numpy()[keep],
+                minlength=size,
+            ).astype(np.int64)
+        return sums, counts
+
+    def total(
+        self, group_cols: List[str], measures: List[str], name: str
+    ) -> pd.DataFrame:
+        sums, counts = self.level(group_cols, measures)
+        present = counts > 0
+        return pd.DataFrame(
+            {
+                "Name": self.group_keys.categories(group_cols)[present],
+                name: sums[present],
+            }
+        )
+
+    def ratio(
+        self,
+        group_cols: List[str],
+        numerator: List[str],
+        denominator: List[str],
+        name: str,
+    ) -> pd.DataFrame:
+        # numerator / abs(denominator), missing where either side has no rows
+        num, num_counts = self.level(group_cols, numerator)
+        den, den_counts = self.level(group_cols, denominator)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = num / np.abs(den)
+        values[(num_counts == 0) | (den_counts == 0)] = np.nan
+        present = (num_counts > 0) | (den_counts > 0)
+        return pd.DataFrame(
+            {
+                "Name": self.group_keys.categories(group_cols)[present],
+                name: values[present],
+            }
+        )
@@ -2,21 +2,14 @@ from enum import Enum
 
 import pandas as pd
 from typing import List
-from pyxirr import xirr
 import numpy as np
 from dateutil.relativedelta import relativedelta
-from gcm.inv.scenario import Scenario, DaoRunner
-from gcm.Dao.DaoSources import DaoSource
-from gcm.inv.utils.DaoUtils.query_utils import (
-    Query,
-    DeclarativeMeta,
-    filter_many,
-)
 import datetime as dt
-
-
-def __runner() -> DaoRunner:
-    return Scenario.get_attribute("dao")
+from .group_keys import GroupKeys, composite_key
+from .rollup import RollupCube
+from .batch_irr import batch_xirr
+from .trailing import TrailingWindows
+from .index_prices import IndexPrices, get_index_prices
 
 
 class TransactionTypes(Enum):
@@ -25,6 +18,16 @@ class TransactionTypes(Enum):
     D = ["Distribution", "Distributions", "D"]
 
 
+# rollup cube measures (TransactionTypes names) behind the multiples
+TVPI_NUMERATOR = [TransactionTypes.D.name, TransactionTypes.R.name]
+DPI_NUMERATOR = [TransactionTypes.D.name]
+DPI_DENOMINATOR = [TransactionTypes.T.name]
+
+# proleptic ordinals (date.toordinal) of 1970-01-01 and of date.max
+_EPOCH_ORDINAL = dt.date(1970, 1, 1).toordinal()
+_MAX_ORDINAL = dt.date.max.toordinal()
+
+
 def discount_table(
     dates_cashflows,
     cashflows,
@@ -48,7 +51,6 @@ def discount_table(
     Returns:
         DataFrame(Date|Amount|Type|Status|Discounted|Index|FV_Factor)
     """
-    _dates_index = pd.to_datetime(dates_index)
     df_cf = pd.concat(
         [pd.to_datetime(dates_cashflows), cashflows, cashflows_type],
         axis=1,
@@ -56,113 +58,92 @@ def discount_table(
     df_cf.columns = ["Date", "Amount", "Type"]
     df_cf = df_cf.sort_values("Date")
     df_cf = df_cf.reset_index(drop=True)
-    # Get NAV
-    if df_cf[
-        (df_cf.Type.isin(TransactionTypes.R.value)) & (df_cf.Amount == 0)
-    ].empty:  # Checks if liquidated by looking at 0 valuations
-        NAV_record = (
-            df_cf[df_cf["Type"].isin(TransactionTypes.R.value)]
-            .sort_values("Date", ascending=False)
-            .head(1)
-            .copy()
-        )
-        NAV_date = NAV_record["Date"].iloc[0]
-        NAV_index_value = index[
-            _dates_index == nearest(_dates_index, NAV_date)
-        ].iloc[0]
-        df_cf["Status"] = "Active"
-    else:  # Not liquidated
-        NAV_record = (
-            df_cf[~df_cf["Type"].isin(TransactionTypes.R.value)]
-            .sort_values("Date", ascending=False)
-            .head(1)
-            .copy()
-        )
-        NAV_record["Amount"].iloc[0] = 0  # force a 0 value
-        NAV_date = NAV_record["Date"].iloc[0]
-        NAV_index_value = index[
-            _dates_index == nearest(_dates_index, NAV_date)
-        ].iloc[0]
-        df_cf["Status"] = "Liquidated"
-    # Iterate and assign to table
-    df_cf["Pre-Discounted"] = 0
-    df_cf["Discounted"] = 0
-    df_cf["Index"] = 0
-    df_cf["Index_date"] = 0
-    df_cf["FV_Factor"] = 0
-    for idx, cf in df_cf.iterrows():
-        # Let us find the closest index value to the current date
-        index_date = nearest(_dates_index, cf["Date"])
-        index_value = index[_dates_index == index_date].iloc[0]
-        df_cf.loc[idx, "Index"] = index_value
-        df_cf.loc[idx, "Index_date"] = index_date
-        df_cf.loc[idx, "FV_Factor"] = NAV_index_value / index_value
-        if cf["Type"] in TransactionTypes.D.value:
-            df_cf.loc[idx, "Discounted"] = cf["Amount"] * (
-                NAV_index_value / index_value
-            )
-            df_cf.loc[idx, "Pre-Discounted"] = cf["Amount"]
-        elif cf["Type"] in TransactionTypes.T.value:
-            df_cf.loc[idx, "Discounted"] = cf["Amount"] * (
-                NAV_index_value / index_value
-            )
-            df_cf.loc[idx, "Pre-Discounted"] = cf["Amount"]
+    df_cf["Name"] = 0
+    df_cf = discount_frame(
+        df_cf,
+        IndexPrices(dates_index, index),
+        NAV_scaling=NAV_scaling,
+    )
+    return df_cf.drop(columns=["Name"])
 
-    # Attach relevant NAV value
-    df_cf.loc[
-        (df_cf["Date"] == NAV_date)
-        & (df_cf["Type"].isin(TransactionTypes.R.value)),
-        "Discounted",
-    ] = (
-        NAV_record["Amount"].iloc[0] * NAV_scaling
+
+def discount_frame(
+    df_cf: pd.DataFrame, index_prices: IndexPrices, NAV_scaling=1
+) -> pd.DataFrame:
+    """Grouped ``discount_table``: discounts every Name in ``df_cf``
+    (Name|Date|Amount|Type) against one index in a single pass. Row order
+    of ``df_cf`` is preserved.
+    """
+    _dates_index = index_prices.dates
+    _index = index_prices.prices
+
+    df_cf = df_cf.reset_index(drop=True)
+    names = df_cf["Name"]
+    is_nav = df_cf["Type"].isin(TransactionTypes.R.value)
+    # Checks if liquidated by looking at 0 valuations
+    liquidated = (
+        (is_nav & (df_cf.Amount == 0)).groupby(names).transform("any")
     )
-    df_cf.loc[
-        (df_cf["Date"] == NAV_date)
-        & (df_cf["Type"].isin(TransactionTypes.R.value)),
-        "Pre-Discounted",
-    ] = (
-        NAV_record["Amount"].iloc[0] * NAV_scaling
+    nav_date = df_cf.Date.where(is_nav).groupby(names).transform("max")
+    # liquidated funds are valued at their last cashflow with a 0 NAV
+    fv_date = nav_date.where(
+        ~liquidated,
+        df_cf.Date.where(~is_nav).groupby(names).transform("max"),
     )
+    is_fv_nav = is_nav & (df_cf.Date == fv_date)
+    nav_amount = (
+        df_cf.Amount.where(is_fv_nav)
+        .groupby(names)
+        .transform("first")
+        .where(~liquidated, 0)
+    )
+    df_cf["Status"] = np.where(liquidated, "Liquidated", "Active")
+
+    # Assign all index values to the table in one pass
+    positions = index_prices.positions(df_cf["Date"])
+    nav_index_value = index_prices.price(fv_date)
+    fv_factor = nav_index_value / _index[positions]
+    is_flow = df_cf["Type"].isin(
+        TransactionTypes.D.value + TransactionTypes.T.value
+    )
+    df_cf["Pre-Discounted"] = np.where(is_flow, df_cf["Amount"], 0.0)
+    df_cf["Discounted"] = np.where(
+        is_flow, df_cf["Amount"] * fv_factor, 0.0
+    )
+    df_cf["Index"] = _index[positions]
+    df_cf["Index_date"] = _dates_index[positions]
+    df_cf["FV_Factor"] = fv_factor
+
+    # Attach relevant NAV value
+    df_cf.loc[is_fv_nav, "Discounted"] = nav_amount * NAV_scaling
+    df_cf.loc[is_fv_nav, "Pre-Discounted"] = nav_amount * NAV_scaling
 
     # cut table at FV date
-    df_cf = df_cf[df_cf["Date"] <= NAV_date].copy()
-    return df_cf.copy()
+    return df_cf[df_cf["Date"] <= fv_date]
 
 
-def get_investment_sector_benchmark(df):
+def get_investment_sector_benchmark(df, lookup_dates: List[dt.date] = ()):
     df_bmark_mapped = df.copy()
     df_bmark_mapped["BenchmarkTicker"] = "SPXT Index"
 
-    def oper(query: Query, item: DeclarativeMeta):
-        query = filter_many(
-            query,
-            item,
-            "Ticker",
-            list(df_bmark_mapped.BenchmarkTicker.unique()),
+    # prices covering the cashflows and any other date looked up, by ticker
+    dates = pd.to_datetime(
+        pd.concat(
+            [df_bmark_mapped.TransactionDate, pd.Series(lookup_dates)]
         )
-        return query
-
-    p = {
-        "table": "FactorReturns",
-        "schema": "analyticsdata",
-        "operation": lambda query, items: oper(query, items),
-    }
-    index_prices = __runner().execute(
-        params=p,
-        source=DaoSource.InvestmentsDwh,
-        operation=lambda d, pp: d.get_data(pp),
     )
-    index_prices_rslt = (
-        index_prices[["Ticker", "Date", "PxLast"]]
-        .pivot(index="Date", columns="Ticker", values="PxLast")
-        .reset_index()
+    index_prices = get_index_prices(
+        list(df_bmark_mapped.BenchmarkTicker.unique()),
+        start=dates.min(),
+        end=dates.max(),
     )
-
-    return df_bmark_mapped, index_prices_rslt
+    return df_bmark_mapped, index_prices
 
 
 def format_and_get_pme_bmarks(
-    df: pd.DataFrame, _attributes_needed: List[str]
+    df: pd.DataFrame,
+    _attributes_needed: List[str],
+    lookup_dates: List[dt.date] = (),
 ):
     # prep data
     fund_cf = df[
@@ -171,100 +152,98 @@ def format_and_get_pme_bmarks(
     ]
 
     # get index prices
-    fund_cf_bmark, index_prices = get_investment_sector_benchmark(fund_cf)
+    fund_cf_bmark, index_prices = get_investment_sector_benchmark(
+        fund_cf, lookup_dates
+    )
     return fund_cf_bmark, index_prices
 
 
-def get_alpha_discount_table(fund_df, fund_cf, index_prices):
-    discount_table_rslt = pd.DataFrame()
-    for idx in range(len(fund_df)):
-        print(fund_df.Name[idx])
-        single_fund = fund_cf[fund_cf["Name"] == fund_df.Name[idx]].copy()
-        single_fund_group_sum = (
-            single_fund.groupby(
-                ["Name", "TransactionDate", "TransactionType"]
-            )
-            .sum()
-            .reset_index()
-        )
-        if len(single_fund_group_sum.TransactionDate.unique()) < 2:
-            continue
-        max_nav_date = single_fund_group_sum[
-            single_fund_group_sum.TransactionType.isin(
-                TransactionTypes.R.value
-            )
-        ].TransactionDate.max()
-        total_nav = single_fund_group_sum[
-            single_fund_group_sum.TransactionType.isin(
-                TransactionTypes.R.value
-            )
-        ].BaseAmount.sum()
-        single_fund_group_sum = pd.concat(
-            [
-                single_fund_group_sum[
-                    ~single_fund_group_sum.TransactionType.isin(
-                        TransactionTypes.R.value
-                    )
-                ],
-                pd.DataFrame(
-                    {
-                        "Name": single_fund_group_sum.Name.unique(),
-                        "TransactionDate": [max_nav_date],
-                        "TransactionType": "R",
-                        "BaseAmount": total_nav,
-                    }
-                ),
-            ]
-        )
-        fund_specific_index = index_prices[
-            ["Date", fund_df.BenchmarkTicker[idx]]
-        ]
+def trailing_start_dates(
+    as_of_date: dt.date, _trailing_periods: dict
+) -> List[dt.date]:
+    return [
+        as_of_date + relativedelta(months=(months * -3), days=1)
+        for months in _trailing_periods.values()
+        if months != "ITD"
+    ]
 
-        assert len(fund_specific_index.columns) == 2
-        assert len(single_fund_group_sum.Name.unique()) == 1
-        assert (
-            len(
-                single_fund_group_sum[
-                    single_fund_group_sum.TransactionType.isin(
-                        TransactionTypes.R.value
-                    )
-                ]
-            )
-            == 1
-        )
-        assert (
-            single_fund_group_sum[
-                single_fund_group_sum.TransactionType.isin(
-                    TransactionTypes.R.value
-                )
-            ].TransactionDate.max()
-            == single_fund.TransactionDate.max()
-        )
 
-        discount_table_df = discount_table(
-            dates_cashflows=single_fund_group_sum["TransactionDate"],
-            cashflows=single_fund_group_sum["BaseAmount"],
-            cashflows_type=single_fund_group_sum["TransactionType"],
-            dates_index=fund_specific_index.iloc[:, 0],
-            index=fund_specific_index.iloc[:, 1],
-        )
-        discount_table_df["IndexName"] = fund_df.BenchmarkTicker[idx]
-        discount_table_df["Name"] = fund_df.Name[idx]
-        discount_table_rslt = pd.concat(
-            [discount_table_rslt, discount_table_df]
-        )
-    return discount_table_rslt
+def pme_lookup_dates(
+    as_of_date: dt.date, _trailing_periods: dict
+) -> List[dt.date]:
+    # dates the PME metrics read index prices at besides the cashflows'
+    return [as_of_date] + trailing_start_dates(
+        as_of_date, _trailing_periods
+    )
 
 
-def nearest(series: pd.Series, lookup: dt.date, debug=False):
-    if debug:
-        print(
-            "lookup: "
-            + str(lookup)
-            + "  | closest: "
-            + str(series.iloc[(series - lookup).abs().argsort()[0]])
+def get_alpha_discount_table(fund_df, fund_cf, index_prices):
+    # all funds are summed, NAV-collapsed and discounted together, one
+    # grouped pass per benchmark ticker
+    group_sum = (
+        fund_cf[fund_cf.Name.isin(fund_df.Name)]
+        .groupby(["Name", "TransactionDate", "TransactionType"])
+        .BaseAmount.sum()
+        .reset_index()
+    )
+    group_sum = group_sum[
+        group_sum.groupby("Name").TransactionDate.transform("nunique") >= 2
+    ]
+    is_nav = group_sum.TransactionType.isin(TransactionTypes.R.value)
+    nav = (
+        group_sum[is_nav]
+        .groupby("Name")
+        .agg(
+            TransactionDate=("TransactionDate", "max"),
+            BaseAmount=("BaseAmount", "sum"),
         )
-    return series.iloc[(series - lookup).abs().argsort()[0]]
+        .reset_index()
+    )
+    nav["TransactionType"] = "R"
+    max_date = group_sum.groupby("Name").TransactionDate.max()
+    assert set(nav.Name) == set(max_date.index)
+    assert (
+        nav.TransactionDate.to_numpy()
+        == max_date.reindex(nav.Name).to_numpy()
+    ).all()
+
+    group_sum = pd.concat([group_sum[~is_nav], nav]).rename(
+        columns={
+            "TransactionDate": "Date",
+            "BaseAmount": "Amount",
+            "TransactionType": "Type",
+        }
+    )
+    group_sum["Date"] = pd.to_datetime(group_sum.Date)
+    fund_order = pd.Categorical(
+        group_sum.Name, categories=fund_df.Name.unique()
+    )
+    group_sum = (
+        group_sum.assign(FundOrder=fund_order.codes)
+        .sort_values(["FundOrder", "Date"], kind="stable")
+        .drop(columns=["FundOrder"])
+    )
+
+    discount_tables = []
+    for ticker, funds in fund_df.groupby("BenchmarkTicker", sort=False):
+        discount_table_df = discount_frame(
+            group_sum[group_sum.Name.isin(funds.Name)],
+            index_prices[ticker],
+        )
+        discount_table_df["IndexName"] = ticker
+        discount_tables.append(discount_table_df)
+    if len(discount_tables) == 0:
+        return pd.DataFrame()
+    discount_table_rslt = pd.concat(discount_tables)
+    return discount_table_rslt[
+        ["Date", "Amount", "Type"]
+        + [
+            c
+            for c in discount_table_rslt.columns
+            if c not in ["Date", "Amount", "Type", "Name"]
+        ]
+        + ["Name"]
+    ].reset_index(drop=True)
 
 
 def get_direct_alpha_rpt(
@@ -274,129 +253,102 @@ def get_direct_alpha_rpt(
     list_to_iterate: List[List[str]],
     _attributes_needed: List[str],
     _trailing_periods: dict,
+    group_keys: GroupKeys = None,
+    pme_bmarks: tuple = None,
 ):
-    fund_cf, index_prices = format_and_get_pme_bmarks(
-        df, _attributes_needed
-    )
+    if group_keys is None:
+        group_keys = GroupKeys.from_frames([df, nav_df], list_to_iterate)
+    if pme_bmarks is None:
+        pme_bmarks = format_and_get_pme_bmarks(
+            df,
+            _attributes_needed,
+            pme_lookup_dates(as_of_date, _trailing_periods),
+        )
+    fund_cf, index_prices = pme_bmarks
     fund_df = (
         fund_cf[_attributes_needed + ["BenchmarkTicker"]]
         .drop_duplicates()
         .reset_index(drop=True)
     )
+    # a fund's NAV at the start of a trailing period grows with its own
+    # benchmark, as its cashflows are discounted
+    fund_tickers = (
+        fund_df.drop_duplicates("Name").set_index("Name").BenchmarkTicker
+    )
 
     discount_df = get_alpha_discount_table(
         fund_df=fund_df, fund_cf=fund_cf, index_prices=index_prices
     )
 
     rslt = pd.DataFrame()
-    for group_cols in list_to_iterate:
-        for trailing_period in list(_trailing_periods.keys()):
-            if trailing_period in ["YTD", "QTD", "TTM"]:
-                continue
-            print(f"{group_cols} -  {trailing_period}")
-            group_cols_date = group_cols.copy()
-            group_cols_date.extend(["Date"])
-
-            if trailing_period != "ITD":
-                start_date = as_of_date + relativedelta(
-                    months=(_trailing_periods.get(trailing_period) * -3),
-                    days=1,
-                )
-                starting_investment = nav_df[
-                    pd.to_datetime(nav_df.TransactionDate)
-                    == pd.to_datetime(start_date + relativedelta(days=-1))
-                ]
-                if len(starting_investment) == 0:
-                    continue
-
-                starting_investment.BaseAmount = (
-                    starting_investment.BaseAmount * -1
-                )
-
-                index_start_value = index_prices[
-                    pd.to_datetime(index_prices.Date)
-                    == pd.to_datetime(
-                        nearest(index_prices.Date, start_date)
-                    )
-                ].iloc[0]
-
-                index_end_value = index_prices[
-                    pd.to_datetime(index_prices.Date)
-                    == pd.to_datetime(
-                        nearest(index_prices.Date, as_of_date)
-                    )
-                ].iloc[0]
-
-                initial_fv_factor = (
-                    index_end_value[1] / index_start_value[1]
-                )
-                starting_investment["Discounted"] = (
-                    starting_investment.BaseAmount * initial_fv_factor
-                )
-                starting_investment["Date"] = pd.to_datetime(start_date)
+    prior_irr = None
+    for trailing_period in list(_trailing_periods.keys()):
+        if trailing_period in ["YTD", "QTD", "TTM"]:
+            continue
 
-                grouped_filtered = discount_df[
-                    pd.to_datetime(discount_df.Date)
-                    >= pd.to_datetime(start_date)
-                ]
-                grouped_filtered = pd.concat(
-                    [starting_investment, grouped_filtered]
-                )
+        if trailing_period != "ITD":
+            start_date = as_of_date + relativedelta(
+                months=(_trailing_periods.get(trailing_period) * -3),
+                days=1,
+            )
+            starting_investment = nav_df[
+                pd.to_datetime(nav_df.TransactionDate)
+                == pd.to_datetime(start_date + relativedelta(days=-1))
+            ]
+            if len(starting_investment) == 0:
+                continue
 
-            else:
-                grouped_filtered = discount_df.copy()
-                starting_investment = None
-
-            discount_df_with_attrib = grouped_filtered[
-                ["Name", "Date", "Discounted"]
-            ].merge(
-                df[_attributes_needed + ["Portfolio"]].drop_duplicates(),
-                how="left",
-                left_on="Name",
-                right_on="Name",
+            starting_investment.BaseAmount = (
+                starting_investment.BaseAmount * -1
             )
-            assert len(grouped_filtered) == len(discount_df_with_attrib)
 
-            if starting_investment is not None:
-                # filter out items that don't meet full trailing period
-                full_period_groups = list(
-                    starting_investment.apply(
-                        lambda x: "_".join(
-                            [str(x[i]) for i in group_cols]
-                        ),
-                        axis=1,
-                    )
+            tickers = starting_investment.Name.map(fund_tickers)
+            assert tickers.notna().all()
+            initial_fv_factors = {}
+            for ticker in tickers.unique():
+                index_start_value, index_end_value = index_prices[
+                    ticker
+                ].price([start_date, as_of_date])
+                initial_fv_factors[ticker] = (
+                    index_end_value / index_start_value
                 )
-                discount_df_with_attrib = discount_df_with_attrib[
-                    discount_df_with_attrib.apply(
-                        lambda x: "_".join(
-                            [str(x[i]) for i in group_cols]
-                        ),
-                        axis=1,
-                    ).isin(full_period_groups)
-                ]
-
-            direct_alpha_df = discount_df_with_attrib.groupby(group_cols)[
-                ["Date", "Discounted"]
-            ].apply(xirr, silent=True)
-            direct_alpha_df = direct_alpha_df.reset_index().rename(
-                columns={0: "Irr"}
-            )
-            direct_alpha_df["DirectAlpha"] = np.log(
-                1 + direct_alpha_df.Irr
+            starting_investment["Discounted"] = (
+                starting_investment.BaseAmount
+                * tickers.map(initial_fv_factors)
             )
+            starting_investment["Date"] = pd.to_datetime(start_date)
 
-            direct_alpha_df["Name"] = direct_alpha_df.apply(
-                lambda x: "_".join([str(x[i]) for i in group_cols]),
-                axis=1,
-            )
-            direct_alpha_df["Period"] = trailing_period
-            direct_alpha_df = direct_alpha_df[
-                ["Name", "DirectAlpha", "Period"]
-            ].drop_duplicates()
-            rslt = pd.concat([rslt, direct_alpha_df])[
-                ["Name", "DirectAlpha", "Period"]
+            grouped_filtered = discount_df[
+                pd.to_datetime(discount_df.Date)
+                >= pd.to_datetime(start_date)
             ]
+            grouped_filtered = pd.concat(
+                [starting_investment, grouped_filtered]
+            )
+
+        else:
+            grouped_filtered = discount_df
+            starting_investment = None
+
+        # every level of the hierarchy in one solve, warm-started from the
+        # previous (neighbouring) horizon
+        direct_alpha_df, prior_irr = calc_batch_irr(
+            grouped_filtered,
+            list_to_iterate,
+            group_keys,
+            date_col="Date",
+            amount_col="Discounted",
+            starting_investment=starting_investment,
+            guess=prior_irr,
+        )
+        direct_alpha_df["DirectAlpha"] = np.log(1 + direct_alpha_df.Irr)
+        direct_alpha_df["Period"] = trailing_period
+        direct_alpha_df = direct_alpha_df[
+            ["Name", "DirectAlpha", "Period"]
+        ].drop_duplicates()
+        rslt = pd.concat([rslt, direct_alpha_df])[
+            ["Name", "DirectAlpha", "Period"]
+        ]
     result = pivot_trailing_period_df(rslt)
     return result, discount_df
 
@@ -408,19 +360,27 @@ def get_ks_pme_rpt(
     list_to_iterate: List[List[str]],
     _attributes_needed: List[str],
     _trailing_periods: dict,
+    group_keys: GroupKeys = None,
+    pme_bmarks: tuple = None,
 ) -> pd.DataFrame:
+    if group_keys is None:
+        group_keys = GroupKeys.from_frames([df, nav_df], list_to_iterate)
     # bmark assignment is always at investment level
-    fund_cf, index_prices = format_and_get_pme_bmarks(
-        df, _attributes_needed
-    )
+    if pme_bmarks is None:
+        pme_bmarks = format_and_get_pme_bmarks(
+            df,
+            _attributes_needed,
+            pme_lookup_dates(as_of_date, _trailing_periods),
+        )
+    fund_cf, index_prices = pme_bmarks
     fund_df = (
         fund_cf[_attributes_needed + ["BenchmarkTicker"]]
         .drop_duplicates()
         .reset_index(drop=True)
     )
+    windows = TrailingWindows(fund_cf, nav_df)
     rslt = pd.DataFrame()
     for trailing_period in list(_trailing_periods.keys()):
-        print(trailing_period)
         if trailing_period in ["YTD", "QTD", "TTM"]:
             continue
         if trailing_period != "ITD":
@@ -428,22 +388,9 @@ def get_ks_pme_rpt(
                 months=(_trailing_periods.get(trailing_period) * -3),
                 days=1,
             )
-            starting_investment = nav_df[
-                pd.to_datetime(nav_df.TransactionDate)
-                == pd.to_datetime(start_date + relativedelta(days=-1))
-            ]
-            starting_investment.BaseAmount = (
-                starting_investment.BaseAmount * -1
-            )
-            starting_investment["TransactionType"] = "T"
-
-            fund_cf_filtered = fund_cf[
-                fund_cf.TransactionDate.apply(
-                    lambda x: pd.Timestamp(x) >= pd.to_datetime(start_date)
-                )
-            ]
-            fund_cf_filtered = pd.concat(
-                [starting_investment, fund_cf_filtered]
+            starting_investment = windows.opening(start_date)
+            fund_cf_filtered = windows.window(
+                start_date, opening=starting_investment
             )
         else:
             fund_cf_filtered = fund_cf
@@ -467,22 +414,12 @@ def get_ks_pme_rpt(
         for group_cols in list_to_iterate:
             if starting_investment is not None:
                 # filter out items that don't meet full trailing period
-                full_period_groups = list(
-                    starting_investment.apply(
-                        lambda x: "_".join(
-                            [str(x[i]) for i in group_cols]
-                        ),
-                        axis=1,
-                    )
-                )
-
                 fv_cashflows_df_with_attrib = fv_cashflows_df_with_attrib[
-                    fv_cashflows_df_with_attrib.apply(
-                        lambda x: "_".join(
-                            [str(x[i]) for i in group_cols]
-                        ),
-                        axis=1,
-                    ).isin(full_period_groups)
+                    group_keys.isin(
+                        fv_cashflows_df_with_attrib,
+                        starting_investment,
+                        group_cols,
+                    )
                 ]
 
             ks_pme_df = (
@@ -493,10 +430,7 @@ def get_ks_pme_rpt(
             ks_pme_df["KsPme"] = (
                 ks_pme_df.sum_fv_distributions + ks_pme_df.discounted_nav
             ) / ks_pme_df.sum_fv_calls
-            ks_pme_df["Name"] = ks_pme_df.apply(
-                lambda x: "_".join([str(x[i]) for i in group_cols]),
-                axis=1,
-            )
+            ks_pme_df["Name"] = composite_key(ks_pme_df, group_cols)
             ks_pme_df["Period"] = trailing_period
 
             rslt = pd.concat([rslt, ks_pme_df])[
@@ -547,9 +481,7 @@ def get_hit_rate(
 
         rslt = hit_rate.merge(avg_size).merge(pnl_ratio)
 
-        rslt["Name"] = rslt.apply(
-            lambda x: "_".join([str(x[i]) for i in group_cols]), axis=1
-        )
+        rslt["Name"] = composite_key(rslt, group_cols)
         rslt = rslt[
             ["Name", "HitRateType", "Discounted", "pct_commitment"]
         ]
@@ -560,14 +492,14 @@ def get_hit_rate(
 def get_fv_cashflow_df(
     fund_df: pd.DataFrame,
     fund_cf: pd.DataFrame,
-    index_prices: pd.DataFrame,
+    index_prices: dict[str, IndexPrices],
 ):
-    fv_cashflows_df = pd.DataFrame()
+    # each fund's cashflows, split once rather than filtered per fund
+    fund_cfs = dict(tuple(fund_cf.groupby("Name", sort=False)))
+    fv_cashflows_dfs = []
     for idx in range(len(fund_df)):
-        print(fund_df.Name[idx])
-
-        single_fund = fund_cf[fund_cf["Name"] == fund_df.Name[idx]].copy()
-        if len(single_fund) <= 1:
+        single_fund = fund_cfs.get(fund_df.Name[idx])
+        if single_fund is None or len(single_fund) <= 1:
             continue
         if (
             len(
@@ -616,11 +548,8 @@ def get_fv_cashflow_df(
                 ),
             ]
         )
-        fund_specific_index = index_prices[
-            ["Date", fund_df.BenchmarkTicker[idx]]
-        ]
+        fund_specific_index = index_prices[fund_df.BenchmarkTicker[idx]]
 
-        assert len(fund_specific_index.columns) == 2
         assert len(single_fund_group_sum.Name.unique()) == 1
         assert (
             len(
@@ -641,33 +570,27 @@ def get_fv_cashflow_df(
             == single_fund.TransactionDate.max()
         )
 
-        fv_cashflows = KS_PME(
-            dates_cashflows=single_fund_group_sum["TransactionDate"],
-            cashflows=single_fund_group_sum["BaseAmount"],
-            cashflows_type=single_fund_group_sum["TransactionType"],
-            dates_index=fund_specific_index.iloc[:, 0],
-            index=fund_specific_index.iloc[:, 1],
-            auto_NAV=False,
+        fv_cashflows = ks_pme_fv_sums(
+            single_fund_group_sum["TransactionDate"],
+            single_fund_group_sum["BaseAmount"],
+            single_fund_group_sum["TransactionType"],
+            fund_specific_index,
         )
-        index_value = fund_specific_index[
-            fund_specific_index.Date
-            == nearest(fund_specific_index.Date, max_nav_date)
-        ][fund_df.BenchmarkTicker[idx]].iloc[0]
-        discounted_NAV = total_nav / index_value.squeeze()
-        fv_cashflows_df = pd.concat(
-            [
-                fv_cashflows_df,
-                pd.DataFrame(
-                    {
-                        "Name": single_fund_group_sum.Name.unique(),
-                        "sum_fv_distributions": fv_cashflows[0],
-                        "sum_fv_calls": fv_cashflows[1],
-                        "discounted_nav": discounted_NAV,
-                    }
-                ),
-            ]
+        index_value = fund_specific_index.price([max_nav_date])[0]
+        discounted_NAV = total_nav / index_value
+        fv_cashflows_dfs.append(
+            pd.DataFrame(
+                {
+                    "Name": single_fund_group_sum.Name.unique(),
+                    "sum_fv_distributions": fv_cashflows[0],
+                    "sum_fv_calls": fv_cashflows[1],
+                    "discounted_nav": discounted_NAV,
+                }
+            )
         )
-    return fv_cashflows_df
+    if len(fv_cashflows_dfs) == 0:
+        return pd.DataFrame()
+    return pd.concat(fv_cashflows_dfs)
 
 
 def KS_PME(
@@ -692,38 +615,24 @@ def KS_PME(
     Returns:
         The KS-PME metric given the inputed index
     """
-    _dates_index = pd.to_datetime(dates_index)
-    df_cf = pd.concat(
-        [pd.to_datetime(dates_cashflows), cashflows, cashflows_type],
-        axis=1,
+    index_prices = IndexPrices(dates_index, index)
+    # first let us sum up all of the calls and distributions
+    sum_fv_distributions, sum_fv_calls = ks_pme_fv_sums(
+        dates_cashflows, cashflows, cashflows_type, index_prices
     )
-    df_cf.columns = ["Date", "Amount", "Type"]
-    # first let us run through the cashflow data and sum up all of the calls and distributions
-    sum_fv_distributions = 0
-    sum_fv_calls = 0
-    for idx, cf in df_cf.iterrows():
-        # Let us find the closest index value to the current date
-        index_value = index[
-            _dates_index == nearest(_dates_index, cf["Date"])
-        ].iloc[0]
-        if cf["Type"] in TransactionTypes.D.value:
-            sum_fv_distributions = (
-                sum_fv_distributions + abs(cf["Amount"]) / index_value
-            )
-        elif cf["Type"] in TransactionTypes.T.value:
-            sum_fv_calls = sum_fv_calls + abs(cf["Amount"]) / index_value
-            # Now, let us also consider the nav
     if auto_NAV:
         # Let us find the nav
+        df_cf = pd.concat(
+            [pd.to_datetime(dates_cashflows), cashflows, cashflows_type],
+            axis=1,
+        )
+        df_cf.columns = ["Date", "Amount", "Type"]
         NAV_record = (
             df_cf[df_cf["Type"].isin(TransactionTypes.R.value)]
             .sort_values("Date", ascending=False)
             .head(1)
         )
-        index_value = index[
-            _dates_index
-            == nearest(_dates_index, NAV_record["Date"].iloc[0])
-        ].iloc[0]
+        index_value = index_prices.price(NAV_record["Date"])[0]
         discounted_NAV = (
             NAV_record["Amount"].iloc[0] / index_value
         ) * NAV_scaling
@@ -733,6 +642,23 @@ def KS_PME(
         return [sum_fv_distributions, sum_fv_calls]
 
 
+def ks_pme_fv_sums(
+    dates_cashflows, cashflows, cashflows_type, index_prices: IndexPrices
+) -> List[float]:
+    # distributions and calls, each divided by the nearest index level and
+    # summed in cashflow order
+    fv_amounts = np.abs(np.asarray(cashflows, dtype=float)) / (
+        index_prices.price(dates_cashflows)
+    )
+    types = pd.Series(np.asarray(cashflows_type, dtype=object))
+    is_distribution = types.isin(TransactionTypes.D.value).to_numpy()
+    is_call = types.isin(TransactionTypes.T.value).to_numpy()
+    return [
+        sum(fv_amounts[is_distribution].tolist(), 0),
+        sum(fv_amounts[is_call & ~is_distribution].tolist(), 0),
+    ]
+
+
 def get_ror_ctr_df_rpt(
     as_of_date: dt.date,
     df: pd.DataFrame,
@@ -741,6 +667,7 @@ def get_ror_ctr_df_rpt(
     _attributes_needed: List[str],
     _trailing_periods: dict,
 ) -> pd.DataFrame:
+    leaf = get_tw_ror_leaf(df, _attributes_needed)
     ror_ctr_df = pd.concat(
         [
             get_ror_ctr(
@@ -749,6 +676,7 @@ def get_ror_ctr_df_rpt(
                 group_cols=i,
                 trailing_periods=_trailing_periods,
                 _attributes_needed=_attributes_needed,
+                leaf=leaf,
             )
             for i in list_to_iterate
         ]
@@ -763,12 +691,14 @@ def get_ror_ctr(
     group_cols: List[str],
     _attributes_needed: List[str],
     trailing_periods: dict,
+    leaf: pd.DataFrame = None,
 ):
     rors = calc_tw_ror(
         df=df,
         group_cols=group_cols,
         _attributes_needed=_attributes_needed,
         return_support_data=True,
+        leaf=leaf,
     )
     if len(rors) == 0:
         return pd.DataFrame(
@@ -833,20 +763,16 @@ def get_ctrs(
 
 
 def calc_ctr(df: pd.DataFrame):
-    result = pd.DataFrame(columns=["Ctr", "NoObs"], index=df.columns)
-    rors = df.sum(axis=1)
-
-    for col in df.columns:
-        ctr = df.loc[:, col].tolist()
-        ror_to_date = (1 + rors).cumprod() - 1
-        idx = 1
-        res = ctr[0]
-        for c in ctr[1:]:
-            res += c * (1 + ror_to_date[idx - 1])
-            idx += 1
-        result.loc[col, "Ctr"] = res
-        result.loc[col, "NoObs"] = len(df.loc[:, col][df.loc[:, col] != 0])
-
+    # each period's ctr compounds with the total return up to the period
+    rors = df.sum(axis=1).to_numpy(dtype=float)
+    growth = np.concatenate([[1.0], np.cumprod(1 + rors)[:-1]])
+    result = pd.DataFrame(
+        {
+            "Ctr": growth @ df.to_numpy(dtype=float),
+            "NoObs": (df != 0).sum().to_numpy(),
+        },
+        index=df.columns,
+    )
     return result
 
 
@@ -931,93 +857,12 @@ def calc_tw_ror(
     group_cols: List[str],
     _attributes_needed: List[str],
     return_support_data=False,
+    leaf: pd.DataFrame = None,
 ):
-    df = df[df.TransactionDate <= df.MaxNavDate]
-    df = df.sort_values("TransactionDate")
-    df["lastq"] = df.TransactionDate.apply(
-        lambda row: get_last_day_of_prior_quarter(row)
-    )
-    df["thisq"] = df.TransactionDate.apply(
-        lambda row: get_last_day_of_the_quarter(row)
-    )
-    df["DateDiff"] = (df.thisq - df.TransactionDate) + dt.timedelta(days=1)
-    df["TotalDays"] = df.thisq - df.lastq
-
-    df["Weight"] = df.DateDiff / df.TotalDays
-    df["Weight"] = np.where(
-        df.TransactionType.isin(TransactionTypes.R.value), 0, df.Weight
-    )
-    df["wAmount"] = df.Weight * df.BaseAmount
-
-    nav = df[df.TransactionType.isin(TransactionTypes.R.value)].rename(
-        columns={"BaseAmount": "Nav"}
-    )
-    nav = nav.merge(
-        nav[
-            _attributes_needed
-            + [
-                "OwnerName",
-                "InvestmentName",
-                "thisq",
-                "Nav",
-            ]
-        ].rename(columns={"Nav": "PriorNav", "thisq": "lastq"}),
-        how="left",
-        left_on=_attributes_needed
-        + ["OwnerName", "InvestmentName", "lastq"],
-        right_on=_attributes_needed
-        + ["OwnerName", "InvestmentName", "lastq"],
-    )
-    cf = df[~df.TransactionType.isin(TransactionTypes.R.value)]
-
-    data = pd.concat([nav, cf])
-
-    lowest_group = group_cols.copy()
-    if "Name" not in group_cols:
-        lowest_group.extend(["Name"])
-
-    data_sum_lowest = (
-        data[
-            lowest_group
-            + ["thisq", "Nav", "PriorNav", "BaseAmount", "wAmount"]
-        ]
-        .groupby(lowest_group + ["thisq"])
-        .sum()
-        .reset_index()
-    )
-
-    data_sum_lowest["EndingNavAdj"] = (
-        data_sum_lowest.Nav + data_sum_lowest.BaseAmount
-    )
-    data_sum_lowest["PriorNavAdj"] = (
-        data_sum_lowest.PriorNav - data_sum_lowest.wAmount
-    )
-    data_sum_lowest[
-        [
-            "Nav",
-            "PriorNav",
-            "BaseAmount",
-            "wAmount",
-            "EndingNavAdj",
-            "PriorNavAdj",
-        ]
-    ] = data_sum_lowest[
-        [
-            "Nav",
-            "PriorNav",
-            "BaseAmount",
-            "wAmount",
-            "EndingNavAdj",
-            "PriorNavAdj",
-        ]
-    ].fillna(
-        0
-    )
-    data_sum_lowest = data_sum_lowest[data_sum_lowest.PriorNavAdj > 0]
-    data_sum_lowest = data_sum_lowest[data_sum_lowest.Nav > 0]
-    data_sum_lowest = data_sum_lowest[data_sum_lowest.PriorNav > 0]
+    if leaf is None:
+        leaf = get_tw_ror_leaf(df, _attributes_needed)
     data_sum = (
-        data_sum_lowest[
+        leaf[
             group_cols
             + [
                 "thisq",
@@ -1038,24 +883,16 @@ def calc_tw_ror(
         data_sum.EndingNavAdj - data_sum.PriorNav
     ) / data_sum.PriorNavAdj
     data_sum["Gain"] = data_sum.EndingNavAdj - data_sum.PriorNav
+    data_sum["TotalPriorNav"] = data_sum.groupby(
+        "thisq"
+    ).PriorNavAdj.transform("sum")
 
-    navAdj = (
-        data_sum[["thisq", "PriorNavAdj"]]
-        .groupby(["thisq"])
-        .sum()
-        .reset_index()
-        .rename(columns={"PriorNavAdj": "TotalPriorNav"})
-    )
-
-    rslt = data_sum.merge(
-        navAdj, how="left", left_on="thisq", right_on="thisq"
-    )
+    rslt = data_sum
     rslt["Alloc"] = rslt.PriorNavAdj / rslt.TotalPriorNav
     rslt["Ctr"] = rslt.Alloc * rslt.Ror
 
-    rslt["Name"] = rslt.apply(
-        lambda x: "_".join([str(x[i]) for i in group_cols]), axis=1
-    )
+    rslt["Name"] = composite_key(rslt, group_cols)
+    rslt["thisq"] = rslt.thisq.dt.date
     rslt.rename(columns={"thisq": "Date"}, inplace=True)
 
     if return_support_data:
@@ -1064,6 +901,84 @@ def calc_tw_ror(
         return rslt[["Date", "Name", "Ror", "Alloc", "Ctr"]]
 
 
+def get_tw_ror_leaf(
+    df: pd.DataFrame, _attributes_needed: List[str]
+) -> pd.DataFrame:
+    # quarterly nav, prior nav and weighted flows per deal (Name), computed
+    # once for every level of the hierarchy
+    df = df[df.TransactionDate <= df.MaxNavDate]
+    dates = pd.to_datetime(df.TransactionDate).to_numpy(
+        dtype="datetime64[D]"
+    )
+    one_day = np.timedelta64(1, "D")
+    months = dates.astype("datetime64[M]")
+    quarter_start = months - months.astype(np.int64) % 3
+    lastq = quarter_start.astype("datetime64[D]") - one_day
+    thisq = (quarter_start + np.timedelta64(3, "M")).astype(
+        "datetime64[D]"
+    ) - one_day
+    weight = ((thisq - dates) + one_day) / (thisq - lastq)
+
+    is_nav = df.TransactionType.isin(TransactionTypes.R.value).to_numpy()
+    amount = df.BaseAmount.to_numpy(dtype=float)
+    quarter = quarter_start.astype(np.int64) // 3
+
+    # prior nav is the nav of the same investment in the previous quarter;
+    # like a self merge, every prior nav row pairs with every nav row
+    investment = (
+        df.groupby(
+            _attributes_needed + ["OwnerName", "InvestmentName"],
+            dropna=False,
+            sort=False,
+        )
+        .ngroup()
+        .to_numpy()
+    )
+    navs = (
+        pd.Series(amount[is_nav])
+        .groupby([investment[is_nav], quarter[is_nav]])
+        .agg(["sum", "size"])
+    )
+    prior = navs.reindex(
+        pd.MultiIndex.from_arrays(
+            [investment[is_nav], quarter[is_nav] - 1]
+        )
+    )
+    prior_nav = np.zeros(len(df))
+    prior_nav[is_nav] = prior["sum"].fillna(0).to_numpy()
+    matches = np.ones(len(df))
+    matches[is_nav] = prior["size"].fillna(1).clip(lower=1).to_numpy()
+
+    amount = np.nan_to_num(amount)
+    leaf = (
+        pd.DataFrame(
+            {
+                "Name": df.Name.to_numpy(),
+                "thisq": thisq,
+                "Nav": np.where(is_nav, amount * matches, 0),
+                "PriorNav": prior_nav,
+                "BaseAmount": np.where(is_nav, 0, amount),
+                "wAmount": np.where(is_nav, 0, weight * amount),
+            }
+        )
+        .groupby(["Name", "thisq"])
+        .sum()
+        .reset_index()
+    )
+    leaf["EndingNavAdj"] = leaf.Nav + leaf.BaseAmount
+    leaf["PriorNavAdj"] = leaf.PriorNav - leaf.wAmount
+    leaf = leaf[
+        (leaf.PriorNavAdj > 0) & (leaf.Nav > 0) & (leaf.PriorNav > 0)
+    ]
+
+    attrib = df[_attributes_needed + ["Portfolio"]].drop_duplicates()
+    leaf_with_attrib = leaf.merge(
+        attrib, how="left", left_on="Name", right_on="Name"
+    )
+    assert len(leaf) == len(leaf_with_attrib)
+    return leaf_with_attrib
+
+
 def get_horizon_irr_df_rpt(
     as_of_date: dt.date,
     df: pd.DataFrame,
@@ -1071,10 +986,16 @@ def get_horizon_irr_df_rpt(
     list_to_iterate: List[List[str]],
     _attributes_needed: List[str],
     _trailing_periods: dict,
+    group_keys: GroupKeys = None,
+    windows: TrailingWindows = None,
 ) -> pd.DataFrame:
+    if group_keys is None:
+        group_keys = GroupKeys.from_frames([df, nav_df], list_to_iterate)
+    if windows is None:
+        windows = TrailingWindows(df, nav_df)
     rslt = pd.DataFrame()
+    prior_irr = None
     for trailing_period in list(_trailing_periods.keys()):
-        print(trailing_period)
         if trailing_period in ["YTD", "QTD", "TTM"]:
             continue
         if trailing_period != "ITD":
@@ -1082,72 +1003,65 @@ def get_horizon_irr_df_rpt(
                 months=(_trailing_periods.get(trailing_period) * -3),
                 days=1,
             )
-            starting_investment = nav_df[
-                pd.to_datetime(nav_df.TransactionDate)
-                == pd.to_datetime(start_date + relativedelta(days=-1))
-            ]
-            starting_investment.BaseAmount = (
-                starting_investment.BaseAmount * -1
-            )
-            starting_investment["TransactionType"] = "T"
-
-            fund_cf_filtered = df[
-                pd.to_datetime(df.TransactionDate)
-                >= pd.to_datetime(start_date)
-            ]
-            fund_cf_filtered = pd.concat(
-                [starting_investment, fund_cf_filtered]
+            starting_investment = windows.opening(start_date)
+            fund_cf_filtered = windows.window(
+                start_date, opening=starting_investment
             )
         else:
             fund_cf_filtered = df
             starting_investment = None
 
-        for group_cols in list_to_iterate:
-            if starting_investment is not None:
-                # filter out items that don't meet full trailing period
-                full_period_groups = list(
-                    starting_investment.apply(
-                        lambda x: "_".join(
-                            [str(x[i]) for i in group_cols]
-                        ),
-                        axis=1,
-                    )
-                )
-
-                fund_cf_filtered = fund_cf_filtered[
-                    fund_cf_filtered.apply(
-                        lambda x: "_".join(
-                            [str(x[i]) for i in group_cols]
-                        ),
-                        axis=1,
-                    ).isin(full_period_groups)
-                ]
-
-            irr_data = calc_irr(
-                cf=fund_cf_filtered, group_cols=group_cols
-            )[["Name", "GrossIrr"]]
-            irr_data["Period"] = trailing_period
-            rslt = pd.concat([rslt, irr_data])
+        irr_data, prior_irr = calc_batch_irr(
+            fund_cf_filtered,
+            list_to_iterate,
+            group_keys,
+            starting_investment=starting_investment,
+            guess=prior_irr,
+        )
+        irr_data = irr_data.rename(columns={"Irr": "GrossIrr"})
+        irr_data["Period"] = trailing_period
+        rslt = pd.concat([rslt, irr_data])
     result = pivot_trailing_period_df(rslt)
     return result
 
 
-def calc_irr(cf: pd.DataFrame, group_cols=List[str], type="Gross"):
-    # all funds/deals in cfs dataframe are what the result will reflect (i.e. do filtering beforehand)
-    if len(cf) == 0:
-        return pd.DataFrame(columns=["Name", type + "Irr"])
-    if group_cols is None:
-        irr = xirr(cf[["TransactionDate", "BaseAmount"]])
-        return irr
-    else:
-        irr = cf.groupby(group_cols)[
-            ["TransactionDate", "BaseAmount"]
-        ].apply(xirr, silent=True)
-        irr = irr.reset_index().rename(columns={0: type + "Irr"})
-        irr["Name"] = irr.apply(
-            lambda x: "_".join([str(x[i]) for i in group_cols]), axis=1
-        )
-        return irr
+def calc_batch_irr(
+    cf: pd.DataFrame,
+    list_to_iterate: List[List[str]],
+    group_keys: GroupKeys,
+    date_col: str = "TransactionDate",
+    amount_col: str = "BaseAmount",
+    starting_investment: pd.DataFrame = None,
+    guess: np.ndarray = None,
+) -> tuple[pd.DataFrame, np.ndarray]:
+    # irr of every group at every level, as a single batched solve; the
+    # second item is the irr of every level category, used as a warm start
+    sizes = [len(group_keys.categories(i)) for i in list_to_iterate]
+    offsets = np.cumsum([0] + sizes[:-1])
+    codes = []
+    for group_cols, offset in zip(list_to_iterate, offsets):
+        level_codes = group_keys.codes(cf, group_cols)
+        if starting_investment is not None:
+            # filter out items that don't meet full trailing period
+            level_codes = np.where(
+                group_keys.isin(cf, starting_investment, group_cols),
+                level_codes,
+                -1,
+            )
+        codes.append(np.where(level_codes >= 0, level_codes + offset, -1))
+    codes = np.concatenate(codes)
+    irr = batch_xirr(
+        codes,
+        np.tile(cf[date_col].to_numpy(), len(list_to_iterate)),
+        np.tile(cf[amount_col].to_numpy(), len(list_to_iterate)),
+        size=sum(sizes),
+        guess=guess,
+    )
+    present = np.bincount(codes[codes >= 0], minlength=sum(sizes)) > 0
+    names = np.concatenate(
+        [group_keys.categories(i).to_numpy() for i in list_to_iterate]
+    )
+    return pd.DataFrame({"Name": names[present], "Irr": irr[present]}), irr
 
 
 def get_horizon_tvpi_df_rpt(
@@ -1157,10 +1071,16 @@ def get_horizon_tvpi_df_rpt(
     list_to_iterate: List[List[str]],
     _attributes_needed: List[str],
     _trailing_periods: dict,
+    group_keys: GroupKeys = None,
+    cube: RollupCube = None,
+    windows: TrailingWindows = None,
 ) -> pd.DataFrame:
+    if group_keys is None:
+        group_keys = GroupKeys.from_frames([df, nav_df], list_to_iterate)
+    if windows is None:
+        windows = TrailingWindows(df, nav_df)
     rslt = pd.DataFrame()
     for trailing_period in list(_trailing_periods.keys()):
-        print(trailing_period)
         if trailing_period in ["YTD", "QTD", "TTM"]:
             continue
         if trailing_period != "ITD":
@@ -1168,52 +1088,40 @@ def get_horizon_tvpi_df_rpt(
                 months=(_trailing_periods.get(trailing_period) * -3),
                 days=1,
             )
-            starting_investment = nav_df[
-                pd.to_datetime(nav_df.TransactionDate)
-                == pd.to_datetime(start_date + relativedelta(days=-1))
-            ]
-            # starting_investment = starting_investment.groupby(group_cols).BaseAmount.sum().reset_index()
-            starting_investment.BaseAmount = (
-                starting_investment.BaseAmount * -1
-            )
-            starting_investment["TransactionType"] = "T"
-
-            fund_cf_filtered = df[
-                pd.to_datetime(df.TransactionDate)
-                >= pd.to_datetime(start_date)
-            ]
-            fund_cf_filtered = pd.concat(
-                [starting_investment, fund_cf_filtered]
+            starting_investment = windows.opening(start_date)
+            fund_cf_filtered = windows.window(
+                start_date, opening=starting_investment
             )
+            period_cube = get_rollup_cube(fund_cf_filtered, group_keys)
         else:
-            fund_cf_filtered = df.copy()
             starting_investment = None
+            period_cube = (
+                cube
+                if cube is not None
+                else get_rollup_cube(df, group_keys)
+            )
 
         for group_cols in list_to_iterate:
+            multiple_df = period_cube.ratio(
+                group_cols,
+                TVPI_NUMERATOR,
+                DPI_DENOMINATOR,
+                "GrossMultiple",
+            )
             if starting_investment is not None:
-                # filter out items that don't meet full trailing period
-                full_period_groups = list(
-                    starting_investment.apply(
-                        lambda x: "_".join(
-                            [str(x[i]) for i in group_cols]
-                        ),
-                        axis=1,
-                    )
+                # filter out items that don't meet full trailing period;
+                # whole groups drop out so the rolled-up sums are unchanged
+                starting = group_keys.codes(
+                    starting_investment, group_cols
                 )
-
-                fund_cf_filtered = fund_cf_filtered[
-                    fund_cf_filtered.apply(
-                        lambda x: "_".join(
-                            [str(x[i]) for i in group_cols]
-                        ),
-                        axis=1,
-                    ).isin(full_period_groups)
+                multiple_df = multiple_df[
+                    multiple_df.Name.isin(
+                        group_keys.categories(group_cols)[
+                            starting[starting >= 0]
+                        ]
+                    )
                 ]
-
-            multiple_df = calc_multiple(
-                fund_cf_filtered, group_cols=group_cols
-            )[["Name", "GrossMultiple"]]
-            multiple_df["Period"] = trailing_period
+            multiple_df = multiple_df.assign(Period=trailing_period)
             rslt = pd.concat([rslt, multiple_df])
     result = pivot_trailing_period_df(rslt)
     return result
@@ -1223,109 +1131,53 @@ def get_dpi_df_rpt(
     df: pd.DataFrame,
     list_to_iterate: List[List[str]],
     _attributes_needed: List[str],
+    cube: RollupCube = None,
 ) -> pd.DataFrame:
+    if cube is None:
+        cube = get_rollup_cube(
+            df, GroupKeys.from_frames([df], list_to_iterate)
+        )
     dpi_df = pd.concat(
-        [calc_dpi(df, group_cols=i) for i in list_to_iterate]
+        [
+            cube.ratio(i, DPI_NUMERATOR, DPI_DENOMINATOR, "GrossDpi")
+            for i in list_to_iterate
+        ]
     )
     return dpi_df
 
 
-def calc_multiple(cf: pd.DataFrame, group_cols=List[str], type="Gross"):
-    # all funds/deals in cfs dataframe are what the result will reflect (i.e. do filtering beforehand)
-    if len(cf) == 0:
-        return pd.DataFrame(columns=["Name", type + "Multiple"])
-    if group_cols is None:
-        multiple = [
-            cf[
-                cf.TransactionType.isin(
-                    TransactionTypes.D.value + TransactionTypes.R.value
-                )
-            ].BaseAmount.sum()
-            / abs(
-                cf[
-                    cf.TransactionType.isin(TransactionTypes.T.value)
-                ].BaseAmount.sum()
-            )
-        ]
-        return multiple[0]
-    else:
-        multiple = (
-            cf[
-                cf.TransactionType.isin(
-                    TransactionTypes.D.value + TransactionTypes.R.value
-                )
-            ]
-            .groupby(group_cols)
-            .BaseAmount.sum()
-            / cf[cf.TransactionType.isin(TransactionTypes.T.value)]
-            .groupby(group_cols)
-            .BaseAmount.sum()
-            .abs()
-        )
-        multiple = multiple.reset_index().rename(
-            columns={"BaseAmount": type + "Multiple"}
-        )
-        multiple["Name"] = multiple.apply(
-            lambda x: "_".join([str(x[i]) for i in group_cols]), axis=1
-        )
-        return multiple
-
-
-def calc_dpi(cf: pd.DataFrame, group_cols=List[str], type="Gross"):
-    # all funds/deals in cfs dataframe are what the result will reflect (i.e. do filtering beforehand)
-    if len(cf) == 0:
-        return pd.DataFrame(columns=["Name", type + "Dpi"])
-    if group_cols is None:
-        dpi = [
-            cf[
-                cf.TransactionType.isin(TransactionTypes.D.value)
-            ].BaseAmount.sum()
-            / abs(
-                cf[
-                    cf.TransactionType.isin(TransactionTypes.T.value)
-                ].BaseAmount.sum()
-            )
-        ]
-        return dpi[0]
-    else:
-        dpi = (
-            cf[cf.TransactionType.isin(TransactionTypes.D.value)]
-            .groupby(group_cols)
-            .BaseAmount.sum()
-            / cf[cf.TransactionType.isin(TransactionTypes.T.value)]
-            .groupby(group_cols)
-            .BaseAmount.sum()
-            .abs()
-        )
-        dpi = dpi.reset_index().rename(
-            columns={"BaseAmount": type + "Dpi"}
-        )
-        dpi["Name"] = dpi.apply(
-            lambda x: "_".join([str(x[i]) for i in group_cols]), axis=1
-        )
-        return dpi
+def get_rollup_cube(
+    df: pd.DataFrame,
+    group_keys: GroupKeys,
+    commitment_df: pd.DataFrame = None,
+) -> RollupCube:
+    # contributions/distributions/nav (T/D/R) and commitment per deal
+    cube = RollupCube(group_keys).add_by_type(
+        df, {i.name: i.value for i in TransactionTypes}
+    )
+    if commitment_df is not None:
+        cube.add("Commitment", commitment_df, value_col="Commitment")
+    return cube
 
 
 def get_sum_df_rpt(
-    df: pd.DataFrame, list_to_iterate: List[List[str]], sum_col: str
+    df: pd.DataFrame,
+    list_to_iterate: List[List[str]],
+    sum_col: str,
+    cube: RollupCube = None,
+    measures: List[str] = None,
 ):
+    if cube is None:
+        cube = RollupCube(GroupKeys.from_frames([df], list_to_iterate))
+        cube.add(sum_col, df, value_col=sum_col)
+    if measures is None:
+        measures = [sum_col]
     sum_df = pd.concat(
-        [
-            calc_sum(df, group_cols=i, sum_col=sum_col)
-            for i in list_to_iterate
-        ]
+        [cube.total(i, measures, sum_col) for i in list_to_iterate]
     )
     return sum_df
 
 
-def calc_sum(df: pd.DataFrame, group_cols: List[str], sum_col: str):
-    rslt = df.groupby(group_cols)[sum_col].sum().reset_index()
-    rslt["Name"] = rslt.apply(
-        lambda x: "_".join([str(x[i]) for i in group_cols]), axis=1
-    )
-    return rslt
-
-
 def get_holding_periods_rpt(
     df, discount_df, list_to_iterate, _attributes_needed
 ):
@@ -1337,9 +1189,7 @@ def get_holding_periods_rpt(
         .rename(columns={"TransactionDate": "MaxNavDate"})
     )
 
-    result = pd.concat(
-        [calc_duration(discount_df, group_cols=i) for i in list_to_iterate]
-    )[["Name", "Duration"]]
+    result = calc_duration(discount_df, list_to_iterate)
     return result, max_nav_date
 
 
@@ -1356,61 +1206,101 @@ def pivot_trailing_period_df(df):
     return df_melted
 
 
-def calc_duration(discount_df, group_cols):
-    def convert_back_to_date(date):
-        date = pd.to_numeric(date, errors="coerce")
-        if np.isnan(date) or date is None:
-            return None
-        else:
-            return dt.date.fromordinal(int(date))
+def calc_duration(
+    discount_df: pd.DataFrame, list_to_iterate: List[List[str]]
+) -> pd.DataFrame:
+    # discounted-weighted average inflow and outflow dates per group, as
+    # int64 day ordinals, for every level of the hierarchy in one pass
+    types, type_names = pd.factorize(discount_df.Type, sort=True)
+    flows = np.select(
+        [
+            np.isin(type_names, TransactionTypes.T.value),
+            np.isin(
+                type_names,
+                TransactionTypes.D.value + TransactionTypes.R.value,
+            ),
+        ],
+        [0, 1],
+        default=-1,
+    )
+    rows = np.flatnonzero(
+        (types >= 0)
+        & (flows[types] >= 0)
+        & discount_df.Date.notnull().to_numpy()
+    )
+    days = (
+        pd.to_datetime(discount_df.Date.iloc[rows])
+        .to_numpy(dtype="datetime64[D]")
+        .astype(np.int64)
+        + _EPOCH_ORDINAL
+    )
+    first_day = days.min() if len(rows) else 0
+    span = days.max() - first_day + 1 if len(rows) else 1
 
-    def convert_timedelta_to_years(date_diff):
-        return (
-            None
-            if date_diff is None or date_diff is np.nan
-            else date_diff.days / 365
+    # one int64 key per (group, day, type), ordered as the sorted keys
+    keys = []
+    names = []
+    offset = 0
+    for group_cols in list_to_iterate:
+        # sorted group codes, -1 where a key is null as with groupby
+        codes = discount_df.groupby(group_cols, sort=True).ngroup()
+        codes = codes.to_numpy(dtype=np.int64)
+        first = np.unique(codes[codes >= 0], return_index=True)[1]
+        first = np.flatnonzero(codes >= 0)[first]
+        names.append(
+            composite_key(discount_df.iloc[first], group_cols).to_numpy()
         )
-
-    group_cols_extended = group_cols.copy()
-    group_cols_extended.extend(["Date", "Type"])
-    df = (
-        discount_df.groupby(group_cols_extended)
-        .Discounted.sum()
-        .reset_index()
+        codes = codes[rows]
+        keys.append(
+            np.where(
+                codes >= 0,
+                ((codes + offset) * span + days - first_day)
+                * len(type_names)
+                + types[rows],
+                -1,
+            )
+        )
+        offset += len(first)
+    names = np.concatenate(names) if names else np.array([], dtype=object)
+    keys = np.concatenate(keys) if keys else np.array([], dtype=np.int64)
+    discounted = np.tile(
+        discount_df.Discounted.to_numpy(dtype=float)[rows],
+        len(list_to_iterate),
     )
-    df["DateInt"] = [i.toordinal() for i in df.Date]
-    df["DurationCtr"] = df.DateInt * df.Discounted
-
-    inflows = df[df.Type.isin(TransactionTypes.T.value)]
-    inflows = (
-        inflows.groupby(group_cols).DurationCtr.sum()
-        / inflows.groupby(group_cols).Discounted.sum()
-    ).reset_index()
-    inflows["avg_inflow_date"] = inflows[0].apply(convert_back_to_date)
 
-    outflows = df[
-        df.Type.isin(TransactionTypes.D.value + TransactionTypes.R.value)
-    ]
-    outflows = (
-        outflows.groupby(group_cols).DurationCtr.sum()
-        / outflows.groupby(group_cols).Discounted.sum()
-    ).reset_index()
-    outflows["avg_outflow_date"] = outflows[0].apply(convert_back_to_date)
-
-    inflows.drop(0, inplace=True, axis=1)
-    outflows.drop(0, inplace=True, axis=1)
-    df_dates = inflows.merge(outflows, how="outer").drop_duplicates()
-    df_dates["DateDiff"] = (
-        df_dates.avg_outflow_date - df_dates.avg_inflow_date
+    discounted = (
+        pd.Series(discounted[keys >= 0]).groupby(keys[keys >= 0]).sum()
     )
-    df_dates["Duration"] = df_dates.DateDiff.apply(
-        convert_timedelta_to_years
+    keys = discounted.index.to_numpy(dtype=np.int64)
+    day = keys // len(type_names) % span + first_day
+    codes = keys // len(type_names) // span
+    df = pd.DataFrame(
+        {
+            "DurationCtr": day * discounted.to_numpy(),
+            "Discounted": discounted.to_numpy(),
+        }
+    ).groupby(codes * 2 + flows[keys % len(type_names)])
+    df = df.sum()
+    codes, flow = df.index.to_numpy() // 2, df.index.to_numpy() % 2
+
+    avg_date = np.full((2, offset), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_date[flow, codes] = (df.DurationCtr / df.Discounted).to_numpy()
+    # the average day is truncated to a date, as by date.fromordinal
+    valid = (
+        np.isfinite(avg_date)
+        & (avg_date >= 1)
+        & (avg_date < _MAX_ORDINAL + 1)
     )
-
-    df_dates["Name"] = df_dates.apply(
-        lambda x: "_".join([str(x[i]) for i in group_cols]), axis=1
+    avg_date = np.where(valid, np.trunc(avg_date), np.nan)
+
+    present = np.unique(codes)
+    return pd.DataFrame(
+        {
+            "Name": names[present],
+            "Duration": (avg_date[1] - avg_date[0])[present] / 365,
+        }
     )
-    return df_dates
 
 
 def recurse_down_order(
@@ -1419,46 +1309,84 @@ def recurse_down_order(
     depth: int,
     counter: int,
 ) -> pd.DataFrame:
-    final_df_cache = []
-    if df.shape[0] > 0:
-        current_grouping_struct = df.groupby(
-            group_by_list[depth], sort=False
-        )
-        for name, group in current_grouping_struct:
-            simple_frame = pd.DataFrame(
-                {
-                    "DisplayName": [name],
-                    "Layer": [depth],
-                    "Name": [group.reset_index()["Group" + str(depth)][0]],
-                    "Description": [
-                        group.reset_index()[
-                            "Group" + str(depth - 1 if depth != 0 else 0)
-                        ][0]
-                    ],
-                    "Counter": [counter],
-                }
+    # pre-order walk of the group hierarchy (each group followed by its
+    # children, siblings in order of first appearance in df), built from
+    # group codes and one lexicographic sort instead of recursion
+    levels = list(range(depth, len(group_by_list)))
+    if df.shape[0] == 0 or len(levels) == 0:
+        return None, counter
+
+    valid = np.ones(len(df), dtype=bool)
+    parent = np.zeros(len(df), dtype=np.int64)
+    row_codes = []
+    nodes = []
+    for level in levels:
+        values, uniques = pd.factorize(df[group_by_list[level]])
+        # like groupby, a null key drops the row and everything below it
+        valid &= values >= 0
+        pairs = np.where(valid, parent * (len(uniques) + 1) + values, -1)
+        # codes follow first appearance, i.e. groupby(sort=False) order
+        codes, _ = pd.factorize(pairs[valid])
+        parent = np.full(len(df), -1, dtype=np.int64)
+        parent[valid] = codes
+        row_codes.append(parent)
+        _, first_index = np.unique(codes, return_index=True)
+        nodes.append(np.flatnonzero(valid)[first_index])
+
+    keys, layers, first_rows = [], [], []
+    for i, level in enumerate(levels):
+        first_row = nodes[i]
+        keys.append(
+            np.stack(
+                [
+                    (
+                        row_codes[j][first_row]
+                        if j <= i
+                        else np.full(len(first_row), -1)
+                    )
+                    for j in range(len(levels))
+                ]
             )
-            final_df_cache.append(simple_frame)
-
-            assert type(group) is pd.DataFrame
-            reset = depth + 1
-            if group.shape[0] > 0 and depth < len(group_by_list) - 1:
-                children_data_frame, counter = recurse_down_order(
-                    df=group,
-                    group_by_list=group_by_list,
-                    depth=reset,
-                    counter=counter - 1,
-                )
-                if children_data_frame is not None:
-                    final_df_cache.append(children_data_frame)
-            else:
-                if (
-                    len(final_df_cache) == len(current_grouping_struct)
-                ) & (depth < len(group_by_list)):
-                    counter = counter - 1
-                else:
-                    pd.concat(final_df_cache), counter
+        )
+        layers.append(np.full(len(first_row), level))
+        first_rows.append(first_row)
+    keys = np.concatenate(keys, axis=1)
+    layers = np.concatenate(layers)
+    first_rows = np.concatenate(first_rows)
+    order = np.lexsort(keys[::-1])
+    keys, layers, first_rows = (
+        keys[:, order],
+        layers[order],
+        first_rows[order],
+    )
 
-    if len(final_df_cache) > 0:
-        return pd.concat(final_df_cache), counter
-    return None, counter
+    # the counter steps down after every parent group and after the last
+    # group of each set of lowest level siblings
+    is_leaf = layers == len(group_by_list) - 1
+    siblings = keys[-2] if len(levels) > 1 else np.zeros(len(layers))
+    last_sibling = np.append(
+        ~is_leaf[1:] | (siblings[1:] != siblings[:-1]), True
+    )
+    steps = np.where(is_leaf, last_sibling, True).astype(np.int64)
+    counters = counter - np.concatenate([[0], np.cumsum(steps)[:-1]])
+
+    def first_values(column_name):
+        columns = {
+            level: df[column_name(level)].to_numpy() for level in levels
+        }
+        return [
+            columns[layer][row] for layer, row in zip(layers, first_rows)
+        ]
+
+    final_df = pd.DataFrame(
+        {
+            "DisplayName": first_values(lambda x: group_by_list[x]),
+            "Layer": layers,
+            "Name": first_values(lambda x: "Group" + str(x)),
+            "Description": first_values(
+                lambda x: "Group" + str(x - 1 if x != 0 else 0)
+            ),
+            "Counter": counters,
+        }
+    )
+    return final_df, counter - steps.sum()
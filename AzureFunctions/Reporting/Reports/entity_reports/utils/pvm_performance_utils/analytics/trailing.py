@@ -0,0 +1,73 @@
+import datetime as dt
+from typing import List
+import numpy as np
+import pandas as pd
+
+
+class TrailingWindows(object):
+    """Cashflows sorted by date once so every trailing period is a slice.
+
+    ``window`` returns the cashflows on or after a period's start date, found
+    by binary search on the sorted dates, preceded by the opening NAV
+    pseudo-flow: the NAV the day before the start, negated and typed as a
+    contribution. Only ``columns`` are kept, as sorted arrays, so a period
+    costs a search and a slice rather than a date conversion, filter and
+    concat of the full frame.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        nav_df: pd.DataFrame,
+        columns: List[str] = None,
+        date_col: str = "TransactionDate",
+    ):
+        self.columns = columns or [
+            "Name",
+            "TransactionDate",
+            "TransactionType",
+            "BaseAmount",
+        ]
+        self._cf = self._sorted(df, date_col)
+        self._nav = self._sorted(nav_df, date_col)
+
+    def _sorted(
+        self, df: pd.DataFrame, date_col: str
+    ) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+        dates = pd.to_datetime(df[date_col]).to_numpy()
+        # undated rows never fall in a trailing window
+        order = np.argsort(dates, kind="stable")
+        order = order[~np.isnat(dates[order])]
+        return dates[order], {
+            i: df[i].to_numpy()[order] for i in self.columns
+        }
+
+    def opening(self, start_date: dt.date) -> pd.DataFrame:
+        dates, columns = self._nav
+        day = (
+            pd.Timestamp(start_date) - pd.Timedelta(days=1)
+        ).to_datetime64()
+        lo = np.searchsorted(dates, day, side="left")
+        hi = np.searchsorted(dates, day, side="right")
+        opening = pd.DataFrame(
+            {i: columns[i][lo:hi] for i in self.columns}
+        )
+        opening["BaseAmount"] = opening.BaseAmount * -1
+        opening["TransactionType"] = "T"
+        return opening
+
+    def window(
+        self, start_date: dt.date, opening: pd.DataFrame = None
+    ) -> pd.DataFrame:
+        if opening is None:
+            opening = self.opening(start_date)
+        dates, columns = self._cf
+        lo = np.searchsorted(
+            dates, pd.Timestamp(start_date).to_datetime64(), side="left"
+        )
+        return pd.DataFrame(
+            {
+                i: np.concatenate([opening[i].to_numpy(), columns[i][lo:]])
+                for i in self.columns
+            }
+        )
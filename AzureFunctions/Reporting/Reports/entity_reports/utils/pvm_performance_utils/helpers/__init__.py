@@ -2,6 +2,7 @@ from gcm.inv.entityhierarchy.EntityDomain.entity_domain import (
     pd,
 )
 from typing import List
+import datetime as dt
 from gcm.inv.scenario import Scenario, DaoRunner
 from gcm.inv.utils.DaoUtils.query_utils import (
     Query,
@@ -9,31 +10,101 @@ from gcm.inv.utils.DaoUtils.query_utils import (
     filter_many,
 )
 from gcm.Dao.DaoSources import DaoSource
-import numpy as np
+from pandas.api.types import union_categoricals
+from .table_cache import cached_table
+from .fx_rates import FxRates
 
 
-def get_ilevel_cfs(os_list: List[str]) -> pd.DataFrame:
+# bounded IN-lists keep each iLevel cashflow query and result set small
+ILEVEL_CHUNK_SIZE = 200
+
+
+def get_ilevel_cfs(
+    os_list: List[str],
+    as_of_date: dt.date = None,
+    chunk_size: int = None,
+    categorical: bool = False,
+) -> pd.DataFrame:
+    """iLevel cashflows of the operational series in ``os_list``.
+
+    With ``chunk_size`` the tickers are split into IN-lists of at most that
+    many, fetched one after another over the scenario's DaoRunner, whose
+    session is not thread-safe.
+    ``as_of_date`` bounds ``TransactionDate`` in SQL.
+    String columns are categorical while the chunks are combined; they are
+    returned as object columns, sharing one string per distinct value,
+    unless ``categorical`` is set.
+    """
     runner: DaoRunner = Scenario.get_attribute("dao")
     assert runner is not None
 
-    def oper(query: Query, item: DeclarativeMeta):
-        query = filter_many(query, item, "OwnerName", os_list)
+    def oper(query: Query, item: DeclarativeMeta, tickers: List[str]):
+        query = filter_many(query, item, "OwnerName", tickers)
+        if as_of_date is not None:
+            query = query.filter(item.TransactionDate <= as_of_date)
         # TODO: handle aggregate_interval and scenario for projected CFs
         return query
 
-    p = {
-        "table": "vExtendedCollapsedCashflows",
-        "schema": "iLevel",
-        "operation": lambda query, items: oper(query, items),
-    }
-    df = runner.execute(
-        params=p,
-        source=DaoSource.InvestmentsDwh,
-        operation=lambda d, pp: d.get_data(pp),
-    )
+    def fetch(tickers: List[str]) -> pd.DataFrame:
+        p = {
+            "table": "vExtendedCollapsedCashflows",
+            "schema": "iLevel",
+            "operation": lambda query, items: oper(query, items, tickers),
+        }
+        df = runner.execute(
+            params=p,
+            source=DaoSource.InvestmentsDwh,
+            operation=lambda d, pp: d.get_data(pp),
+        )
+        return _with_categories(df) if chunk_size else df
+
+    if not chunk_size:
+        return fetch(os_list)
+
+    chunks = [
+        os_list[i : i + chunk_size]
+        for i in range(0, len(os_list), chunk_size)
+    ] or [os_list]
+    df = _concat_categorical([fetch(i) for i in chunks])
+    if not categorical:
+        df = df.astype(
+            {
+                i: object
+                for i in df.columns
+                if isinstance(df[i].dtype, pd.CategoricalDtype)
+            }
+        )
     return df
 
 
+def _with_categories(df: pd.DataFrame) -> pd.DataFrame:
+    # string columns (not dates or mixed objects) become categoricals
+    return df.astype(
+        {
+            i: "category"
+            for i in df.columns
+            if df[i].dtype == object
+            and pd.api.types.infer_dtype(df[i], skipna=True) == "string"
+        }
+    )
+
+
+def _concat_categorical(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    # concat keeps a column categorical only if the categories of every
+    # chunk are identical, so union them first
+    if len(frames) == 1:
+        return frames[0]
+    columns = {}
+    for i in frames[0].columns:
+        values = [frame[i] for frame in frames]
+        if all(isinstance(v.dtype, pd.CategoricalDtype) for v in values):
+            columns[i] = union_categoricals(values)
+        else:
+            columns[i] = pd.concat(values, ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+@cached_table(date_scoped=False)
 def get_to_usd_fx_rates() -> pd.DataFrame:
     def my_dao_operation(dao, params):
         raw = """select AsOfDt Date, FromCurrcyCd, ToCurrcyCd, Multiplier from analyticsdata.FXFact
@@ -55,25 +126,14 @@ def get_to_usd_fx_rates() -> pd.DataFrame:
     return fx_rates
 
 
-def convert_amt_to_usd(df: pd.DataFrame, fx_rates: pd.DataFrame):
-    assert len(
-        df[
-            (df.TransactionDate.isin(fx_rates.Date))
-            & (df.BaseCurrency.isin(fx_rates.FromCurrcyCd))
-        ]
-    ) == len(df[df.BaseCurrency != "USD"])
-
-    df_fx = df.merge(
-        fx_rates,
-        how="left",
-        left_on=["BaseCurrency", "TransactionDate"],
-        right_on=["FromCurrcyCd", "Date"],
+def convert_amt_to_usd(df: pd.DataFrame, fx_rates: FxRates):
+    if not isinstance(fx_rates, FxRates):
+        fx_rates = FxRates(fx_rates)
+    result, missing_rates = fx_rates.convert(df)
+    # every non-USD amount needs its rate, or the report is misstated
+    assert len(missing_rates) == 0, (
+        f"No USD rate for {len(missing_rates)} currency/date pairs "
+        f"({missing_rates.Rows.sum()} rows):\n"
+        f"{missing_rates.to_string(index=False)}"
     )
-    assert len(df) == len(df_fx)
-    df_fx.Multiplier = np.where(
-        df_fx.Multiplier.isnull(), 1, df_fx.Multiplier
-    )
-    df_fx["BaseAmount"] = df_fx.BaseAmount * df_fx.Multiplier
-
-    result = df_fx[df.columns]
     return result
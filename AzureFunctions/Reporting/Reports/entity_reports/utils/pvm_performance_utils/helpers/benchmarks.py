@@ -0,0 +1,39 @@
+from typing import List
+from gcm.inv.entityhierarchy.EntityDomain.entity_domain import (
+    pd,
+)
+from .singleton_helpers import BenchmarkSlice, get_burgiss_bmarks
+
+
+class BurgissBenchmarks(object):
+    """Pivoted Burgiss benchmarks kept in memory by report date and slice.
+
+    ``prefetch`` reads all the slices a run needs for a report date in one
+    query; ``get`` hands out a stored frame and only queries for a slice
+    that has not been read yet.
+    """
+
+    def __init__(self):
+        self._frames: dict[tuple[str, BenchmarkSlice], pd.DataFrame] = {}
+
+    def prefetch(self, bmark_slices: List[BenchmarkSlice], report_date):
+        report_date = str(report_date)
+        missing = [
+            i for i in bmark_slices if (report_date, i) not in self._frames
+        ]
+        if len(missing) > 0:
+            for bmark_slice, df in get_burgiss_bmarks(
+                missing, report_date
+            ).items():
+                self._frames[(report_date, bmark_slice)] = df
+
+    def get(
+        self,
+        report_date,
+        vintage: str = "All",
+        asset_group: str = "Buyout",
+        geography_group: str = "All",
+    ) -> pd.DataFrame:
+        bmark_slice = BenchmarkSlice(asset_group, vintage, geography_group)
+        self.prefetch([bmark_slice], report_date)
+        return self._frames[(str(report_date), bmark_slice)]
@@ -0,0 +1,148 @@
+from typing import List
+import numpy as np
+import pandas as pd
+from . import _with_categories
+from .fx_rates import _factorize_days
+
+# day of undated rows; sorts last and is never within an as_of_date
+NULL_DAY = np.iinfo(np.int32).max
+_DEAL_KEY = "DealKey"
+
+
+def to_day(date) -> int:
+    # days since 1970-01-01, the int32 date of the compact schema
+    return int(np.datetime64(date, "D").astype(np.int64))
+
+
+def to_dates(days: np.ndarray) -> np.ndarray:
+    # datetime.date objects, None for undated rows
+    dates = np.where(days == NULL_DAY, 0, days).astype("datetime64[D]")
+    dates = dates.astype(object)
+    dates[days == NULL_DAY] = None
+    return dates
+
+
+class CompactCashflows(object):
+    """Cashflows in a compact schema, with deal attributes held once.
+
+    ``facts`` has a row per cashflow: strings are categoricals, the
+    transaction date is int32 days since 1970-01-01 and amounts are float64,
+    with an int32 ``DealKey`` into ``deals``, the deal dimension table,
+    which has a row per deal rather than per cashflow.
+    ``to_frame`` rebuilds the wide frame of object columns, as merging the
+    deal attributes onto every cashflow would, for the rows asked for only.
+    """
+
+    def __init__(
+        self,
+        facts: pd.DataFrame,
+        deals: pd.DataFrame,
+        columns: List[str],
+        date_col: str = "TransactionDate",
+    ):
+        self.facts = facts
+        self.deals = deals
+        self.columns = columns
+        self.date_col = date_col
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        deals: pd.DataFrame = None,
+        left_on: List[str] = None,
+        right_on: List[str] = None,
+        date_col: str = "TransactionDate",
+    ) -> "CompactCashflows":
+        facts = _with_categories(df.reset_index(drop=True))
+        codes, days = _factorize_days(facts[date_col])
+        facts[date_col] = np.append(days, NULL_DAY).astype(np.int32)[codes]
+        if deals is None:
+            facts[_DEAL_KEY] = np.zeros(len(facts), dtype=np.int32)
+            return cls(facts, pd.DataFrame(), list(df.columns), date_col)
+
+        deal_index = pd.MultiIndex.from_frame(deals[right_on])
+        cf_index = pd.MultiIndex.from_frame(df[left_on])
+        duplicated = deal_index.duplicated()
+        # a deal matching several rows would duplicate its cashflows; the
+        # repeats of deals without cashflows are dropped instead
+        assert not deal_index[duplicated].isin(cf_index).any()
+        deals = deals[~duplicated].reset_index(drop=True)
+        keys = (
+            deal_index[~duplicated].get_indexer(cf_index).astype(np.int32)
+        )
+        if (keys < 0).any():
+            # rows without a deal point at a trailing row of nulls, which
+            # also gives the deal columns the dtypes of a left merge
+            keys[keys < 0] = len(deals)
+            deals = deals.reindex(pd.RangeIndex(len(deals) + 1))
+        facts[_DEAL_KEY] = keys
+        # column names, with any suffixes, as the merge would give them
+        columns = (
+            df.iloc[:0]
+            .merge(
+                deals.iloc[:0],
+                how="left",
+                left_on=left_on,
+                right_on=right_on,
+            )
+            .columns
+        )
+        return cls(facts, deals, list(columns), date_col)
+
+    def __len__(self) -> int:
+        return len(self.facts)
+
+    @property
+    def days(self) -> np.ndarray:
+        return self.facts[self.date_col].to_numpy()
+
+    def take(self, rows: np.ndarray) -> "CompactCashflows":
+        return CompactCashflows(
+            self.facts.iloc[rows].reset_index(drop=True),
+            self.deals,
+            self.columns,
+            self.date_col,
+        )
+
+    def codes(self, col: str) -> tuple[np.ndarray, pd.Index]:
+        # codes into the distinct values of a cashflow column, -1 if null
+        values = self.facts[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            return values.cat.codes.to_numpy(), values.cat.categories
+        codes, uniques = pd.factorize(values)
+        return codes, pd.Index(uniques)
+
+    def isin(self, col: str, values) -> np.ndarray:
+        # of a cashflow or deal attribute column
+        if col in self.facts.columns:
+            return self.facts[col].isin(values).to_numpy()
+        return (
+            self.deals[col]
+            .isin(values)
+            .to_numpy()[self.facts[_DEAL_KEY].to_numpy()]
+        )
+
+    def to_frame(
+        self, rows: np.ndarray = None, columns: List[str] = None
+    ) -> pd.DataFrame:
+        """The wide frame of ``rows`` (positions), indexed by them."""
+        facts = self.facts if rows is None else self.facts.iloc[rows]
+        index = pd.RangeIndex(len(facts)) if rows is None else rows
+        keys = facts[_DEAL_KEY].to_numpy()
+        sources = [
+            (facts[i], None) for i in facts.columns if i != _DEAL_KEY
+        ] + [(None, i) for i in self.deals.columns]
+        frame = {}
+        for name, (values, deal_col) in zip(self.columns, sources):
+            if columns is not None and name not in columns:
+                continue
+            if deal_col is not None:
+                frame[name] = self.deals[deal_col].to_numpy()[keys]
+            elif values.name == self.date_col:
+                frame[name] = to_dates(values.to_numpy())
+            elif isinstance(values.dtype, pd.CategoricalDtype):
+                frame[name] = values.astype(object).to_numpy()
+            else:
+                frame[name] = values.to_numpy()
+        return pd.DataFrame(frame, index=index)
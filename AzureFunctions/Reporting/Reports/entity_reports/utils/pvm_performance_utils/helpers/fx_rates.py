@@ -0,0 +1,113 @@
+from typing import Tuple
+import numpy as np
+import pandas as pd
+
+
+def _factorize_days(dates) -> Tuple[np.ndarray, np.ndarray]:
+    # codes into the distinct dates (-1 if null), and those dates as int64
+    # days since epoch, so each distinct date is converted once
+    codes, uniques = pd.factorize(pd.Series(dates))
+    days = (
+        pd.to_datetime(pd.Series(uniques, dtype=object))
+        .to_numpy(dtype="datetime64[D]")
+        .astype(np.int64)
+    )
+    return codes, days
+
+
+class FxRates(object):
+    """FX multipliers as a currency x date matrix over sorted dates.
+
+    Rates are looked up by binary search on the date index, either on the
+    exact date or as of the date (the latest rate on or before it), so a
+    cashflow frame is converted with array lookups rather than a merge
+    against the full rate table.
+    """
+
+    def __init__(
+        self,
+        fx_rates: pd.DataFrame,
+        currency_col: str = "FromCurrcyCd",
+        date_col: str = "Date",
+        rate_col: str = "Multiplier",
+    ):
+        currencies, self.currencies = pd.factorize(
+            fx_rates[currency_col], sort=True
+        )
+        codes, days = _factorize_days(fx_rates[date_col])
+        self.dates = np.unique(days)
+        date_codes = np.searchsorted(self.dates, days)[codes]
+        keep = (currencies >= 0) & (codes >= 0)
+        self.rates = np.full(
+            (len(self.currencies), len(self.dates)), np.nan
+        )
+        self.rates[currencies[keep], date_codes[keep]] = fx_rates[
+            rate_col
+        ].to_numpy(dtype=float)[keep]
+        self._as_of_rates = None
+
+    @property
+    def as_of_rates(self) -> np.ndarray:
+        # latest available rate carried forward along the dates
+        if self._as_of_rates is None:
+            self._as_of_rates = (
+                pd.DataFrame(self.rates).ffill(axis=1).to_numpy()
+            )
+        return self._as_of_rates
+
+    def lookup(self, currencies, dates, as_of: bool = False) -> np.ndarray:
+        # NaN where the currency or a rate for the date is missing
+        currency_codes, currencies = pd.factorize(pd.Series(currencies))
+        date_codes, days = _factorize_days(dates)
+        rslt = np.full(len(date_codes), np.nan)
+        if len(self.dates) == 0:
+            return rslt
+
+        # search once per distinct currency and date, -1 if not found
+        currency_pos = self.currencies.get_indexer(currencies)
+        if as_of:
+            pos = np.searchsorted(self.dates, days, side="right") - 1
+            rates = self.as_of_rates
+        else:
+            pos = np.searchsorted(self.dates, days, side="left")
+            pos = np.minimum(pos, len(self.dates) - 1)
+            pos = np.where(self.dates[pos] == days, pos, -1)
+            rates = self.rates
+        # a trailing -1 is picked up by the null codes
+        currency_pos = np.append(currency_pos, -1)[currency_codes]
+        pos = np.append(pos, -1)[date_codes]
+        found = (currency_pos >= 0) & (pos >= 0)
+        rslt[found] = rates[currency_pos[found], pos[found]]
+        return rslt
+
+    def convert(
+        self,
+        df: pd.DataFrame,
+        amount_col: str = "BaseAmount",
+        currency_col: str = "BaseCurrency",
+        date_col: str = "TransactionDate",
+        to_currency: str = "USD",
+        as_of: bool = False,
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Amounts converted to ``to_currency`` and the missing rates.
+
+        Amounts without a rate are left as they are. The second frame
+        lists each currency and date with no rate, other than
+        ``to_currency`` itself, and its number of rows.
+        """
+        multiplier = self.lookup(df[currency_col], df[date_col], as_of)
+        unconverted = np.flatnonzero(np.isnan(multiplier))
+        missing = unconverted[
+            df[currency_col].to_numpy()[unconverted] != to_currency
+        ]
+        converted = df.reset_index(drop=True)
+        converted[amount_col] = df[amount_col].to_numpy() * np.where(
+            np.isnan(multiplier), 1, multiplier
+        )
+        missing_rates = (
+            df.iloc[missing][[currency_col, date_col]]
+            .groupby([currency_col, date_col], dropna=False, observed=True)
+            .size()
+            .reset_index(name="Rows")
+        )
+        return converted, missing_rates
@@ -0,0 +1,200 @@
+import datetime as dt
+from typing import List, Union
+import numpy as np
+import pandas as pd
+from ..analytics.standards import TransactionTypes
+from .compact_cashflows import CompactCashflows, to_dates, to_day
+
+IRR_TRANSACTION_TYPES = [
+    "Contributions - Investments and Expenses",
+    "Distributions - Recallable",
+    "Distributions - Return of Cost",
+    "Distributions - Gain/(Loss)",
+    "Distributions - Outside Interest",
+    "Distributions - Dividends and Interest",
+    "Contributions - Outside Expenses",
+    "Contributions - Contra Contributions",
+    "Contributions - Inside Expenses (DNAU)",
+    "Distributions - Escrow Receivables",
+]
+UNFUNDED_COMMITMENT = "Unfunded Commitment Without Modification"
+COMMITMENT_TRANSACTION_TYPES = [
+    "Contributions - Investments and Expenses",
+    "Distributions - Recallable",
+    "Contributions - Contra Contributions",
+    "Contributions - Outside Expenses (AU)",
+    UNFUNDED_COMMITMENT,
+    "Local Discounted Commitments (For USD Holdings in Foreign Portfolios",
+]
+_KEYS = ["OwnerName", "InvestmentName"]
+# latest NAV day of an investment without a NAV
+_NO_NAV = np.iinfo(np.int64).min
+
+
+class PreparedCashflows(object):
+    """An entity's cashflows up to ``as_of_date``, prepared once.
+
+    The latest NAV date of each investment is found once and every
+    distinct transaction type is classified once, so the IRR, NAV and
+    commitment views are boolean masks over the same compact cashflows
+    rather than a new filter, groupby and merge per view. Only the rows of
+    a view are rebuilt as a wide frame.
+    """
+
+    def __init__(
+        self,
+        df: Union[pd.DataFrame, CompactCashflows],
+        as_of_date: dt.date,
+        bounded: bool = False,
+    ):
+        # bounded: df has no cashflows after as_of_date already
+        if isinstance(df, pd.DataFrame):
+            df = CompactCashflows.from_frame(df)
+        self.as_of_date = as_of_date
+        days = df.days
+        if not bounded:
+            df = df.take(np.flatnonzero(days <= to_day(as_of_date)))
+            days = df.days
+        self.cashflows = df
+        self._days = days
+        self._type_codes, self._types = df.codes("TransactionType")
+
+        # latest NAV day of each investment, for every row of it
+        is_nav = self._of_types(TransactionTypes.R.value)
+        owner_codes, owners = df.codes(_KEYS[0])
+        investment_codes, _ = df.codes(_KEYS[1])
+        has_keys = (owner_codes >= 0) & (investment_codes >= 0)
+        pair_codes, pairs = pd.factorize(
+            np.where(
+                has_keys,
+                investment_codes.astype(np.int64) * len(owners)
+                + owner_codes,
+                -1,
+            )
+        )
+        max_nav_days = np.full(len(pairs), _NO_NAV, dtype=np.int64)
+        np.maximum.at(
+            max_nav_days,
+            pair_codes[is_nav & has_keys],
+            days[is_nav & has_keys],
+        )
+        self._max_nav_days = np.where(
+            has_keys, max_nav_days[pair_codes], _NO_NAV
+        )
+        has_max_nav = self._max_nav_days != _NO_NAV
+        self.is_nav = is_nav
+        self.to_max_nav_date = has_max_nav & (days <= self._max_nav_days)
+        self.at_max_nav_date = has_max_nav & (days == self._max_nav_days)
+
+    def _of_types(self, types: List[str]) -> np.ndarray:
+        # null types (code -1) pick up the trailing False
+        return np.append(self._types.isin(types), False)[self._type_codes]
+
+    def _frame(self, mask: np.ndarray = None) -> pd.DataFrame:
+        # the wide frame of the masked rows with their latest NAV date
+        rows = None if mask is None else np.flatnonzero(mask)
+        frame = self.cashflows.to_frame(rows)
+        max_nav_days = self._max_nav_days[
+            slice(None) if rows is None else rows
+        ]
+        max_nav_dates = to_dates(max_nav_days)
+        max_nav_dates[max_nav_days == _NO_NAV] = np.nan
+        frame["MaxNavDate"] = max_nav_dates
+        return frame
+
+    def all_cashflows(self) -> pd.DataFrame:
+        return self._frame()
+
+    def irr_cashflows(self) -> pd.DataFrame:
+        # contributions (T) and distributions (D) up to the latest NAV,
+        # sign flipped, followed by the latest NAV itself
+        irr_types = np.where(
+            self._types.str.contains("Contributions -"), "T", self._types
+        )
+        irr_types = np.where(
+            pd.Index(irr_types).str.contains("Distributions -"),
+            "D",
+            irr_types,
+        )
+        mask = self.to_max_nav_date & self._of_types(IRR_TRANSACTION_TYPES)
+        irr_cf = self._frame(mask).assign(
+            TransactionType=irr_types[self._type_codes[mask]],
+            BaseAmount=lambda x: x.BaseAmount * -1,
+        )
+        latest_reported_nav = self._frame(
+            self.at_max_nav_date & self.is_nav
+        )
+        return (
+            pd.concat([irr_cf, latest_reported_nav])
+            .sort_values("TransactionDate")
+            .reset_index(drop=True)
+        )
+
+    def nav_series(self) -> pd.DataFrame:
+        return (
+            self._frame(self.is_nav)
+            .sort_values("TransactionDate")
+            .reset_index(drop=True)
+        )
+
+    def commitments(self, deal_info: pd.DataFrame) -> pd.DataFrame:
+        # unfunded commitment at as_of_date plus the funded amounts up to
+        # the latest NAV, per investment, with the deal attributes
+        is_unfunded = self._of_types([UNFUNDED_COMMITMENT])
+        in_commitments = self._of_types(COMMITMENT_TRANSACTION_TYPES)
+        unfunded = (
+            in_commitments
+            & is_unfunded
+            & (self._days == to_day(self.as_of_date))
+        )
+        funded = in_commitments & ~is_unfunded & self.to_max_nav_date
+        commitment_df = self.cashflows.to_frame(
+            np.flatnonzero(unfunded | funded),
+            columns=_KEYS + ["BaseAmount"],
+        ).rename(columns={"BaseAmount": "Commitment"})[
+            _KEYS + ["Commitment"]
+        ]
+        is_funded = funded[unfunded | funded]
+        funded = (
+            commitment_df[is_funded].groupby(_KEYS).sum().reset_index()
+        )
+        commitment_df = (
+            pd.concat([commitment_df[~is_funded], funded])
+            .groupby(_KEYS)
+            .sum()
+            .reset_index()
+        )
+        commitment_df_rslt = commitment_df.merge(
+            deal_info,
+            how="left",
+            left_on=_KEYS,
+            right_on=["OsTicker", "ReportingName"],
+        )
+        assert len(commitment_df) == len(commitment_df_rslt)
+        return commitment_df_rslt
+
+
+class CashflowHistory(object):
+    """An entity's cashflows, prepared as of any number of dates.
+
+    Rows are ordered by transaction date once, so the cashflows up to an
+    as_of_date are a prefix found by binary search rather than a date
+    comparison over the whole history. Each cut keeps the rows in their
+    original order.
+    """
+
+    def __init__(self, df: Union[pd.DataFrame, CompactCashflows]):
+        if isinstance(df, pd.DataFrame):
+            df = CompactCashflows.from_frame(df)
+        self.cashflows = df
+        # undated rows sort last and are never within an as_of_date
+        self._order = np.argsort(df.days, kind="stable")
+        self._days = df.days[self._order]
+
+    def as_of(self, as_of_date: dt.date) -> PreparedCashflows:
+        end = np.searchsorted(self._days, to_day(as_of_date), side="right")
+        return PreparedCashflows(
+            self.cashflows.take(np.sort(self._order[:end])),
+            as_of_date,
+            bounded=True,
+        )
@@ -4,6 +4,9 @@ from gcm.inv.entityhierarchy.EntityDomain.entity_domain import (
 from gcm.inv.scenario import Scenario, DaoRunner
 from gcm.Dao.DaoSources import DaoSource
 import numpy as np
+from sqlalchemy import bindparam, text
+from typing import List, NamedTuple
+from .table_cache import cached_table
 
 
 def __runner() -> DaoRunner:
@@ -14,7 +17,13 @@ def __as_of_date() -> DaoRunner:
     return Scenario.get_attribute("as_of_date")
 
 
+@cached_table(date_scoped=False)
 def get_all_os_for_all_portfolios() -> pd.DataFrame:
+    return get_os_for_portfolios()
+
+
+def get_os_for_portfolios(portfolio_names: List[str] = None) -> pd.DataFrame:
+    # portfolio filter is applied in sql, None returns all portfolios
     def my_dao_operation(dao, params):
         raw = """
         select distinct 
@@ -26,8 +35,11 @@ def get_all_os_for_all_portfolios() -> pd.DataFrame:
             PortfolioCurrency 
             from 
         analytics.MasterEntityDataPortfolioPortfolioSeriesOperationalSeries"""
+        if portfolio_names is not None:
+            raw += """
+        where PortfolioReportingName in :names"""
         df = pd.read_sql(
-            raw,
+            _with_names(raw, portfolio_names),
             dao.data_engine.session.bind,
         )
         return df
@@ -40,9 +52,20 @@ def get_all_os_for_all_portfolios() -> pd.DataFrame:
     return portfolios
 
 
+@cached_table(date_scoped=False)
 def get_all_manager_holdings() -> pd.DataFrame:
+    return get_manager_holdings()
+
+
+def get_manager_holdings(manager_names: List[str] = None) -> pd.DataFrame:
+    # manager filter is applied in sql, None returns all managers
     def my_dao_operation(dao, params):
-        raw = """
+        manager_filter = (
+            ""
+            if manager_names is None
+            else "and [Investment Manager Legal Name] in :names"
+        )
+        raw = f"""
                 SELECT DISTINCT [Portfolio Ticker] PortfolioTicker, [Portfolio Reporting Name] PortfolioName, 
                 [Portfolio Currency] PortfolioCurrency,
                 [Operational Series Ticker] OperationalSeriesTicker, 
@@ -57,9 +80,10 @@ def get_all_manager_holdings() -> pd.DataFrame:
                 [Investment Manager Master Id] InvestmentManagerId
                 FROM [analytics].[MasterEntityDataInvestmentTrack]
                 where [Investment Manager Legal Name] is not NULL
+                {manager_filter}
                 order by [Portfolio Reporting Name], [Holding Reporting Name]"""
         df = pd.read_sql(
-            raw,
+            _with_names(raw, manager_names),
             dao.data_engine.session.bind,
         )
         return df
@@ -72,35 +96,99 @@ def get_all_manager_holdings() -> pd.DataFrame:
     return manager_df
 
 
-# all arguments are strings
+def _with_names(raw: str, names: List[str] = None):
+    # binds the names as an expanding parameter of the ":names" placeholder
+    if names is None:
+        return raw
+    return text(raw).bindparams(
+        bindparam("names", value=list(names), expanding=True)
+    )
+
+
+class BenchmarkSlice(NamedTuple):
+    asset_group: str = "Buyout"
+    vintage: str = "All"
+    geography_group: str = "All"
+
+
+_BENCHMARK_SLICE_COLUMNS = ["AssetGroup", "Vintage", "GeographyGroup"]
+
+
+# all arguments are strings; cached through _get_burgiss_bmark_facts
 def get_burgiss_bmark(
     report_date: str = None,
     vintage: str = "All",
     asset_group: str = "Buyout",
     geography_group: str = "All",
 ) -> pd.DataFrame:
+    bmark_slice = BenchmarkSlice(asset_group, vintage, geography_group)
+    return get_burgiss_bmarks([bmark_slice], report_date)[bmark_slice]
+
+
+def get_burgiss_bmarks(
+    bmark_slices: List[BenchmarkSlice], report_date: str = None
+) -> dict[BenchmarkSlice, pd.DataFrame]:
+    # latest benchmark on or before report_date of every slice in one query
     if report_date is None:
         report_date = str(Scenario.get_attribute("as_of_date"))
+    bmark_slices = list(dict.fromkeys(bmark_slices))
+    facts = _get_burgiss_bmark_facts(tuple(bmark_slices), str(report_date))
+    by_slice = dict(
+        list(facts.groupby(_BENCHMARK_SLICE_COLUMNS, sort=False))
+    )
+    return {
+        i: _format_burgiss_bmark(
+            by_slice.get(
+                (i.asset_group, i.vintage, i.geography_group),
+                facts.iloc[:0],
+            )
+        )
+        for i in bmark_slices
+    }
+
 
+@cached_table(date_scoped=False)
+def _get_burgiss_bmark_facts(
+    bmark_slices: tuple, report_date: str
+) -> pd.DataFrame:
     def my_dao_operation(dao, params):
-        # assumes max date is the same across groups strategy, vintage, or geography
-        raw = f"""
-        select * from burgiss.BenchmarkFact where
-         AssetGroup='{asset_group}'
-         and GeographyGroup='{geography_group}'
-         and Vintage = '{vintage}'
-         and Date =
-            (
-            select max(Date) from burgiss.BenchmarkFact where
-            AssetGroup='{asset_group}'
-            and GeographyGroup='{geography_group}'
-            and Vintage = '{vintage}'
-            and Date <= '{report_date}'
-            )
+        # assumes max date is the same across measures of a slice
+        raw = """
+        select f.* from burgiss.BenchmarkFact f
+        join (
+            select AssetGroup, GeographyGroup, Vintage, max(Date) MaxDate
+            from burgiss.BenchmarkFact
+            where AssetGroup in :asset_groups
+            and GeographyGroup in :geography_groups
+            and Vintage in :vintages
+            and Date <= :report_date
+            group by AssetGroup, GeographyGroup, Vintage
+        ) m on f.AssetGroup = m.AssetGroup
+            and f.GeographyGroup = m.GeographyGroup
+            and f.Vintage = m.Vintage
+            and f.Date = m.MaxDate
         """
-
         burgiss_data = pd.read_sql(
-            raw,
+            text(raw).bindparams(
+                bindparam(
+                    "asset_groups",
+                    value=list(set(i.asset_group for i in bmark_slices)),
+                    expanding=True,
+                ),
+                bindparam(
+                    "geography_groups",
+                    value=list(
+                        set(i.geography_group for i in bmark_slices)
+                    ),
+                    expanding=True,
+                ),
+                bindparam(
+                    "vintages",
+                    value=list(set(i.vintage for i in bmark_slices)),
+                    expanding=True,
+                ),
+                bindparam("report_date", value=report_date),
+            ),
             dao.data_engine.session.bind,
         )
         return burgiss_data
@@ -110,6 +198,19 @@ def get_burgiss_bmark(
         source=DaoSource.InvestmentsDwh,
         operation=my_dao_operation,
     )
+    # the in filters select every combination of the requested values
+    requested = pd.MultiIndex.from_tuples(
+        [(i.asset_group, i.vintage, i.geography_group) for i in bmark_slices]
+    )
+    return df[
+        pd.MultiIndex.from_frame(df[_BENCHMARK_SLICE_COLUMNS]).isin(
+            requested
+        )
+    ].reset_index(drop=True)
+
+
+def _format_burgiss_bmark(df: pd.DataFrame) -> pd.DataFrame:
+    # one row per statistic, one column per report measure
     report_columns = [
         "PME - S&P 500 (TR)",
         "Direct Alpha - S&P 500 (TR)",
@@ -160,6 +261,7 @@ def get_burgiss_bmark(
     return rslt
 
 
+@cached_table(date_scoped=False)
 def get_all_deal_attributes() -> pd.DataFrame:
     def my_dao_operation(dao, params):
         raw = """
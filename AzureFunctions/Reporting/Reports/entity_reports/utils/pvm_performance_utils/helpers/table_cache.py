@@ -0,0 +1,135 @@
+import functools
+import glob
+import hashlib
+import importlib.util
+import logging
+import os
+import tempfile
+import time
+from typing import Callable
+from gcm.inv.entityhierarchy.EntityDomain.entity_domain import (
+    pd,
+)
+from gcm.inv.scenario import Scenario
+
+# host-local directory shared by every worker process on the host, and the
+# age after which a cached table is read from the database again
+CACHE_DIR_SETTING = "PVM_TABLE_CACHE_DIR"
+CACHE_TTL_SETTING = "PVM_TABLE_CACHE_TTL_SECONDS"
+_DEFAULT_TTL_SECONDS = 60 * 60
+
+# tables are stored as parquet; without pyarrow nothing is cached
+_PARQUET = importlib.util.find_spec("pyarrow") is not None
+_EXTENSION = ".parquet"
+
+
+def table_cache_dir() -> str:
+    return os.environ.get(
+        CACHE_DIR_SETTING,
+        os.path.join(tempfile.gettempdir(), "pvm_table_cache"),
+    )
+
+
+def table_cache_ttl() -> float:
+    # zero or less turns the cache off
+    return float(os.environ.get(CACHE_TTL_SETTING, _DEFAULT_TTL_SECONDS))
+
+
+def _read_table(path: str) -> pd.DataFrame:
+    return pd.read_parquet(path, engine="pyarrow")
+
+
+def _write_table(df: pd.DataFrame, path: str):
+    # write next to the target and rename, so that concurrent workers
+    # never read a partially written file
+    handle, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), suffix=".tmp"
+    )
+    os.close(handle)
+    try:
+        df.to_parquet(tmp_path, engine="pyarrow")
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def cached_table(
+    func: Callable[..., pd.DataFrame] = None, *, date_scoped: bool = True
+):
+    """Cache a reference table loader's result on local disk.
+
+    Files are keyed by the loader and its arguments and, for a
+    ``date_scoped`` loader, the scenario's as_of_date. Loaders of tables
+    that do not depend on the as_of_date declare ``date_scoped=False`` and
+    share one file across dates. Files are reused by any process on the
+    host until they are older than the TTL or removed with
+    ``invalidate_cached_tables``.
+    """
+    if func is None:
+        return functools.partial(cached_table, date_scoped=date_scoped)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs) -> pd.DataFrame:
+        ttl = table_cache_ttl()
+        if ttl <= 0 or not _PARQUET:
+            return func(*args, **kwargs)
+
+        as_of_date = (
+            str(Scenario.get_attribute("as_of_date"))
+            if date_scoped
+            else "undated"
+        )
+        identity = repr(
+            (
+                func.__module__,
+                func.__qualname__,
+                args,
+                sorted(kwargs.items()),
+                as_of_date,
+            )
+        )
+        path = os.path.join(
+            table_cache_dir(),
+            "_".join(
+                [
+                    func.__name__,
+                    as_of_date,
+                    hashlib.sha1(identity.encode()).hexdigest()[:16],
+                ]
+            )
+            + _EXTENSION,
+        )
+        try:
+            if time.time() - os.path.getmtime(path) < ttl:
+                return _read_table(path)
+        except Exception:
+            # missing, expired in between or unreadable: load again
+            pass
+
+        df = func(*args, **kwargs)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_table(df, path)
+        except Exception:
+            logging.warning(
+                "Could not cache %s at %s",
+                func.__name__,
+                path,
+                exc_info=True,
+            )
+        return df
+
+    return wrapper
+
+
+def invalidate_cached_tables(func: Callable = None):
+    # remove the cached tables of one loader, or all of them
+    prefix = "" if func is None else func.__name__ + "_"
+    for path in glob.glob(
+        os.path.join(table_cache_dir(), prefix + "*" + _EXTENSION)
+    ):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
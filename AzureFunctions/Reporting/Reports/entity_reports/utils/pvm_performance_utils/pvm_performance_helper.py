@@ -5,23 +5,36 @@ from gcm.inv.entityhierarchy.EntityDomain.entity_domain import (
 )
 from Reporting.Reports.report_names import ReportNames
 from .analytics import get_performance_report_dict
+from .analytics.execution import (
+    MetricExecution,
+    metric_execution_setting,
+    metric_max_workers_setting,
+)
 from .analytics.standards import TransactionTypes
+from .analytics.group_keys import composite_key
 from .helpers import (
+    ILEVEL_CHUNK_SIZE,
     convert_amt_to_usd,
     get_ilevel_cfs,
     get_to_usd_fx_rates,
 )
+from .helpers.benchmarks import BurgissBenchmarks
+from .helpers.compact_cashflows import CompactCashflows
+from .helpers.fx_rates import FxRates
+from .helpers.prepared_cashflows import CashflowHistory, PreparedCashflows
 from .helpers.singleton_helpers import (
     get_all_os_for_all_portfolios,
     get_all_deal_attributes,
     get_all_manager_holdings,
-    get_burgiss_bmark,
+    get_manager_holdings,
+    get_os_for_portfolios,
 )
 from gcm.inv.utils.misc.table_cache_base import Singleton
+from gcm.inv.scenario import Scenario
 from typing import List
 from enum import Enum, auto
-import datetime as dt
 import numpy as np
+import datetime as dt
 from functools import cached_property
 
 
@@ -43,13 +56,25 @@ class PvmPerfomanceHelperSingleton(metaclass=Singleton):
     def usd_conversion_table(self) -> pd.DataFrame:
         return get_to_usd_fx_rates()
 
+    @cached_property
+    def usd_fx_rates(self) -> FxRates:
+        return FxRates(self.usd_conversion_table)
+
     @cached_property
     def all_deal_attributes(self) -> pd.DataFrame:
         return get_all_deal_attributes()
 
     @cached_property
+    def benchmarks(self) -> BurgissBenchmarks:
+        return BurgissBenchmarks()
+
+    @property
     def benchmark_df(self) -> pd.DataFrame:
-        return get_burgiss_bmark()
+        return self.benchmark_df_as_of(Scenario.get_attribute("as_of_date"))
+
+    def benchmark_df_as_of(self, as_of_date: dt.date) -> pd.DataFrame:
+        # default Buyout/All/All slice of a report date, e.g. when backfilling
+        return self.benchmarks.get(as_of_date)
 
 
 class PvmPerformanceHelper(object):
@@ -58,10 +83,27 @@ class PvmPerformanceHelper(object):
         entity_domain: EntityDomainTypes,
         entity_info: pd.DataFrame,
         report_name_enum: Enum,
+        metric_execution: MetricExecution = None,
+        max_workers: int = None,
+        entity_scoped_queries: bool = True,
     ):
         self.entity_domain = entity_domain
         self.entity_info = entity_info
         self.report_name_enum = report_name_enum
+        # how the metric families run, by default from the app settings
+        self.metric_execution = (
+            metric_execution_setting()
+            if metric_execution is None
+            else metric_execution
+        )
+        self.max_workers = (
+            metric_max_workers_setting() if max_workers is None else max_workers
+        )
+        # query only this entity's series/holdings; batch runs over all
+        # entities filter the full singleton tables instead
+        self.entity_scoped_queries = entity_scoped_queries
+        # latest as_of_date the cashflows have been fetched up to
+        self.cfs_as_of_date: dt.date = None
 
     class Cf_Filter_Type(Enum):
         AllCashflows = auto()
@@ -125,154 +167,60 @@ class PvmPerformanceHelper(object):
         cf_type: "Cf_Filter_Type" = Cf_Filter_Type.AllCashflows,
         reporting_type: "ReportedCfType" = ReportedCfType.RMV,
     ) -> pd.DataFrame:
+        prepared = self.prepared_cashflows(as_of_date)
+        if cf_type == PvmPerformanceHelper.Cf_Filter_Type.AllCashflows:
+            return prepared.all_cashflows()
+        if cf_type == PvmPerformanceHelper.Cf_Filter_Type.IrrCashflows:
+            return prepared.irr_cashflows()
+        if cf_type == PvmPerformanceHelper.Cf_Filter_Type.NavTimeSeries:
+            return prepared.nav_series()
+        if cf_type == PvmPerformanceHelper.Cf_Filter_Type.CommitmentSeries:
+            return prepared.commitments(self.this_entities_related_deal_info)
+
+        raise NotImplementedError()
+
+    def prepared_cashflows(self, as_of_date: dt.date) -> PreparedCashflows:
+        # built once per as_of_date and shared by the cashflow views
+        __name = "__prepared_cfs"
+        _item: PreparedCashflows = getattr(self, __name, None)
+        if _item is not None and _item.as_of_date == as_of_date:
+            return _item
+        _item = PreparedCashflows(self.entity_cfs(as_of_date), as_of_date)
+        setattr(self, __name, _item)
+        return _item
+
+    def entity_cfs(self, as_of_date: dt.date) -> CompactCashflows:
+        # this entity's USD cashflows, fetched up to at least as_of_date
+        if self.cfs_as_of_date is None or as_of_date > self.cfs_as_of_date:
+            # cashflows are bounded by as_of_date in sql, refetch if later
+            self.cfs_as_of_date = as_of_date
+            setattr(self, "__converted_cfs", None)
         # TODO: below is auto converted to USD. Make it more dynamic
         raw_df = self.converted_usd_ilevel_cfs
-        raw_df = raw_df[raw_df.TransactionDate <= as_of_date]
         if self.entity_domain == EntityDomainTypes.InvestmentManager:
-            raw_df = raw_df[
-                raw_df.InvestmentName.isin(
-                    self.related_mgr_holdings.HoldingName
+            raw_df = raw_df.take(
+                np.flatnonzero(
+                    raw_df.isin(
+                        "InvestmentName", self.related_mgr_holdings.HoldingName
+                    )
                 )
-            ]
+            )
         if self.entity_domain == EntityDomainTypes.Vertical:
             # adhoc - PE primary and co's only example below
-            raw_df = raw_df[
-                raw_df.PredominantInvestmentType.isin(
-                    [
-                        "Co-investment/Direct",
-                        "Primary Fund",
-                        # 'Secondary'
-                    ]
-                )
-            ]
-            raw_df = raw_df[
-                raw_df.PredominantAssetClass.isin(["Private Equity"])
-            ]
-
-        max_nav_date = (
-            raw_df[(raw_df.TransactionType.isin(TransactionTypes.R.value))]
-            .groupby(["OwnerName", "InvestmentName"])
-            .TransactionDate.max()
-            .reset_index()
-            .rename(columns={"TransactionDate": "MaxNavDate"})
-        )
-        raw_df = raw_df.merge(
-            max_nav_date,
-            how="left",
-            left_on=["OwnerName", "InvestmentName"],
-            right_on=["OwnerName", "InvestmentName"],
-        )
-        if cf_type == PvmPerformanceHelper.Cf_Filter_Type.AllCashflows:
-            return raw_df
-        if cf_type == PvmPerformanceHelper.Cf_Filter_Type.IrrCashflows:
-            irr_cf = raw_df[raw_df.TransactionDate <= raw_df.MaxNavDate]
-            irr_cf = irr_cf[
-                irr_cf.TransactionType.isin(
-                    [
-                        "Contributions - Investments and Expenses",
-                        "Distributions - Recallable",
-                        "Distributions - Return of Cost",
-                        "Distributions - Gain/(Loss)",
-                        "Distributions - Outside Interest",
-                        "Distributions - Dividends and Interest",
-                        "Contributions - Outside Expenses",
-                        "Contributions - Contra Contributions",
-                        "Contributions - Inside Expenses (DNAU)",
-                        "Distributions - Escrow Receivables",
-                    ]
-                )
-            ]
-            irr_cf["TransactionType"] = np.where(
-                irr_cf.TransactionType.str.contains("Contributions -"),
-                "T",
-                irr_cf.TransactionType,
-            )
-            irr_cf["TransactionType"] = np.where(
-                irr_cf.TransactionType.str.contains("Distributions -"),
-                "D",
-                irr_cf.TransactionType,
-            )
-            irr_cf.BaseAmount = irr_cf.BaseAmount * -1
-            latest_reported_nav = raw_df[
-                (raw_df.TransactionDate == raw_df.MaxNavDate)
-                & (raw_df.TransactionType.isin(TransactionTypes.R.value))
-            ]
-            irr_cf_rslt = (
-                pd.concat([irr_cf, latest_reported_nav])
-                .sort_values("TransactionDate")
-                .reset_index(drop=True)
-            )
-            return irr_cf_rslt
-        if cf_type == PvmPerformanceHelper.Cf_Filter_Type.NavTimeSeries:
-            nav_df = (
-                raw_df[
-                    raw_df.TransactionType.isin(TransactionTypes.R.value)
-                ]
-                .sort_values("TransactionDate")
-                .reset_index(drop=True)
-            )
-            return nav_df
-        if cf_type == PvmPerformanceHelper.Cf_Filter_Type.CommitmentSeries:
-            commitment_df = raw_df[
-                raw_df.TransactionType.isin(
-                    [
-                        "Contributions - Investments and Expenses",
-                        "Distributions - Recallable",
-                        "Contributions - Contra Contributions",
-                        "Contributions - Outside Expenses (AU)",
-                        "Unfunded Commitment Without Modification",
-                        "Local Discounted Commitments (For USD Holdings in Foreign Portfolios",
-                    ]
-                )
-            ].rename(columns={"BaseAmount": "Commitment"})
-            unfunded = commitment_df[
-                (
-                    commitment_df.TransactionType
-                    == "Unfunded Commitment Without Modification"
-                )
-                & (commitment_df.TransactionDate == as_of_date)
-            ]
-            funded = commitment_df[
-                (
-                    commitment_df.TransactionType
-                    != "Unfunded Commitment Without Modification"
-                )
-                & (
-                    commitment_df.TransactionDate
-                    <= commitment_df.MaxNavDate
+            raw_df = raw_df.take(
+                np.flatnonzero(
+                    raw_df.isin(
+                        "PredominantInvestmentType",
+                        [
+                            "Co-investment/Direct",
+                            "Primary Fund",
+                            # 'Secondary'
+                        ],
+                    )
+                    & raw_df.isin("PredominantAssetClass", ["Private Equity"])
                 )
-            ]
-            funded = (
-                funded[["OwnerName", "InvestmentName", "Commitment"]]
-                .groupby(["OwnerName", "InvestmentName"])
-                .sum()
-                .reset_index()
             )
-
-            commitment_df = pd.concat(
-                [
-                    unfunded[
-                        ["OwnerName", "InvestmentName", "Commitment"]
-                    ],
-                    funded,
-                ]
-            )
-            commitment_df = (
-                commitment_df.groupby(["OwnerName", "InvestmentName"])
-                .sum()
-                .reset_index()
-            )
-            commitment_df_rslt = commitment_df.merge(
-                self.this_entities_related_deal_info,
-                how="left",
-                left_on=["OwnerName", "InvestmentName"],
-                right_on=["OsTicker", "ReportingName"],
-            )
-            assert len(commitment_df) == len(commitment_df_rslt)
-
-            return commitment_df_rslt
-
-        raise NotImplementedError()
+        return raw_df
 
     @property
     def related_operational_series(self) -> pd.DataFrame:
@@ -280,26 +228,23 @@ class PvmPerformanceHelper(object):
         _item = getattr(self, __name, None)
         if _item is None:
             df: pd.DataFrame = None
-            all_os = PvmPerfomanceHelperSingleton().all_operational_series
-            all_mgrs = PvmPerfomanceHelperSingleton().all_manager_holdings
             if self.entity_domain == EntityDomainTypes.Portfolio:
-                df = all_os[
-                    all_os[f"{self.entity_domain.name}ReportingName"].isin(
-                        self.entity_info[
-                            EntityStandardNames.EntityName
-                        ].to_list()
-                    )
-                ]
+                entity_names = self.entity_info[
+                    EntityStandardNames.EntityName
+                ].to_list()
+                if self.entity_scoped_queries:
+                    df = get_os_for_portfolios(entity_names)
+                else:
+                    all_os = PvmPerfomanceHelperSingleton().all_operational_series
+                    df = all_os[
+                        all_os[f"{self.entity_domain.name}ReportingName"].isin(
+                            entity_names
+                        )
+                    ]
             elif self.entity_domain == EntityDomainTypes.InvestmentManager:
-                df = all_mgrs[
-                    all_mgrs[f"{self.entity_domain.name}Name"].isin(
-                        self.entity_info[
-                            EntityStandardNames.EntityName
-                        ].to_list()
-                    )
-                ]
+                df = self.related_mgr_holdings
             elif self.entity_domain == EntityDomainTypes.Vertical:
-                df = all_os
+                df = PvmPerfomanceHelperSingleton().all_operational_series
             setattr(self, __name, df)
 
         return getattr(self, __name, None)
@@ -311,15 +256,17 @@ class PvmPerformanceHelper(object):
         if _item is None:
             # do work to get series
             df: pd.DataFrame = None
-            all_mgrs = PvmPerfomanceHelperSingleton().all_manager_holdings
             if self.entity_domain == EntityDomainTypes.InvestmentManager:
-                df = all_mgrs[
-                    all_mgrs.InvestmentManagerName.isin(
-                        self.entity_info[
-                            EntityStandardNames.EntityName
-                        ].to_list()
-                    )
-                ]
+                entity_names = self.entity_info[
+                    EntityStandardNames.EntityName
+                ].to_list()
+                if self.entity_scoped_queries:
+                    df = get_manager_holdings(entity_names)
+                else:
+                    all_mgrs = PvmPerfomanceHelperSingleton().all_manager_holdings
+                    df = all_mgrs[
+                        all_mgrs.InvestmentManagerName.isin(entity_names)
+                    ]
             setattr(self, __name, df)
         return getattr(self, __name, None)
 
@@ -335,31 +282,44 @@ class PvmPerformanceHelper(object):
         return os_list
 
     @property
-    def associated_raw_ilevel_cfs_and_deal_data(self) -> pd.DataFrame:
-        __name = "__os_cfs"
-        _item = getattr(self, __name, None)
-        if _item is None:
-            df: pd.DataFrame = get_ilevel_cfs(self.os_tickers)
-            rslt = df.merge(
-                self.this_entities_related_deal_info,
-                how="left",
-                left_on=["OwnerName", "InvestmentName"],
-                right_on=["OsTicker", "ReportingName"],
-            )
-            assert len(rslt) == len(df)
-            setattr(self, __name, rslt)
-        return getattr(self, __name, None)
+    def associated_raw_ilevel_cfs(self) -> pd.DataFrame:
+        # string columns are categorical, see CompactCashflows
+        return get_ilevel_cfs(
+            self.os_tickers,
+            as_of_date=self.cfs_as_of_date,
+            chunk_size=ILEVEL_CHUNK_SIZE,
+            categorical=True,
+        )
+
+    def _with_deal_info(self, df: pd.DataFrame) -> CompactCashflows:
+        # deal attributes are held once per deal, not per cashflow
+        return CompactCashflows.from_frame(
+            df,
+            self.this_entities_related_deal_info,
+            left_on=["OwnerName", "InvestmentName"],
+            right_on=["OsTicker", "ReportingName"],
+        )
+
+    def use_converted_ilevel_cfs(
+        self, converted_cfs: pd.DataFrame, as_of_date: dt.date
+    ):
+        # iLevel cashflows up to as_of_date already fetched and converted to
+        # USD for several entities, e.g. by generate_components_for_entities
+        cfs = converted_cfs[converted_cfs.OwnerName.isin(self.os_tickers)]
+        self.cfs_as_of_date = as_of_date
+        setattr(self, "__prepared_cfs", None)
+        setattr(self, "__converted_cfs", self._with_deal_info(cfs))
 
     @property
-    def converted_usd_ilevel_cfs(self) -> pd.DataFrame:
+    def converted_usd_ilevel_cfs(self) -> CompactCashflows:
         __name = "__converted_cfs"
         _item = getattr(self, __name, None)
         if _item is None:
-            cfs = self.associated_raw_ilevel_cfs_and_deal_data
             converted_cfs = convert_amt_to_usd(
-                cfs, PvmPerfomanceHelperSingleton().usd_conversion_table
+                self.associated_raw_ilevel_cfs,
+                PvmPerfomanceHelperSingleton().usd_fx_rates,
             )
-            setattr(self, __name, converted_cfs)
+            setattr(self, __name, self._with_deal_info(converted_cfs))
         return getattr(self, __name, None)
 
     @property
@@ -369,14 +329,8 @@ class PvmPerformanceHelper(object):
             df = PvmPerfomanceHelperSingleton().all_deal_attributes
             filtered = df[df["OsTicker"].isin(self.os_tickers)]
             filtered["Portfolio"] = self.top_line_owner
-            filtered["Name"] = filtered.apply(
-                lambda x: "_".join(
-                    [
-                        str(x[i])
-                        for i in self.recursion_iterate_controller[-1]
-                    ]
-                ),
-                axis=1,
+            filtered["Name"] = composite_key(
+                filtered, self.recursion_iterate_controller[-1]
             )
             setattr(self, __name, filtered)
         return getattr(self, __name, None)
@@ -448,6 +402,69 @@ class PvmPerformanceHelper(object):
                 setattr(self, __name, tickers[0])
         return getattr(self, __name, None)
 
+    @classmethod
+    def generate_components_for_entities(
+        cls,
+        entity_domain: EntityDomainTypes,
+        entity_infos: List[pd.DataFrame],
+        report_name_enum: Enum,
+        as_of_date: dt.date,
+        **kwargs,
+    ) -> List[dict[str, pd.DataFrame]]:
+        """generate_components_for_this_entity for several entities.
+
+        The iLevel cashflows of all the entities' operational series are
+        fetched and converted to USD once, and the reference tables are read
+        in full once through the singleton, instead of once per entity.
+        Results are in the order of ``entity_infos``.
+        """
+        helpers: List[PvmPerformanceHelper] = [
+            cls(
+                entity_domain,
+                entity_info=entity_info,
+                report_name_enum=report_name_enum,
+                entity_scoped_queries=False,
+                **kwargs,
+            )
+            for entity_info in entity_infos
+        ]
+        os_tickers = list(
+            dict.fromkeys(i for p in helpers for i in p.os_tickers)
+        )
+        converted_cfs = convert_amt_to_usd(
+            get_ilevel_cfs(
+                os_tickers,
+                as_of_date=as_of_date,
+                chunk_size=ILEVEL_CHUNK_SIZE,
+                categorical=True,
+            ),
+            PvmPerfomanceHelperSingleton().usd_fx_rates,
+        )
+        rslt = []
+        for p in helpers:
+            p.use_converted_ilevel_cfs(converted_cfs, as_of_date)
+            rslt.append(p.generate_components_for_this_entity(as_of_date))
+        return rslt
+
+    def generate_components_for_dates(
+        self, as_of_dates: List[dt.date]
+    ) -> dict[dt.date, dict[str, pd.DataFrame]]:
+        """generate_components_for_this_entity for several as_of_dates.
+
+        The cashflow history is fetched once up to the latest date and
+        every earlier date is cut from it, instead of running the whole
+        pipeline once per date. Results are keyed by date, in date order.
+        """
+        as_of_dates = sorted(set(as_of_dates))
+        history = CashflowHistory(self.entity_cfs(as_of_dates[-1]))
+        rslt = {}
+        for as_of_date in as_of_dates:
+            setattr(self, "__prepared_cfs", history.as_of(as_of_date))
+            rslt[as_of_date] = self.generate_components_for_this_entity(
+                as_of_date
+            )
+        return rslt
+
     def generate_components_for_this_entity(
         self, as_of_date: dt.date
     ) -> dict[str, pd.DataFrame]:
@@ -495,6 +512,8 @@ class PvmPerformanceHelper(object):
             as_of_date=as_of_date,
             _attributes_needed=self.attributes_needed,
             _trailing_periods=tmp_trailing_period,
+            execution=self.metric_execution,
+            max_workers=self.max_workers,
         )
 
         # more to do on the below
@@ -507,7 +526,9 @@ class PvmPerformanceHelper(object):
                 "PortfolioName": pd.DataFrame(
                     {"PortfolioName": [self.top_line_owner]},
                 ),
-                "benchmark_df": PvmPerfomanceHelperSingleton().benchmark_df,
+                "benchmark_df": PvmPerfomanceHelperSingleton().benchmark_df_as_of(
+                    as_of_date
+                ),
             }
         )
 
@@ -46,11 +46,65 @@ class PvmPerformanceBreakoutReport(ReportStructure):
     #       2. is part of DL unique key
     #       3. determine calc and query params (x sector, x vintage & realization type etc)
 
-    def __init__(self, report_meta: ReportMeta, report_name_enum: Enum):
+    def __init__(
+        self,
+        report_meta: ReportMeta,
+        report_name_enum: Enum,
+        final_data: dict = None,
+    ):
         super().__init__(
             report_meta=report_meta, report_name=report_name_enum
         )
         self.report_name_enum = report_name_enum
+        # components data computed up front, e.g. by for_entities
+        self.final_data = final_data
+
+    @classmethod
+    def for_entities(
+        cls, report_metas: List[ReportMeta], report_name_enum: Enum
+    ) -> List["PvmPerformanceBreakoutReport"]:
+        # batch mode: the reports of several entities of the same domain
+        # computed from one shared cashflow and reference data load
+        if len(report_metas) == 1:
+            # a single entity queries only its own series, when assigned
+            return [cls(report_metas[0], report_name_enum)]
+        domains = set([i.entity_domain for i in report_metas])
+        assert len(domains) == 1
+        as_of_date: dt.date = Scenario.get_attribute("as_of_date")
+        final_data = PvmPerformanceHelper.generate_components_for_entities(
+            domains.pop(),
+            entity_infos=[i.entity_info for i in report_metas],
+            report_name_enum=report_name_enum,
+            as_of_date=as_of_date,
+        )
+        return [
+            cls(report_meta, report_name_enum, final_data=data)
+            for report_meta, data in zip(report_metas, final_data)
+        ]
+
+    @classmethod
+    def backfill(
+        cls,
+        report_meta: ReportMeta,
+        report_name_enum: Enum,
+        as_of_dates: List[dt.date],
+        write: Callable[["PvmPerformanceBreakoutReport"], object],
+    ) -> dict:
+        # one entity's reports for past as_of_dates off one cashflow load;
+        # each is written with the scenario set to its own as_of_date
+        p = PvmPerformanceHelper(
+            report_meta.entity_domain,
+            entity_info=report_meta.entity_info,
+            report_name_enum=report_name_enum,
+        )
+        final_data = p.generate_components_for_dates(as_of_dates)
+        rslt = {}
+        for as_of_date, data in final_data.items():
+            with Scenario(as_of_date=as_of_date).context():
+                rslt[as_of_date] = write(
+                    cls(report_meta, report_name_enum, final_data=data)
+                )
+        return rslt
 
     @property
     def excel_template_location(self):
@@ -116,14 +170,16 @@ class PvmPerformanceBreakoutReport(ReportStructure):
         domain = self.report_meta.entity_domain
         entity_info = self.report_meta.entity_info
 
-        p = PvmPerformanceHelper(
-            domain,
-            entity_info=entity_info,
-            report_name_enum=self.report_name_enum,
-        )
-        final_data: dict = p.generate_components_for_this_entity(
-            as_of_date,
-        )
+        final_data: dict = self.final_data
+        if final_data is None:
+            p = PvmPerformanceHelper(
+                domain,
+                entity_info=entity_info,
+                report_name_enum=self.report_name_enum,
+            )
+            final_data = p.generate_components_for_this_entity(
+                as_of_date,
+            )
 
         # TODO: DT note: I don't love that this table loop
         tables: List[ReportTable] = []
@@ -13,10 +13,10 @@ def get_component_by_type(t: ReportComponentType) -> ReportComponentBase:
         return ReportWorksheet
 
 
-def convert_component_from_dict(i: dict) -> ReportComponentBase:
+def convert_component_from_dict(i: dict, **kwargs) -> ReportComponentBase:
     # get component type:
     component_type = ReportComponentType[i["component_type"]]
     # get component by type:
     component_class = get_component_by_type(component_type)
-    component = component_class.from_dict(i)
+    component = component_class.from_dict(i, **kwargs)
     return component
@@ -2,6 +2,7 @@ from .report_component_base import (
     ReportComponentBase,
     ReportComponentType,
 )
+from .table_payload import TablePayloadFormat, dump_frame, load_frame
 import pandas as pd
 import json
 
@@ -14,6 +15,8 @@ class ReportTable(ReportComponentBase):
         render_params: "ReportTableRenderParams" = None,
     ):
         super().__init__(component_name)
+        # (payload, format) of a lazy table, see from_dict
+        self._payload: tuple[str, TablePayloadFormat] = None
         self.df = df
         if render_params is None:
             render_params = ReportTable.ReportTableRenderParams()
@@ -27,22 +30,50 @@ class ReportTable(ReportComponentBase):
     def component_type(self) -> ReportComponentType:
         return ReportComponentType.ReportTable
 
+    @property
+    def df(self) -> pd.DataFrame:
+        if self._df is None and self._payload is not None:
+            self._df = load_frame(*self._payload)
+        return self._df
+
+    @df.setter
+    def df(self, df: pd.DataFrame):
+        self._df = df
+        self._payload = None
+
+    def release(self):
+        # a lazy table drops its parsed frame, parsed again if accessed
+        if self._payload is not None:
+            self._df = None
+
     @staticmethod
-    def from_dict(d: dict, **kwargs) -> "ReportTable":
+    def from_dict(d: dict, lazy: bool = False, **kwargs) -> "ReportTable":
+        # lazy: keep the payload and parse the frame on first access
         name = d["component_name"]
-        df = pd.read_json(d["df"])
+        # payloads written before df_format are json
+        payload = (d["df"], TablePayloadFormat[d.get("df_format", "Json")])
         r: ReportTable.ReportTableRenderParams = None
         if "renderer" in d:
             r = ReportTable.ReportTableRenderParams.from_dict(
                 json.loads(d["renderer"])
             )
-        return ReportTable(name, df, r)
+        if not lazy:
+            return ReportTable(name, load_frame(*payload), r)
+        table = ReportTable(name, None, r)
+        table._payload = payload
+        return table
 
     def to_dict(self):
+        if self._df is None and self._payload is not None:
+            # a lazy table not parsed yet is written back as it was read
+            df, df_format = self._payload
+        else:
+            df, df_format = dump_frame(self.df)
         final = {
             "component_type": self.component_type.name,
             "component_name": self.component_name,
             "renderer": self.render_params.to_json(),
-            "df": self.df.to_json(),
+            "df": df,
+            "df_format": df_format.name,
         }
         return final
@@ -26,7 +26,10 @@ class ReportWorkBookHandler(ReportComponentBase):
     @staticmethod
     def from_dict(d: dict, **kwargs) -> "ReportWorkBookHandler":
         name = d["component_name"]
-        sheets = [ReportWorksheet.from_dict(x) for x in d["report_sheets"]]
+        sheets = [
+            ReportWorksheet.from_dict(x, **kwargs)
+            for x in d["report_sheets"]
+        ]
         location = d["template_location"]
         short_name: str = (
             None if "short_name" not in d else d["short_name"]
@@ -0,0 +1,53 @@
+import base64
+import importlib.util
+import io
+import os
+from enum import auto
+from gcm.inv.utils.misc.extended_enum import ExtendedEnum
+import pandas as pd
+
+# format ReportTable frames are written in, by TablePayloadFormat name
+PAYLOAD_FORMAT_SETTING = "REPORT_TABLE_PAYLOAD_FORMAT"
+
+# parquet payloads need pyarrow, otherwise frames are written as json
+_PARQUET = importlib.util.find_spec("pyarrow") is not None
+
+
+class TablePayloadFormat(ExtendedEnum):
+    # df.to_json, as read by payloads without a format
+    Json = auto()
+    # base64 encoded parquet, which keeps the dtypes
+    Parquet = auto()
+
+
+def payload_format() -> TablePayloadFormat:
+    setting = os.environ.get(PAYLOAD_FORMAT_SETTING)
+    if setting is not None:
+        return TablePayloadFormat[setting]
+    return (
+        TablePayloadFormat.Parquet if _PARQUET else TablePayloadFormat.Json
+    )
+
+
+def dump_frame(
+    df: pd.DataFrame, payload: TablePayloadFormat = None
+) -> tuple[str, TablePayloadFormat]:
+    """The frame as a string for a json document, and its format."""
+    payload = payload_format() if payload is None else payload
+    if payload == TablePayloadFormat.Parquet:
+        buffer = io.BytesIO()
+        try:
+            df.to_parquet(buffer, engine="pyarrow")
+        except (ValueError, TypeError, NotImplementedError):
+            # e.g. duplicate column names or mixed object columns
+            return dump_frame(df, TablePayloadFormat.Json)
+        return base64.b64encode(buffer.getvalue()).decode("ascii"), payload
+    return df.to_json(), TablePayloadFormat.Json
+
+
+def load_frame(s: str, payload: TablePayloadFormat) -> pd.DataFrame:
+    if payload == TablePayloadFormat.Parquet:
+        return pd.read_parquet(
+            io.BytesIO(base64.b64decode(s)), engine="pyarrow"
+        )
+    return pd.read_json(s)
@@ -178,6 +178,9 @@ class ReportStructure(SerializableBase):
         # this is to be set via overriding
         self._components = None
 
+    # report constructions ReportOrchestrator keeps in flight at once
+    fan_out_window: int = 20
+
     _display_mapping_dict = {
         EntityDomainTypes.InvestmentGroup: "PFUND",
         EntityDomainTypes.Investment: "PFUND",
@@ -260,6 +263,31 @@ class ReportStructure(SerializableBase):
     def available_metas(cls, **kwargs) -> AvailableMetas:
         raise NotImplementedError()
 
+    @classmethod
+    def for_entities(
+        cls, report_metas: List[ReportMeta], report_name_enum: Enum = None
+    ) -> List["ReportStructure"]:
+        # the reports of a batch of entities, in the order of report_metas;
+        # overridden by reports that share one data load across entities
+        return [cls(report_meta) for report_meta in report_metas]
+
+    @classmethod
+    def backfill(
+        cls,
+        report_meta: ReportMeta,
+        report_name_enum: Enum,
+        as_of_dates: List[dt.date],
+        write: Callable[["ReportStructure"], object],
+    ) -> dict:
+        # the report of each of as_of_dates, written, e.g. by
+        # utils.print_utils.print, with the scenario set to its date;
+        # overridden by reports that share one data load across dates
+        rslt = {}
+        for as_of_date in sorted(set(as_of_dates)):
+            with Scenario(as_of_date=as_of_date).context():
+                rslt[as_of_date] = write(cls(report_meta))
+        return rslt
+
     @cached_property
     def save_params(self) -> tuple[dict, DaoSource]:
         date: dt.date = Scenario.get_attribute("as_of_date")
@@ -439,13 +467,15 @@ class ReportStructure(SerializableBase):
     @classmethod
     def from_dict(cls, d: dict, **kwargs) -> "ReportStructure":
         report_name = kwargs["report_name"]
+        # lazy: tables are parsed when rendered, see ReportTable.from_dict
+        lazy: bool = kwargs.get("lazy", False)
         components: List[dict] = d["report_components"]
 
         report_meta: ReportMeta = ReportMeta.from_dict(d["report_meta"])
         storage_account_metadata: dict = d["storage_account_metadata"]
         c_list = []
         for i in components:
-            c_list.append(convert_component_from_dict(i))
+            c_list.append(convert_component_from_dict(i, lazy=lazy))
         p = cls.__new__(cls)
         p.components = c_list
         p.report_meta = report_meta
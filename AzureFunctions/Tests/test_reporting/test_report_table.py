@@ -0,0 +1,81 @@
+import datetime as dt
+import json
+import pandas as pd
+import pytest
+
+from Reporting.core.components.report_table import ReportTable
+from Reporting.core.components.table_payload import (
+    PAYLOAD_FORMAT_SETTING,
+    TablePayloadFormat,
+)
+
+
+class TestReportTable(object):
+    @staticmethod
+    def get_df() -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "Name": ["Fund A", "Fund B", None],
+                "Date": pd.to_datetime(["2022-03-31", "2022-06-30", None]),
+                "Sector": pd.Categorical(["Tech", "Health", "Tech"]),
+                "Irr": [0.12, -0.03, float("nan")],
+                "Count": [1, 2, 3],
+            }
+        )
+
+    def test_parquet_round_trip(self, monkeypatch):
+        pytest.importorskip("pyarrow")
+        monkeypatch.setenv(
+            PAYLOAD_FORMAT_SETTING, TablePayloadFormat.Parquet.name
+        )
+        df = self.get_df()
+        # through a json document, as saved by ReportConstructorActivity
+        d = json.loads(json.dumps(ReportTable("table", df).to_dict()))
+        assert d["df_format"] == TablePayloadFormat.Parquet.name
+        pd.testing.assert_frame_equal(ReportTable.from_dict(d).df, df)
+
+    def test_parquet_fallback(self, monkeypatch):
+        pytest.importorskip("pyarrow")
+        monkeypatch.setenv(
+            PAYLOAD_FORMAT_SETTING, TablePayloadFormat.Parquet.name
+        )
+        # a column mixing strings and numbers cannot be held in parquet
+        df = pd.DataFrame({"Irr": ["n/a", 0.12]})
+        d = ReportTable("table", df).to_dict()
+        assert d["df_format"] == TablePayloadFormat.Json.name
+
+    def test_json_payload(self):
+        # written before df_format, or with the setting set to Json
+        df = pd.DataFrame(
+            {"Name": ["Fund A"], "Date": [dt.date(2022, 3, 31)]}
+        )
+        d = {
+            "component_type": "ReportTable",
+            "component_name": "table",
+            "renderer": json.dumps({}),
+            "df": df.to_json(),
+        }
+        pd.testing.assert_frame_equal(
+            ReportTable.from_dict(d).df, pd.read_json(df.to_json())
+        )
+
+    def test_lazy_table(self, monkeypatch):
+        monkeypatch.setenv(
+            PAYLOAD_FORMAT_SETTING, TablePayloadFormat.Json.name
+        )
+        df = pd.DataFrame(
+            {"Name": ["Fund A", "Fund B"], "Irr": [0.1, 0.2]}
+        )
+        d = ReportTable("table", df).to_dict()
+        table = ReportTable.from_dict(d, lazy=True)
+        # written back without parsing the frame
+        assert table.to_dict() == d
+        assert table._df is None
+        pd.testing.assert_frame_equal(table.df, df)
+        table.release()
+        assert table._df is None
+        pd.testing.assert_frame_equal(table.df, df)
+        # a frame set on the table is kept
+        table.df = df
+        table.release()
+        assert table.df is df
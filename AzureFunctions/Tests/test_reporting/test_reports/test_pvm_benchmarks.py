@@ -0,0 +1,63 @@
+import pandas as pd
+
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils.helpers import (
+    singleton_helpers,
+)
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils.helpers.benchmarks import (
+    BenchmarkSlice,
+    BurgissBenchmarks,
+)
+
+
+class TestPvmBenchmarks(object):
+    @staticmethod
+    def patch_facts(monkeypatch) -> list:
+        calls = []
+
+        def get_facts(bmark_slices: tuple, report_date: str):
+            calls.append((bmark_slices, report_date))
+            return pd.DataFrame(
+                {
+                    "AssetGroup": ["Buyout", "Buyout", "Venture"],
+                    "Vintage": ["All", "All", "2015"],
+                    "GeographyGroup": ["All", "All", "All"],
+                    "Date": ["2022-09-30"] * 3,
+                    "Measure": ["IRR", "TVPI", "IRR"],
+                    "Pooled": [12.0, 1.5, 20.0],
+                    "Median": [10.0, 1.4, 15.0],
+                }
+            )
+
+        monkeypatch.setattr(
+            singleton_helpers, "_get_burgiss_bmark_facts", get_facts
+        )
+        return calls
+
+    def test_get_burgiss_bmarks(self, monkeypatch):
+        self.patch_facts(monkeypatch)
+        buyout = BenchmarkSlice()
+        venture = BenchmarkSlice("Venture", "2015")
+        growth = BenchmarkSlice("Growth")
+        rslt = singleton_helpers.get_burgiss_bmarks(
+            [buyout, venture, growth], "2022-12-31"
+        )
+        assert rslt[buyout].loc["Pooled", "IRR"] == 0.12
+        assert rslt[buyout].loc["Median", "TVPI"] == 1.4
+        assert rslt[venture].loc["Median", "IRR"] == 0.15
+        assert rslt[venture].TVPI.isnull().all()
+        # no benchmark for the slice
+        assert rslt[growth].isnull().all().all()
+        assert list(rslt[growth].columns) == list(rslt[buyout].columns)
+
+    def test_burgiss_benchmarks_store(self, monkeypatch):
+        calls = self.patch_facts(monkeypatch)
+        store = BurgissBenchmarks()
+        store.prefetch(
+            [BenchmarkSlice(), BenchmarkSlice("Venture", "2015")],
+            "2022-12-31",
+        )
+        store.get("2022-12-31")
+        store.get("2022-12-31", vintage="2015", asset_group="Venture")
+        assert len(calls) == 1
+        store.get("2023-03-31")
+        assert [i[1] for i in calls] == ["2022-12-31", "2023-03-31"]
@@ -0,0 +1,91 @@
+import datetime as dt
+import numpy as np
+import pandas as pd
+import pytest
+
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils.helpers import (
+    convert_amt_to_usd,
+)
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils.helpers.fx_rates import (
+    FxRates,
+)
+
+
+class TestPvmFxRates(object):
+    @staticmethod
+    def get_fx_rates() -> FxRates:
+        return FxRates(
+            pd.DataFrame(
+                {
+                    "FromCurrcyCd": ["EUR", "EUR", "GBP"],
+                    "Date": [
+                        dt.date(2022, 9, 30),
+                        dt.date(2022, 12, 31),
+                        dt.date(2022, 12, 31),
+                    ],
+                    "Multiplier": [0.98, 1.07, 1.21],
+                }
+            )
+        )
+
+    def test_lookup(self):
+        fx_rates = self.get_fx_rates()
+        currencies = ["EUR", "EUR", "GBP", "GBP", "JPY"]
+        dates = [
+            dt.date(2022, 12, 31),
+            dt.date(2022, 11, 30),
+            dt.date(2022, 12, 31),
+            dt.date(2022, 9, 30),
+            dt.date(2022, 12, 31),
+        ]
+        exact = fx_rates.lookup(currencies, dates)
+        np.testing.assert_array_equal(
+            exact, [1.07, np.nan, 1.21, np.nan, np.nan]
+        )
+        # as of: the latest rate on or before the date
+        as_of = fx_rates.lookup(currencies, dates, as_of=True)
+        np.testing.assert_array_equal(
+            as_of, [1.07, 0.98, 1.21, np.nan, np.nan]
+        )
+
+    def test_convert(self):
+        df = pd.DataFrame(
+            {
+                "BaseCurrency": ["EUR", "USD", "GBP", "GBP"],
+                "TransactionDate": [
+                    dt.date(2022, 12, 31),
+                    dt.date(2022, 12, 31),
+                    dt.date(2022, 11, 30),
+                    dt.date(2022, 11, 30),
+                ],
+                "BaseAmount": [100.0, 100.0, 100.0, 50.0],
+            },
+            index=[3, 2, 1, 0],
+        )
+        converted, missing_rates = self.get_fx_rates().convert(df)
+        # amounts without a rate are left unconverted
+        assert converted.BaseAmount.tolist() == [107.0, 100.0, 100.0, 50.0]
+        assert converted.index.tolist() == [0, 1, 2, 3]
+        assert missing_rates.to_dict("records") == [
+            {
+                "BaseCurrency": "GBP",
+                "TransactionDate": dt.date(2022, 11, 30),
+                "Rows": 2,
+            }
+        ]
+
+    def test_convert_amt_to_usd(self):
+        df = pd.DataFrame(
+            {
+                "BaseCurrency": ["EUR", "USD"],
+                "TransactionDate": [dt.date(2022, 9, 30)] * 2,
+                "BaseAmount": [100.0, 100.0],
+            }
+        )
+        converted = convert_amt_to_usd(df, self.get_fx_rates())
+        assert converted.BaseAmount.tolist() == [98.0, 100.0]
+        # a missing rate fails the report rather than passing the amount
+        # through in its own currency
+        df.loc[len(df)] = ["GBP", dt.date(2022, 11, 30), 50.0]
+        with pytest.raises(AssertionError, match="GBP +2022-11-30 +1"):
+            convert_amt_to_usd(df, self.get_fx_rates())
@@ -0,0 +1,63 @@
+import pandas as pd
+from gcm.inv.scenario import Scenario
+
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils import (
+    helpers,
+)
+
+
+class TestPvmIlevelCfs(object):
+    @staticmethod
+    def get_runner(monkeypatch):
+        class FakeRunner(object):
+            def __init__(self):
+                self.calls = []
+
+            def execute(self, params, source, operation):
+                # the tickers of the chunk, see the filter_many patch
+                tickers = params["operation"](None, None)
+                self.calls.append(tickers)
+                return pd.DataFrame(
+                    {
+                        "OwnerName": tickers,
+                        "TransactionType": [f"Type {i}" for i in tickers],
+                        "BaseAmount": [float(len(i)) for i in tickers],
+                    }
+                )
+
+        monkeypatch.setattr(
+            helpers,
+            "filter_many",
+            lambda query, item, column, values: list(values),
+        )
+        return FakeRunner()
+
+    def test_chunked_ilevel_cfs(self, monkeypatch):
+        runner = self.get_runner(monkeypatch)
+        os_list = ["A", "BB", "CCC", "DDDD", "EEEEE"]
+        with Scenario(dao=runner).context():
+            unchunked = helpers.get_ilevel_cfs(os_list)
+            compact = helpers.get_ilevel_cfs(
+                os_list,
+                chunk_size=2,
+                categorical=True,
+            )
+            wide = helpers.get_ilevel_cfs(os_list, chunk_size=2)
+        assert runner.calls[1:4] == [
+            ["A", "BB"],
+            ["CCC", "DDDD"],
+            ["EEEEE"],
+        ]
+        # chunks have different categories, unioned in chunk order
+        assert compact.TransactionType.dtype == "category"
+        assert list(compact.TransactionType.cat.categories) == [
+            f"Type {i}" for i in os_list
+        ]
+        pd.testing.assert_frame_equal(
+            compact.astype(
+                {"OwnerName": object, "TransactionType": object}
+            ),
+            unchunked,
+        )
+        # back to object columns
+        pd.testing.assert_frame_equal(wide, unchunked)
@@ -0,0 +1,463 @@
+import datetime as dt
+import os
+import numpy as np
+import pandas as pd
+from gcm.inv.scenario import Scenario
+from pyxirr import xirr
+
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils.analytics.group_keys import (
+    GroupKeys,
+    composite_key,
+)
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils.analytics.rollup import (
+    RollupCube,
+)
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils.analytics.batch_irr import (
+    batch_xirr,
+)
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils.analytics.trailing import (
+    TrailingWindows,
+)
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils.analytics.execution import (
+    MetricExecution,
+    run_metric_tasks,
+)
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils.analytics import (
+    get_performance_report_dict,
+    index_prices,
+    standards,
+)
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils.analytics.standards import (
+    calc_duration,
+    calc_tw_ror,
+    recurse_down_order,
+)
+
+
+class TestPvmPerformanceAnalytics(object):
+    @staticmethod
+    def get_attributes() -> pd.DataFrame:
+        df = pd.DataFrame(
+            {
+                "Portfolio": ["P", "P", "P", "P"],
+                "PredominantSector": ["Tech", "Tech", "Health", None],
+                "DealName": ["A", "B", "C", "D"],
+            }
+        )
+        df["Name"] = df.apply(
+            lambda x: "_".join(
+                [
+                    str(x[i])
+                    for i in ["Portfolio", "PredominantSector", "DealName"]
+                ]
+            ),
+            axis=1,
+        )
+        return df
+
+    def test_composite_key_matches_row_join(self):
+        df = TestPvmPerformanceAnalytics.get_attributes()
+        group_cols = ["Portfolio", "PredominantSector", "DealName"]
+        assert (composite_key(df, group_cols) == df.Name).all()
+
+    def test_group_keys_by_level(self):
+        df = TestPvmPerformanceAnalytics.get_attributes()
+        list_to_iterate = [
+            ["Portfolio"],
+            ["Portfolio", "PredominantSector"],
+            ["Portfolio", "PredominantSector", "DealName"],
+        ]
+        keys = GroupKeys(df, list_to_iterate)
+        sector = keys.key(df, list_to_iterate[1])
+        assert list(sector.astype(object)[:3]) == [
+            "P_Tech",
+            "P_Tech",
+            "P_Health",
+        ]
+        # null attributes behave like groupby and drop out of the level
+        assert sector.isnull().iloc[3]
+        assert (keys.codes(df, list_to_iterate[0]) == 0).all()
+        mask = keys.isin(df, df.iloc[[0]], list_to_iterate[1])
+        assert np.array_equal(mask, [True, True, False, False])
+
+    def test_rollup_cube_matches_groupby(self):
+        attrib = TestPvmPerformanceAnalytics.get_attributes()
+        list_to_iterate = [
+            ["Portfolio"],
+            ["Portfolio", "PredominantSector"],
+            ["Portfolio", "PredominantSector", "DealName"],
+        ]
+        cfs = attrib.loc[[0, 0, 1, 2, 2, 3]].reset_index(drop=True)
+        cfs["TransactionType"] = ["T", "D", "T", "T", "R", "T"]
+        cfs["BaseAmount"] = [-10.0, 5.0, -10.0, -4.0, 6.0, -1.0]
+        cube = RollupCube(GroupKeys(attrib, list_to_iterate)).add_by_type(
+            cfs, {"T": ["T"], "D": ["D"], "R": ["R"]}
+        )
+        contributions = cube.total(list_to_iterate[0], ["T"], "Paid")
+        assert contributions.Paid.tolist() == [-25.0]
+        dpi = cube.ratio(list_to_iterate[1], ["D"], ["T"], "Dpi")
+        dpi = dpi.set_index("Name").Dpi
+        assert dpi["P_Tech"] == 0.25
+        # no distributions in the group reads as missing, as a groupby would
+        assert np.isnan(dpi["P_Health"])
+        assert "P_None" not in dpi.index
+
+    def test_batch_xirr_matches_pyxirr(self):
+        dates = [
+            dt.date(2020, 1, 1),
+            dt.date(2021, 1, 1),
+            dt.date(2022, 6, 30),
+        ]
+        flows = [
+            [-100.0, 20.0, 110.0],
+            # several sign changes are left to pyxirr
+            [-100.0, 230.0, -132.0],
+            # no negative flow, same as pyxirr silent=True
+            [100.0, 20.0, 110.0],
+        ]
+        codes = np.repeat([0, 1, 2], len(dates))
+        rslt = batch_xirr(codes, dates * len(flows), np.concatenate(flows))
+        assert np.isclose(rslt[0], xirr(dates, flows[0]))
+        assert np.isclose(rslt[1], xirr(dates, flows[1]))
+        assert np.isnan(rslt[2])
+        # a warm start reaches the same single root
+        warm = batch_xirr(codes[:3], dates, flows[0], guess=[0.5])
+        assert np.isclose(warm[0], rslt[0])
+
+    def test_trailing_window(self):
+        cfs = pd.DataFrame(
+            {
+                "Name": ["A", "A", "B", "A"],
+                "TransactionDate": [
+                    dt.date(2022, 3, 31),
+                    dt.date(2020, 1, 1),
+                    dt.date(2022, 1, 1),
+                    dt.date(2021, 6, 30),
+                ],
+                "TransactionType": ["D", "T", "T", "D"],
+                "BaseAmount": [5.0, -10.0, -3.0, 2.0],
+            }
+        )
+        nav = pd.DataFrame(
+            {
+                "Name": ["A", "A"],
+                "TransactionDate": [
+                    dt.date(2021, 3, 31),
+                    dt.date(2022, 3, 31),
+                ],
+                "TransactionType": ["R", "R"],
+                "BaseAmount": [9.0, 7.0],
+            }
+        )
+        window = TrailingWindows(cfs, nav).window(dt.date(2021, 4, 1))
+        # opening nav as a contribution, then the flows from the start on
+        assert window.BaseAmount.tolist() == [-9.0, 2.0, -3.0, 5.0]
+        assert window.TransactionType.tolist() == ["T", "D", "T", "D"]
+
+    def test_tw_ror_by_quarter(self):
+        attrib = TestPvmPerformanceAnalytics.get_attributes().iloc[[0, 1]]
+        rows = []
+        for _, deal in attrib.iterrows():
+            for date, kind, amount in [
+                (dt.date(2022, 12, 31), "R", 100.0),
+                (dt.date(2023, 2, 14), "T", -10.0),
+                (dt.date(2023, 3, 31), "R", 120.0),
+            ]:
+                rows.append(
+                    dict(
+                        deal,
+                        OwnerName="GCM",
+                        InvestmentName=deal.DealName,
+                        TransactionDate=date,
+                        TransactionType=kind,
+                        BaseAmount=amount,
+                        MaxNavDate=dt.date(2023, 3, 31),
+                    )
+                )
+        df = pd.DataFrame(rows)
+        rslt = calc_tw_ror(
+            df,
+            group_cols=["Portfolio", "PredominantSector"],
+            _attributes_needed=["Name", "PredominantSector", "DealName"],
+        )
+        assert rslt.Date.tolist() == [dt.date(2023, 3, 31)]
+        # contribution weighted by the days it was invested in the quarter
+        weight = 46 / 90
+        expected = (120 - 10 - 100) / (100 + 10 * weight)
+        assert np.isclose(rslt.Ror.iloc[0], expected)
+        assert np.isclose(rslt.Ctr.iloc[0], expected)
+
+    def test_recurse_down_order(self):
+        df = TestPvmPerformanceAnalytics.get_attributes()
+        group_by_list = ["Portfolio", "PredominantSector", "DealName"]
+        for i in range(len(group_by_list)):
+            df["Group" + str(i)] = composite_key(
+                df, group_by_list[: i + 1]
+            )
+        ordered, counter = recurse_down_order(
+            df, group_by_list=group_by_list, depth=0, counter=0
+        )
+        # deal D has no sector so it drops out with its (null) group
+        assert ordered.DisplayName.tolist() == [
+            "P",
+            "Tech",
+            "A",
+            "B",
+            "Health",
+            "C",
+        ]
+        assert ordered.Layer.tolist() == [0, 1, 2, 2, 1, 2]
+        assert ordered.Counter.tolist() == [0, -1, -2, -2, -3, -4]
+        assert ordered.Description.tolist()[4:] == ["P", "P_Health"]
+        assert counter == -5
+
+    def test_calc_duration(self):
+        df = pd.DataFrame(
+            {
+                "Portfolio": ["P"] * 5,
+                "DealName": ["A", "A", "A", "B", "B"],
+                "Date": [
+                    dt.date(2020, 1, 1),
+                    dt.date(2020, 1, 3),
+                    dt.date(2021, 1, 1),
+                    dt.date(2020, 1, 1),
+                    dt.date(2020, 6, 30),
+                ],
+                "Type": ["T", "T", "D", "T", "Other"],
+                "Discounted": [100.0, 100.0, 250.0, 50.0, 10.0],
+            }
+        )
+        rslt = calc_duration(
+            df, [["Portfolio"], ["Portfolio", "DealName"]]
+        ).set_index("Name")
+        # A: contributions average to 2020-01-02, 365 days before 2021-01-01
+        assert rslt.Duration["P_A"] == 365 / 365
+        # P: 50 more on 2020-01-01 pulls the average inflow to the 1st
+        assert rslt.Duration["P"] == 366 / 365
+        # B has contributions only
+        assert np.isnan(rslt.Duration["P_B"])
+
+    def test_run_metric_tasks_modes(self):
+        df = self.get_attributes()
+        tasks = {
+            "names": (
+                composite_key,
+                dict(df=df, group_cols=["Portfolio"]),
+            ),
+            "sum": (np.sum, dict(a=np.arange(4))),
+        }
+        for execution in MetricExecution:
+            rslt = run_metric_tasks(tasks, execution=execution)
+            assert list(rslt.keys()) == ["names", "sum"]
+            assert rslt["names"].tolist() == ["P"] * 4
+            assert rslt["sum"] == 6
+
+    def test_index_price_store(self, monkeypatch):
+        calls = []
+        history = pd.DataFrame(
+            {
+                "Ticker": "TEST Index",
+                "Date": [
+                    i.date()
+                    for i in pd.bdate_range("2019-01-01", "2023-12-31")
+                ],
+            }
+        )
+        history["PxLast"] = np.arange(len(history), dtype=float)
+
+        def get_prices(tickers, start, end):
+            calls.append((start, end))
+            return history[(history.Date >= start) & (history.Date <= end)]
+
+        monkeypatch.setattr(index_prices, "_get_index_prices", get_prices)
+        with Scenario(as_of_date=dt.date(1999, 12, 31)).context():
+            store = index_prices.IndexPriceStore()
+            prices = store.get(
+                ["TEST Index"], dt.date(2021, 1, 1), dt.date(2022, 12, 31)
+            )["TEST Index"]
+            # saturday 2022-01-01 is nearest to friday 2021-12-31
+            full = index_prices.IndexPrices(history.Date, history.PxLast)
+            lookups = [dt.date(2021, 1, 1), dt.date(2022, 1, 1)]
+            assert (prices.price(lookups) == full.price(lookups)).all()
+            # a range held already is not read again, a wider one is
+            store.get(
+                ["TEST Index"], dt.date(2021, 6, 30), dt.date(2022, 6, 30)
+            )
+            assert len(calls) == 1
+            store.get(
+                ["TEST Index"], dt.date(2020, 6, 30), dt.date(2022, 6, 30)
+            )
+            assert len(calls) == 2
+            assert calls[1][1] >= dt.date(2022, 12, 31)
+
+    def test_direct_alpha_fund_benchmarks(self, monkeypatch):
+        attrib = TestPvmPerformanceAnalytics.get_attributes().iloc[[0, 2]]
+        tickers = dict(zip(attrib.Name, ["UP Index", "DOWN Index"]))
+        dates = [
+            i.date() for i in pd.date_range("2018-12-31", "2023-12-31")
+        ]
+        prices = {
+            "UP Index": index_prices.IndexPrices(
+                dates, np.linspace(100.0, 200.0, len(dates))
+            ),
+            "DOWN Index": index_prices.IndexPrices(
+                dates, np.linspace(200.0, 100.0, len(dates))
+            ),
+        }
+        cfs = []
+        for name in attrib.Name:
+            cfs.append(
+                pd.DataFrame(
+                    {
+                        "Name": name,
+                        "TransactionDate": [
+                            dt.date(2019, 3, 31),
+                            dt.date(2021, 6, 30),
+                            dt.date(2022, 12, 31),
+                        ],
+                        "TransactionType": ["T", "D", "Net Asset Value"],
+                        "BaseAmount": [-100.0, 30.0, 110.0],
+                    }
+                )
+            )
+        df = pd.concat(cfs, ignore_index=True).merge(attrib, on="Name")
+        nav_df = df[df.TransactionDate == dt.date(2022, 12, 31)].copy()
+        nav_df["TransactionDate"] = dt.date(2019, 12, 31)
+        nav_df["BaseAmount"] = 95.0
+
+        def format_and_get_pme_bmarks(df, _attributes_needed, dates):
+            fund_cf = df.assign(BenchmarkTicker=df.Name.map(tickers))
+            # the prices of the funds' own benchmarks only
+            return fund_cf, {
+                i: prices[i] for i in fund_cf.BenchmarkTicker.unique()
+            }
+
+        monkeypatch.setattr(
+            standards,
+            "format_and_get_pme_bmarks",
+            format_and_get_pme_bmarks,
+        )
+
+        def direct_alpha(names) -> pd.DataFrame:
+            rslt, _ = standards.get_direct_alpha_rpt(
+                as_of_date=dt.date(2022, 12, 31),
+                df=df[df.Name.isin(names)],
+                nav_df=nav_df[nav_df.Name.isin(names)],
+                list_to_iterate=[
+                    ["Portfolio", "PredominantSector", "DealName"]
+                ],
+                _attributes_needed=[
+                    "Name",
+                    "PredominantSector",
+                    "DealName",
+                ],
+                _trailing_periods={"3Y": 12, "ITD": "ITD"},
+            )
+            return rslt.set_index("Name")
+
+        together = direct_alpha(list(attrib.Name))
+        # each fund's trailing start NAV grows with its own benchmark, as
+        # when the fund is run on its own
+        for name in attrib.Name:
+            alone = direct_alpha([name])
+            assert np.isclose(
+                together.loc[name, "3Y_DirectAlpha"],
+                alone.loc[name, "3Y_DirectAlpha"],
+            )
+
+    def test_pme_prices_read_once(self, monkeypatch):
+        attrib = TestPvmPerformanceAnalytics.get_attributes().iloc[[0, 2]]
+        as_of_date = dt.date(2022, 12, 31)
+        attrib = attrib.assign(
+            OwnerName="OS1",
+            InvestmentName=attrib.DealName,
+            MaxNavDate=as_of_date,
+        )
+        quarters = [
+            i.date()
+            for i in pd.date_range("2018-03-31", as_of_date, freq="Q")
+        ]
+        navs = pd.DataFrame(
+            [
+                (name, q, "Net Asset Value", 100.0 + 2 * j + k)
+                for k, name in enumerate(attrib.Name)
+                for j, q in enumerate(quarters)
+            ],
+            columns=[
+                "Name",
+                "TransactionDate",
+                "TransactionType",
+                "BaseAmount",
+            ],
+        ).merge(attrib, on="Name")
+        flows = pd.DataFrame(
+            [
+                (name, dt.date(2018, 1, 15), "T", -100.0)
+                for name in attrib.Name
+            ]
+            + [
+                (name, dt.date(2021, 5, 15), "D", 20.0)
+                for name in attrib.Name
+            ],
+            columns=[
+                "Name",
+                "TransactionDate",
+                "TransactionType",
+                "BaseAmount",
+            ],
+        ).merge(attrib, on="Name")
+        irr_cfs = pd.concat(
+            [flows, navs[navs.TransactionDate == as_of_date]]
+        )
+        full_cfs = pd.concat([flows, navs])
+        commitment_df = attrib.assign(Commitment=[150.0, 120.0])
+        dates = [
+            i.date() for i in pd.bdate_range("2017-12-31", "2023-12-31")
+        ]
+        calls = []
+
+        def get_index_prices(tickers, start, end):
+            calls.append(os.getpid())
+            return {
+                i: index_prices.IndexPrices(
+                    dates, np.linspace(100.0, 180.0, len(dates))
+                )
+                for i in tickers
+            }
+
+        monkeypatch.setattr(
+            standards, "get_index_prices", get_index_prices
+        )
+        group_cols = ["Portfolio", "PredominantSector", "DealName"]
+        rslt = {}
+        for execution in MetricExecution:
+            rslt[execution] = get_performance_report_dict(
+                owner="P",
+                list_to_iterate=[group_cols[: i + 1] for i in range(3)],
+                full_cfs=full_cfs,
+                irr_cfs=irr_cfs,
+                commitment_df=commitment_df,
+                nav_df=navs,
+                as_of_date=as_of_date,
+                _attributes_needed=[
+                    "Name",
+                    "PredominantSector",
+                    "DealName",
+                ],
+                _trailing_periods={
+                    "QTD": 1,
+                    "TTM": 4,
+                    "3Y": 12,
+                    "ITD": "ITD",
+                },
+                execution=execution,
+                max_workers=2,
+            )
+        # prices are read once per report, by the caller, never in a worker
+        assert calls == [os.getpid()] * len(MetricExecution)
+        for execution in MetricExecution:
+            pd.testing.assert_frame_equal(
+                rslt[execution]["Data"],
+                rslt[MetricExecution.Serial]["Data"],
+            )
+        assert rslt[MetricExecution.Serial]["Data"].ITD_KsPme.notna().any()
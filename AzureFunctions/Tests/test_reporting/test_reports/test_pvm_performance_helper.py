@@ -0,0 +1,268 @@
+import datetime as dt
+import pandas as pd
+
+from Reporting.Reports.report_names import ReportNames
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils import (
+    pvm_performance_helper,
+)
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils.pvm_performance_helper import (
+    EntityDomainTypes,
+    PvmPerformanceHelper,
+)
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils.analytics.execution import (
+    METRIC_EXECUTION_SETTING,
+    METRIC_MAX_WORKERS_SETTING,
+    MetricExecution,
+)
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils.helpers.fx_rates import (
+    FxRates,
+)
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils.helpers.prepared_cashflows import (
+    UNFUNDED_COMMITMENT,
+)
+
+
+class TestPvmPerformanceHelper(object):
+    as_of_date = dt.date(2022, 12, 31)
+    report_name = ReportNames.PE_Portfolio_Performance_x_Sector
+
+    @staticmethod
+    def get_os() -> pd.DataFrame:
+        # OS2 is held by both portfolios
+        return pd.DataFrame(
+            {
+                "PortfolioReportingName": ["P1", "P1", "P2", "P2"],
+                "PortfolioTicker": ["T1", "T1", "T2", "T2"],
+                "OperationalSeriesTicker": ["OS1", "OS2", "OS2", "OS3"],
+            }
+        )
+
+    @staticmethod
+    def get_cfs() -> pd.DataFrame:
+        contribution = "Contributions - Investments and Expenses"
+        nav = "Net Asset Value"
+        rows = [
+            ("OS1", "Fund A", dt.date(2021, 3, 31), contribution, 100.0),
+            ("OS1", "Fund A", dt.date(2022, 9, 30), nav, 110.0),
+            (
+                "OS1",
+                "Fund A",
+                dt.date(2022, 12, 31),
+                UNFUNDED_COMMITMENT,
+                5.0,
+            ),
+            ("OS2", "Fund B", dt.date(2021, 6, 30), contribution, 50.0),
+            ("OS2", "Fund B", dt.date(2022, 6, 30), nav, 45.0),
+            ("OS2", "Fund B", dt.date(2022, 9, 30), nav, 60.0),
+            ("OS3", "Fund C", dt.date(2022, 3, 31), contribution, 80.0),
+            ("OS3", "Fund C", dt.date(2022, 9, 30), nav, 90.0),
+            ("OS3", "Fund C", dt.date(2023, 3, 31), nav, 95.0),
+        ]
+        df = pd.DataFrame(
+            rows,
+            columns=[
+                "OwnerName",
+                "InvestmentName",
+                "TransactionDate",
+                "TransactionType",
+                "BaseAmount",
+            ],
+        )
+        df["BaseCurrency"] = [
+            "EUR" if i == "OS2" else "USD" for i in df.OwnerName
+        ]
+        return df
+
+    @staticmethod
+    def get_deal_attributes() -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "OsTicker": ["OS1", "OS2", "OS3"],
+                "ReportingName": ["Fund A", "Fund B", "Fund C"],
+                "DealName": ["Deal A", "Deal B", "Deal C"],
+                "PredominantSector": ["Tech", "Health", "Tech"],
+            }
+        )
+
+    def patch_sources(self, monkeypatch) -> dict:
+        calls = {"get_ilevel_cfs": [], "convert_amt_to_usd": 0}
+        all_os = self.get_os()
+        cfs = self.get_cfs()
+        convert_amt_to_usd = pvm_performance_helper.convert_amt_to_usd
+
+        class FakeSingleton(object):
+            _OS_Series_Identifier = "OperationalSeriesTicker"
+            all_operational_series = all_os
+            all_deal_attributes = self.get_deal_attributes()
+            usd_fx_rates = FxRates(
+                pd.DataFrame(
+                    {
+                        "FromCurrcyCd": ["EUR"] * 5,
+                        "Date": [
+                            dt.date(2021, 6, 30),
+                            dt.date(2022, 6, 30),
+                            dt.date(2022, 9, 30),
+                            dt.date(2022, 12, 31),
+                            dt.date(2023, 3, 31),
+                        ],
+                        "Multiplier": [1.2, 1.05, 0.98, 1.07, 1.09],
+                    }
+                )
+            )
+
+            def benchmark_df_as_of(self, as_of_date):
+                return pd.DataFrame({"Date": [as_of_date]})
+
+        def get_ilevel_cfs(os_list, as_of_date=None, **kwargs):
+            calls["get_ilevel_cfs"].append(list(os_list))
+            return cfs[
+                cfs.OwnerName.isin(os_list)
+                & (cfs.TransactionDate <= as_of_date)
+            ]
+
+        def convert(df, fx_rates):
+            calls["convert_amt_to_usd"] += 1
+            return convert_amt_to_usd(df, fx_rates)
+
+        def get_performance_report_dict(**kwargs):
+            calls["execution"] = (
+                kwargs["execution"],
+                kwargs["max_workers"],
+            )
+            # the cashflows the analytics are run on
+            return {
+                i: kwargs[i]
+                for i in ["irr_cfs", "nav_df", "commitment_df"]
+            }
+
+        monkeypatch.setattr(
+            pvm_performance_helper,
+            "PvmPerfomanceHelperSingleton",
+            FakeSingleton,
+        )
+        monkeypatch.setattr(
+            pvm_performance_helper,
+            "get_os_for_portfolios",
+            lambda names: all_os[
+                all_os.PortfolioReportingName.isin(names)
+            ],
+        )
+        monkeypatch.setattr(
+            pvm_performance_helper, "get_ilevel_cfs", get_ilevel_cfs
+        )
+        monkeypatch.setattr(
+            pvm_performance_helper, "convert_amt_to_usd", convert
+        )
+        monkeypatch.setattr(
+            pvm_performance_helper,
+            "get_performance_report_dict",
+            get_performance_report_dict,
+        )
+        return calls
+
+    @staticmethod
+    def get_entity_info(name: str) -> pd.DataFrame:
+        return pd.DataFrame({"EntityName": [name]})
+
+    @staticmethod
+    def assert_components_equal(left: dict, right: dict):
+        def plain(df: pd.DataFrame) -> pd.DataFrame:
+            # categories of a shared fetch span every entity
+            categorical = [
+                i
+                for i in df.columns
+                if isinstance(df[i].dtype, pd.CategoricalDtype)
+            ]
+            return df.astype({i: object for i in categorical}).reset_index(
+                drop=True
+            )
+
+        assert list(left) == list(right)
+        for k in left:
+            assert len(left[k]) > 0
+            pd.testing.assert_frame_equal(plain(left[k]), plain(right[k]))
+
+    def test_components_for_entities(self, monkeypatch):
+        calls = self.patch_sources(monkeypatch)
+        entity_infos = [self.get_entity_info(i) for i in ["P1", "P2"]]
+        separate = [
+            PvmPerformanceHelper(
+                EntityDomainTypes.Portfolio,
+                entity_info=i,
+                report_name_enum=self.report_name,
+            ).generate_components_for_this_entity(self.as_of_date)
+            for i in entity_infos
+        ]
+        assert len(calls["get_ilevel_cfs"]) == 2
+
+        calls["get_ilevel_cfs"].clear()
+        calls["convert_amt_to_usd"] = 0
+        batch = PvmPerformanceHelper.generate_components_for_entities(
+            EntityDomainTypes.Portfolio,
+            entity_infos=entity_infos,
+            report_name_enum=self.report_name,
+            as_of_date=self.as_of_date,
+        )
+        # one fetch and conversion for both entities, OS2 fetched once
+        assert calls["get_ilevel_cfs"] == [["OS1", "OS2", "OS3"]]
+        assert calls["convert_amt_to_usd"] == 1
+        assert len(batch) == len(separate)
+        for left, right in zip(batch, separate):
+            self.assert_components_equal(left, right)
+        assert batch[0]["PortfolioName"].PortfolioName.tolist() == ["T1"]
+        assert batch[1]["PortfolioName"].PortfolioName.tolist() == ["T2"]
+
+    def test_components_for_dates(self, monkeypatch):
+        calls = self.patch_sources(monkeypatch)
+        as_of_dates = [dt.date(2022, 9, 30), self.as_of_date]
+
+        def get_helper() -> PvmPerformanceHelper:
+            return PvmPerformanceHelper(
+                EntityDomainTypes.Portfolio,
+                entity_info=self.get_entity_info("P2"),
+                report_name_enum=self.report_name,
+            )
+
+        separate = [
+            get_helper().generate_components_for_this_entity(i)
+            for i in as_of_dates
+        ]
+        calls["get_ilevel_cfs"].clear()
+        p = get_helper()
+        fetched = []
+        entity_cfs = p.entity_cfs
+
+        def fetch(as_of_date):
+            fetched.append(as_of_date)
+            return entity_cfs(as_of_date)
+
+        monkeypatch.setattr(p, "entity_cfs", fetch)
+        by_date = p.generate_components_for_dates(as_of_dates[::-1])
+        # the history up to the latest date is fetched once
+        assert fetched == [self.as_of_date]
+        assert len(calls["get_ilevel_cfs"]) == 1
+        assert list(by_date) == as_of_dates
+        for left, right in zip(by_date.values(), separate):
+            self.assert_components_equal(left, right)
+
+    def test_metric_execution_setting(self, monkeypatch):
+        calls = self.patch_sources(monkeypatch)
+        p = PvmPerformanceHelper(
+            EntityDomainTypes.Portfolio,
+            entity_info=self.get_entity_info("P1"),
+            report_name_enum=self.report_name,
+        )
+        p.generate_components_for_this_entity(self.as_of_date)
+        assert calls["execution"] == (MetricExecution.Serial, None)
+        # as set for the function app, e.g. from the plan's core count
+        monkeypatch.setenv(
+            METRIC_EXECUTION_SETTING, MetricExecution.Processes.value
+        )
+        monkeypatch.setenv(METRIC_MAX_WORKERS_SETTING, "2")
+        PvmPerformanceHelper.generate_components_for_entities(
+            EntityDomainTypes.Portfolio,
+            entity_infos=[self.get_entity_info("P1")],
+            report_name_enum=self.report_name,
+            as_of_date=self.as_of_date,
+        )
+        assert calls["execution"] == (MetricExecution.Processes, 2)
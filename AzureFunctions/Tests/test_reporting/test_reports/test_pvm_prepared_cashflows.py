@@ -0,0 +1,136 @@
+import datetime as dt
+import pandas as pd
+import pytest
+
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils.helpers.compact_cashflows import (
+    CompactCashflows,
+)
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils.helpers.prepared_cashflows import (
+    CashflowHistory,
+    PreparedCashflows,
+    UNFUNDED_COMMITMENT,
+)
+
+
+class TestPvmPreparedCashflows(object):
+    @staticmethod
+    def get_cfs() -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "OwnerName": ["OS1"] * 6,
+                "InvestmentName": ["Fund"] * 6,
+                "TransactionDate": [
+                    dt.date(2021, 3, 31),
+                    dt.date(2022, 6, 30),
+                    dt.date(2022, 9, 30),
+                    dt.date(2022, 9, 30),
+                    dt.date(2022, 12, 31),
+                    dt.date(2023, 3, 31),
+                ],
+                "TransactionType": [
+                    "Contributions - Investments and Expenses",
+                    "Distributions - Return of Cost",
+                    "Net Asset Value",
+                    "Contributions - Investments and Expenses",
+                    UNFUNDED_COMMITMENT,
+                    "Net Asset Value",
+                ],
+                "BaseAmount": [100.0, -20.0, 90.0, 10.0, 40.0, 95.0],
+            }
+        )
+
+    def get_prepared(self) -> PreparedCashflows:
+        return PreparedCashflows(self.get_cfs(), dt.date(2022, 12, 31))
+
+    def test_views(self):
+        prepared = self.get_prepared()
+        # the 2023 NAV is after as_of_date
+        assert len(prepared.all_cashflows()) == 5
+        assert (
+            prepared.all_cashflows().MaxNavDate == dt.date(2022, 9, 30)
+        ).all()
+
+        irr_cfs = prepared.irr_cashflows()
+        assert sorted(
+            zip(irr_cfs.TransactionType, irr_cfs.BaseAmount)
+        ) == [
+            ("D", 20.0),
+            ("Net Asset Value", 90.0),
+            ("T", -100.0),
+            ("T", -10.0),
+        ]
+        assert prepared.nav_series().BaseAmount.tolist() == [90.0]
+
+    def test_commitments(self):
+        deal_info = pd.DataFrame(
+            {"OsTicker": ["OS1"], "ReportingName": ["Fund"], "Deal": ["D"]}
+        )
+        commitments = self.get_prepared().commitments(deal_info)
+        # funded contributions up to the latest NAV plus the unfunded
+        # commitment at as_of_date
+        assert commitments.Commitment.tolist() == [150.0]
+        assert commitments.Deal.tolist() == ["D"]
+
+    def test_history_as_of(self):
+        df = self.get_cfs().iloc[::-1]
+        history = CashflowHistory(df)
+        for as_of_date in [
+            dt.date(2020, 12, 31),
+            dt.date(2022, 9, 30),
+            dt.date(2023, 3, 31),
+        ]:
+            pd.testing.assert_frame_equal(
+                history.as_of(as_of_date).all_cashflows(),
+                PreparedCashflows(df, as_of_date).all_cashflows(),
+            )
+
+    def test_compact_cashflows(self):
+        df = self.get_cfs()
+        df.loc[5, "InvestmentName"] = "Other"
+        deal_info = pd.DataFrame(
+            {
+                "OsTicker": ["OS1"],
+                "ReportingName": ["Fund"],
+                "DealId": [7],
+                "PredominantSector": ["Tech"],
+            }
+        )
+        keys = dict(
+            left_on=["OwnerName", "InvestmentName"],
+            right_on=["OsTicker", "ReportingName"],
+        )
+        compact = CompactCashflows.from_frame(df, deal_info, **keys)
+        assert compact.facts.TransactionType.dtype == "category"
+        assert compact.facts.TransactionDate.dtype == "int32"
+        assert len(compact.deals) == 2
+        # the same wide frame as merging the deal attributes on every row
+        pd.testing.assert_frame_equal(
+            compact.to_frame(), df.merge(deal_info, how="left", **keys)
+        )
+        assert compact.isin("PredominantSector", ["Tech"]).tolist() == [
+            True
+        ] * 5 + [False]
+
+    def test_compact_cashflows_duplicate_deals(self):
+        df = self.get_cfs()
+        keys = dict(
+            left_on=["OwnerName", "InvestmentName"],
+            right_on=["OsTicker", "ReportingName"],
+        )
+        # OS2 has no cashflows, so its repeated rows are dropped
+        deal_info = pd.DataFrame(
+            {
+                "OsTicker": ["OS2", "OS1", "OS2"],
+                "ReportingName": ["Fund"] * 3,
+                "DealId": [8, 7, 8],
+            }
+        )
+        compact = CompactCashflows.from_frame(df, deal_info, **keys)
+        assert len(compact.deals) == 2
+        pd.testing.assert_frame_equal(
+            compact.to_frame(), df.merge(deal_info, how="left", **keys)
+        )
+        # a repeated deal with cashflows would duplicate them
+        deal_info = pd.concat([deal_info, deal_info.iloc[[1]]])
+        with pytest.raises(AssertionError):
+            CompactCashflows.from_frame(df, deal_info, **keys)
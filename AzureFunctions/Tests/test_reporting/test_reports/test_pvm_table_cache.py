@@ -0,0 +1,68 @@
+import datetime as dt
+import os
+import pandas as pd
+from gcm.inv.scenario import Scenario
+
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils.helpers.table_cache import (
+    CACHE_DIR_SETTING,
+    CACHE_TTL_SETTING,
+    cached_table,
+    invalidate_cached_tables,
+)
+
+
+class TestPvmTableCache(object):
+    @staticmethod
+    def get_loader(date_scoped: bool = True):
+        calls = []
+
+        @cached_table(date_scoped=date_scoped)
+        def load_table(currency: str = "USD") -> pd.DataFrame:
+            calls.append(currency)
+            return pd.DataFrame(
+                {
+                    "Date": [dt.date(2022, 9, 30), dt.date(2022, 12, 31)],
+                    "Currency": [currency, currency],
+                    "Multiplier": [1.0, 1.1],
+                }
+            )
+
+        return load_table, calls
+
+    def test_cached_table(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(CACHE_DIR_SETTING, str(tmp_path))
+        load_table, calls = self.get_loader()
+        with Scenario(as_of_date=dt.date(2022, 12, 31)).context():
+            first = load_table()
+            # second load, as from another worker, comes from disk
+            pd.testing.assert_frame_equal(load_table(), first)
+            load_table(currency="EUR")
+            assert calls == ["USD", "EUR"]
+            assert len(os.listdir(tmp_path)) == 2
+
+            invalidate_cached_tables(load_table)
+            load_table()
+            assert calls == ["USD", "EUR", "USD"]
+        with Scenario(as_of_date=dt.date(2023, 3, 31)).context():
+            load_table()
+            assert calls == ["USD", "EUR", "USD", "USD"]
+
+    def test_undated_table(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(CACHE_DIR_SETTING, str(tmp_path))
+        load_table, calls = self.get_loader(date_scoped=False)
+        for as_of_date in [dt.date(2022, 12, 31), dt.date(2023, 3, 31)]:
+            with Scenario(as_of_date=as_of_date).context():
+                load_table()
+        # one file and one load shared by every as_of_date
+        assert calls == ["USD"]
+        assert len(os.listdir(tmp_path)) == 1
+
+    def test_cached_table_disabled(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(CACHE_DIR_SETTING, str(tmp_path))
+        monkeypatch.setenv(CACHE_TTL_SETTING, "0")
+        load_table, calls = self.get_loader()
+        with Scenario(as_of_date=dt.date(2022, 12, 31)).context():
+            load_table()
+            load_table()
+        assert calls == ["USD", "USD"]
+        assert os.listdir(tmp_path) == []
@@ -0,0 +1,119 @@
+import datetime as dt
+import json
+from types import SimpleNamespace
+import pandas as pd
+from gcm.inv.scenario import Scenario
+
+from Reporting.Reports.controller import (
+    entity_infos_from_payload,
+    get_report_class_by_name,
+)
+from Reporting.Reports.report_names import ReportNames
+from Reporting.Reports.entity_reports.utils.pvm_performance_utils.pvm_performance_helper import (
+    EntityDomainTypes,
+    PvmPerformanceHelper,
+)
+
+
+class TestReportBatch(object):
+    report_name = ReportNames.PE_Portfolio_Performance_x_Sector
+
+    @staticmethod
+    def get_entity_info(name: str) -> pd.DataFrame:
+        return pd.DataFrame({"EntityName": [name]})
+
+    def get_reports(self, monkeypatch, payload: str) -> tuple[list, list]:
+        calls = []
+
+        def generate_components_for_entities(
+            entity_domain, entity_infos, report_name_enum, as_of_date
+        ):
+            calls.append([i.EntityName[0] for i in entity_infos])
+            return [{"Data": i.copy()} for i in entity_infos]
+
+        monkeypatch.setattr(
+            PvmPerformanceHelper,
+            "generate_components_for_entities",
+            staticmethod(generate_components_for_entities),
+        )
+        # as built by ReportConstructorActivity.construct_meta
+        metas = [
+            SimpleNamespace(
+                entity_domain=EntityDomainTypes.Portfolio, entity_info=i
+            )
+            for i in entity_infos_from_payload(payload)
+        ]
+        report_structure = get_report_class_by_name(self.report_name)
+        with Scenario(as_of_date=dt.date(2022, 12, 31)).context():
+            reports = report_structure.for_entities(
+                metas, self.report_name
+            )
+        return reports, calls
+
+    def test_entities_payload(self, monkeypatch):
+        names = ["P1", "P2", "P3"]
+        payload = json.dumps(
+            {
+                "entities": [
+                    self.get_entity_info(i).to_json() for i in names
+                ]
+            }
+        )
+        reports, calls = self.get_reports(monkeypatch, payload)
+        # one report per entity, in order, from one shared computation
+        assert calls == [names]
+        entity_names = [
+            i.report_meta.entity_info.EntityName[0] for i in reports
+        ]
+        assert entity_names == names
+        data_names = [i.final_data["Data"].EntityName[0] for i in reports]
+        assert data_names == names
+        assert all(i.report_name_enum == self.report_name for i in reports)
+
+    def test_entity_payload(self, monkeypatch):
+        payload = json.dumps(
+            {"entity": self.get_entity_info("P1").to_json()}
+        )
+        reports, calls = self.get_reports(monkeypatch, payload)
+        # computed by the report itself, with entity-scoped queries
+        assert calls == []
+        assert len(reports) == 1
+        assert reports[0].report_meta.entity_info.EntityName[0] == "P1"
+        assert reports[0].final_data is None
+        assert entity_infos_from_payload(None) == [None]
+
+    def test_backfill(self, monkeypatch):
+        as_of_dates = [dt.date(2022, 9, 30), dt.date(2022, 12, 31)]
+        calls = []
+
+        def generate_components_for_dates(self, dates):
+            calls.append(dates)
+            return {
+                i: {"Date": pd.DataFrame({"Date": [i]})} for i in dates
+            }
+
+        monkeypatch.setattr(
+            PvmPerformanceHelper,
+            "generate_components_for_dates",
+            generate_components_for_dates,
+        )
+        meta = SimpleNamespace(
+            entity_domain=EntityDomainTypes.Portfolio,
+            entity_info=self.get_entity_info("P1"),
+        )
+
+        def write(report) -> tuple:
+            # e.g. ReportConstructorActivity.save, which prints the report
+            return (
+                Scenario.get_attribute("as_of_date"),
+                report.final_data["Date"].Date[0],
+            )
+
+        report_structure = get_report_class_by_name(self.report_name)
+        written = report_structure.backfill(
+            meta, self.report_name, as_of_dates, write=write
+        )
+        # one workbook per date from one computation, each written with
+        # the scenario set to its date
+        assert calls == [as_of_dates]
+        assert written == {i: (i, i) for i in as_of_dates}
@@ -0,0 +1,38 @@
+from typing import Callable, Generator, List
+import azure.durable_functions as df
+
+
+def task_window(
+    context: df.DurableOrchestrationContext,
+    task_factories: List[Callable],
+    max_in_flight: int = None,
+) -> Generator:
+    """Fan-out keeping at most ``max_in_flight`` activities scheduled.
+
+    Each factory schedules one task, e.g.
+    ``lambda: context.call_activity(name, params)``, and is called only
+    when a slot is free: a new task starts as soon as an earlier one
+    finishes, instead of every task of the fan-out starting at once. As a
+    generator of the orchestration it is used through ``yield from``:
+
+        results = yield from task_window(context, factories, 10)
+
+    Results are in the order of the factories, as from ``task_all``, which
+    also raises the failure of any task. ``max_in_flight`` None schedules
+    every task at once.
+    """
+    if max_in_flight is None or max_in_flight <= 0:
+        max_in_flight = len(task_factories)
+    tasks = []
+    in_flight = []
+    for task_factory in task_factories:
+        if len(in_flight) >= max_in_flight:
+            # replayed deterministically: task_any gives the same task
+            finished = yield context.task_any(in_flight)
+            in_flight.remove(finished)
+        task = task_factory()
+        tasks.append(task)
+        in_flight.append(task)
+    # every task is scheduled; the finished ones return at once
+    results = yield context.task_all(tasks)
+    return results
@@ -100,6 +100,12 @@ def render_worksheet(wb: Workbook, sheet: ReportWorksheet):
             sheet.worksheet_name
         ].print_area = sheet.render_params.print_region
 
+    # frames of lazily loaded tables are dropped once the worksheet is
+    # written, so a report's tables are not all held at once
+    if sheet.report_tables is not None:
+        for t in sheet.report_tables:
+            t.release()
+
     return wb
 
 
@@ -18,4 +18,9 @@ class ReportingParsedArgs(ExtendedEntityPargs):
                 pargs.ReportName = ReportNames[d["ReportName"]]
         else:
             raise NotImplementedError()
+        # entities constructed per ReportConstructorActivity
+        pargs.batch_size = int(d.get("batch_size", 1))
+        # ISO dates to construct each entity's report for, instead of the
+        # scenario's as_of_date alone, e.g. to backfill past quarters
+        pargs.backfill_dates = list(d.get("backfill_dates", []))
         return pargs